@@ -0,0 +1 @@
+"""Benchmark scripts and the throughput suite (`python -m benchmarks`)."""
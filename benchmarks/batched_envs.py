@@ -0,0 +1,87 @@
+"""Benchmark packed batched stepping against vmapping the per-env step.
+
+Compares `jit(vmap(env.step))` over `EnvState` dataclasses with
+`env.step_batched` over packed float and int state matrices for the classic
+control environments, reporting single step and scanned rollout steps/sec
+and the number of ops in the lowered step.
+
+Usage: python -m benchmarks.batched_envs --num_envs 1024 65536
+"""
+
+import argparse
+
+import jax
+import gymnax
+
+from .compile_report import count_ops
+from .suite import time_fn
+
+env_ids = ["CartPole-v1", "Acrobot-v1", "MountainCar-v0"]
+
+
+def benchmark(env_id: str, num_envs: int, num_steps: int):
+    """Return (step/s, rollout/s, ops) of the vmapped and batched step."""
+    env, env_params = gymnax.make(env_id)
+    rng = jax.random.PRNGKey(0)
+    keys = jax.random.split(rng, num_envs)
+    actions = jax.random.randint(rng, (num_envs,), 0, env.num_actions)
+    vmap_step = jax.vmap(env.step, in_axes=(0, 0, 0, None))
+    _, vmap_state = jax.vmap(env.reset, in_axes=(0, None))(keys, env_params)
+    _, batched_state = env.reset_batched(rng, num_envs, env_params)
+
+    def vmap_rollout(rng, state):
+        def body(state, rng):
+            keys = jax.random.split(rng, num_envs)
+            _, state, reward, _, _ = vmap_step(keys, state, actions, env_params)
+            return state, reward
+
+        return jax.lax.scan(body, state, jax.random.split(rng, num_steps))
+
+    def batched_rollout(rng, state):
+        def body(state, rng):
+            _, state, reward, _, _ = env.step_batched(
+                rng, state, actions, env_params
+            )
+            return state, reward
+
+        return jax.lax.scan(body, state, jax.random.split(rng, num_steps))
+
+    results = {}
+    for name, step, rollout, step_args, state in [
+        ("vmap", vmap_step, vmap_rollout, (keys,), vmap_state),
+        ("batched", env.step_batched, batched_rollout, (rng,), batched_state),
+    ]:
+        args = (*step_args, state, actions, env_params)
+        step_time = time_fn(jax.jit(step), *args)
+        rollout_time = time_fn(jax.jit(rollout), rng, state)
+        results[name] = (
+            num_envs / step_time,
+            num_envs * num_steps / rollout_time,
+            sum(count_ops(jax.jit(step).lower(*args).as_text()).values()),
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--env_ids", nargs="+", default=env_ids)
+    parser.add_argument("--num_envs", nargs="+", type=int, default=[1024])
+    parser.add_argument("--num_steps", type=int, default=100)
+    args = parser.parse_args()
+
+    print(
+        f"{'env_id':<16}{'num_envs':>10}{'mode':>9}"
+        f"{'step/s':>14}{'rollout/s':>14}{'ops':>6}"
+    )
+    for env_id in args.env_ids:
+        for num_envs in args.num_envs:
+            results = benchmark(env_id, num_envs, args.num_steps)
+            for mode, (step_fps, rollout_fps, ops) in results.items():
+                print(
+                    f"{env_id:<16}{num_envs:>10}{mode:>9}"
+                    f"{step_fps:>14,.0f}{rollout_fps:>14,.0f}{ops:>6}"
+                )
+
+
+if __name__ == "__main__":
+    main()
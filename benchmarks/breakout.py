@@ -0,0 +1,62 @@
+"""Benchmark Breakout-MinAtar steps/sec and state bytes per environment.
+
+Usage: python -m benchmarks.breakout --num_envs 1 1024 8192
+"""
+
+import argparse
+
+import jax
+import jax.numpy as jnp
+import gymnax
+
+from .suite import time_fn
+
+
+def benchmark(num_envs: int, num_steps: int):
+    """Return steps/sec of jit(vmap(step)), a scanned rollout and state bytes."""
+    env, env_params = gymnax.make("Breakout-MinAtar")
+    rng = jax.random.PRNGKey(0)
+    keys = jax.random.split(rng, num_envs)
+    _, state = jax.vmap(env.reset, in_axes=(0, None))(keys, env_params)
+    actions = jax.random.randint(rng, (num_envs,), 0, 3)
+    step = jax.vmap(env.step, in_axes=(0, 0, 0, None))
+
+    def rollout(rng, state):
+        def body(state, rng):
+            key_act, key_step = jax.random.split(rng)
+            action = jax.random.randint(key_act, (num_envs,), 0, 3)
+            keys = jax.random.split(key_step, num_envs)
+            _, state, reward, _, _ = step(keys, state, action, env_params)
+            return state, reward
+
+        return jax.lax.scan(body, state, jax.random.split(rng, num_steps))
+
+    step_time = time_fn(jax.jit(step), keys, state, actions, env_params)
+    rollout_time = time_fn(jax.jit(rollout), rng, state)
+    state_bytes = sum(
+        jnp.asarray(x).nbytes for x in jax.tree_util.tree_leaves(state)
+    )
+    return (
+        num_envs / step_time,
+        num_envs * num_steps / rollout_time,
+        state_bytes / num_envs,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_envs", nargs="+", type=int, default=[1, 8192])
+    parser.add_argument("--num_steps", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'num_envs':>10}{'step/s':>14}{'rollout/s':>14}{'bytes/env':>12}")
+    for num_envs in args.num_envs:
+        step_fps, rollout_fps, state_bytes = benchmark(num_envs, args.num_steps)
+        print(
+            f"{num_envs:>10}{step_fps:>14,.0f}{rollout_fps:>14,.0f}"
+            f"{state_bytes:>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
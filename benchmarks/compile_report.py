@@ -0,0 +1,229 @@
+"""Per-environment compile-time and HLO-size report.
+
+Lowers `step` and `reset` of every registered environment, unbatched and
+vmapped, and reports the StableHLO op count, text size and number of
+scatter/gather/while ops, together with lowering/compile wall time and the
+memory of the compiled executable. Unrolled Python loops show up as large
+op and scatter counts. With thresholds the report exits with status 1 if
+any of them is exceeded, e.g. to check a change locally before committing.
+
+Usage: python -m benchmarks.compile_report --batch_size 256
+    --max num_ops=5000 compile_time=10 [--thresholds thresholds.json]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+import jax
+import gymnax
+from gymnax.registration import registered_envs
+
+from .suite import MEMORY_FIELDS, memory_stats, save_results
+
+METRICS = (
+    "num_ops",
+    "hlo_bytes",
+    "num_scatter",
+    "num_gather",
+    "num_while",
+    "lower_time",
+    "compile_time",
+) + MEMORY_FIELDS
+FIELDS = ["env_id", "fn", "batch_size", *METRICS, "error"]
+
+# Operations of the lowered module, optionally assigned to result values
+_op_pattern = re.compile(
+    r"^\s*(?:%\S+\s*=\s*)?\"?(?:stablehlo|chlo)\.(\w+)", re.M
+)
+
+
+def count_ops(hlo_text: str) -> Counter:
+    """Count the StableHLO/CHLO operations of a lowered module by name."""
+    return Counter(_op_pattern.findall(hlo_text))
+
+
+def report_fn(fn, *args) -> Dict[str, Any]:
+    """Lower and compile `fn`, return HLO statistics, timings and memory."""
+    start = time.perf_counter()
+    lowered = jax.jit(fn).lower(*args)
+    lower_time = time.perf_counter() - start
+    start = time.perf_counter()
+    compiled = lowered.compile()
+    compile_time = time.perf_counter() - start
+    hlo_text = lowered.as_text()
+    ops = count_ops(hlo_text)
+    return {
+        "num_ops": sum(ops.values()),
+        "hlo_bytes": len(hlo_text),
+        "num_scatter": ops["scatter"],
+        "num_gather": ops["gather"] + ops["dynamic_slice"],
+        "num_while": ops["while"],
+        "lower_time": lower_time,
+        "compile_time": compile_time,
+        **memory_stats(compiled, args, jax.eval_shape(fn, *args)),
+    }
+
+
+def report_env(
+    env_id: str, batch_size: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Reports for `step` and `reset`, vmapped if `batch_size` is given."""
+    env, env_params = gymnax.make(env_id)
+    step_fn, reset_fn, (key, state, action, _) = env.abstract_inputs(
+        batch_size, env_params
+    )
+    reports = {
+        "step": report_fn(step_fn, key, state, action, env_params),
+        "reset": report_fn(reset_fn, key, env_params),
+    }
+    return [
+        {
+            "env_id": env_id,
+            "fn": name,
+            "batch_size": batch_size or 0,
+            **report,
+            "error": None,
+        }
+        for name, report in reports.items()
+    ]
+
+
+def run_report(
+    env_ids: Sequence[str],
+    batch_sizes: Sequence[Optional[int]] = (None, 256),
+    verbose: bool = False,
+) -> List[Dict[str, Any]]:
+    """Reports for all envs and batch sizes (None: no vmap).
+
+    Environments that fail to build or lower are recorded in `error`.
+    """
+    results = []
+    for env_id in env_ids:
+        for batch_size in batch_sizes:
+            try:
+                rows = report_env(env_id, batch_size)
+            except Exception as e:
+                rows = [
+                    {
+                        **dict.fromkeys(FIELDS),
+                        "env_id": env_id,
+                        "fn": fn,
+                        "batch_size": batch_size or 0,
+                        "error": f"{type(e).__name__}: {e}",
+                    }
+                    for fn in ["step", "reset"]
+                ]
+            if verbose:
+                for row in rows:
+                    print_row(row)
+            results.extend(rows)
+    return results
+
+
+def print_row(row: Dict[str, Any]):
+    """Print a single report as table row."""
+    name = f"{row['env_id']:<26}{row['fn']:>6}{row['batch_size']:>7}"
+    if row["error"] is not None:
+        print(f"{name}  failed: {row['error']}")
+        return
+    peak = row["peak_bytes"]
+    peak = "-" if peak is None else f"{peak / 2**10:,.1f}"
+    print(
+        f"{name}{row['num_ops']:>8}{row['hlo_bytes'] / 2**10:>10,.1f}"
+        f"{row['num_scatter']:>8}{row['num_gather']:>8}"
+        f"{row['lower_time']:>9.2f}{row['compile_time']:>10.2f}{peak:>11}"
+    )
+
+
+def check_thresholds(
+    results: List[Dict[str, Any]], thresholds: Dict[str, Dict[str, float]]
+) -> List[str]:
+    """Return violations of `{env_id or "*": {metric: max_value}}`.
+
+    Limits of an env id override the defaults given under "*". Failed
+    reports count as violations.
+    """
+    for limits in thresholds.values():
+        for metric in limits:
+            if metric not in METRICS:
+                raise ValueError(f"Unknown metric {metric}, use {METRICS}.")
+    violations = []
+    for row in results:
+        limits = {
+            **thresholds.get("*", {}),
+            **thresholds.get(row["env_id"], {}),
+        }
+        name = f"{row['env_id']}/{row['fn']}/{row['batch_size']}"
+        if row["error"] is not None:
+            if limits:
+                violations.append(f"{name}: failed ({row['error']})")
+            continue
+        for metric, max_value in limits.items():
+            if row[metric] is not None and row[metric] > max_value:
+                violations.append(
+                    f"{name}: {metric} = {row[metric]:,.2f} > {max_value:,.2f}"
+                )
+    return violations
+
+
+def _parse_limit(value: str):
+    metric, _, max_value = value.partition("=")
+    return metric, float(max_value)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Report HLO size and compile time of gymnax environments."
+    )
+    parser.add_argument("--env_ids", nargs="+", default=registered_envs)
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=256,
+        help="Batch size of the vmapped functions (0: only unbatched).",
+    )
+    parser.add_argument(
+        "--max",
+        nargs="+",
+        type=_parse_limit,
+        default=[],
+        metavar="METRIC=VALUE",
+        help="Maximum value of a metric for all environments.",
+    )
+    parser.add_argument(
+        "--thresholds",
+        type=str,
+        default=None,
+        help='JSON file {env_id or "*": {metric: max_value}}.',
+    )
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args(argv)
+
+    thresholds = {}
+    if args.thresholds is not None:
+        with open(args.thresholds) as f:
+            thresholds = json.load(f)
+    thresholds["*"] = {**thresholds.get("*", {}), **dict(args.max)}
+
+    batch_sizes = [None] + ([args.batch_size] if args.batch_size else [])
+    print(
+        f"{'Environment':<26}{'fn':>6}{'batch':>7}{'ops':>8}{'HLO/KiB':>10}"
+        f"{'scatter':>8}{'gather':>8}{'lower/s':>9}{'compile/s':>10}"
+        f"{'peak/KiB':>11}"
+    )
+    results = run_report(args.env_ids, batch_sizes, verbose=True)
+    if args.output is not None:
+        save_results(results, args.output, FIELDS)
+    violations = check_thresholds(results, thresholds)
+    for violation in violations:
+        print(f"Threshold exceeded - {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Benchmark wall-clock time of full-scan vs. early-exit rollouts.
+
+Usage: python benchmarks/early_exit.py --num_envs 256 --pop_size 64
+"""
+
+import argparse
+import time
+
+import jax
+import jax.numpy as jnp
+from gymnax.experimental import RolloutWrapper
+
+
+def time_fn(fn, *args, num_iters: int = 5) -> float:
+    """Return average wall clock time of a compiled function call."""
+    jax.block_until_ready(fn(*args))  # Compile
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        out = fn(*args)
+    jax.block_until_ready(out)
+    return (time.perf_counter() - start) / num_iters
+
+
+def benchmark(env_id: str, num_envs: int, pop_size: int, chunk: int):
+    """Return batch/population rollout times with and without early exit."""
+    rng_batch = jax.random.split(jax.random.PRNGKey(0), num_envs)
+    # Random policy, parameters only carry the population axis
+    pop_params = jnp.zeros((pop_size,))
+    results = {}
+    for early_exit_chunk in [None, chunk]:
+        manager = RolloutWrapper(
+            env_name=env_id, output="stats", early_exit_chunk=early_exit_chunk
+        )
+        name = "full" if early_exit_chunk is None else "early_exit"
+        results[name] = (
+            time_fn(manager.batch_rollout, rng_batch, None),
+            time_fn(manager.population_rollout, rng_batch, pop_params),
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--env_ids", nargs="+", default=["CartPole-v1", "Catch-bsuite"]
+    )
+    parser.add_argument("--num_envs", type=int, default=256)
+    parser.add_argument("--pop_size", type=int, default=64)
+    parser.add_argument("--chunk", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'Environment':<16}{'mode':>12}{'batch [ms]':>14}{'pop [ms]':>14}")
+    for env_id in args.env_ids:
+        results = benchmark(env_id, args.num_envs, args.pop_size, args.chunk)
+        for name, (t_batch, t_pop) in results.items():
+            print(
+                f"{env_id:<16}{name:>12}{1e3 * t_batch:>14.2f}"
+                f"{1e3 * t_pop:>14.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark MinAtar observation bytes and render time per step.
+
+Usage: python benchmarks/minatar_render.py --num_envs 4096
+"""
+
+import argparse
+import time
+
+import jax
+import gymnax
+from gymnax.environments.obs_dtype import OBS_DTYPES
+
+minatar_envs = [
+    "Asterix-MinAtar",
+    "Breakout-MinAtar",
+    "Freeway-MinAtar",
+    "Seaquest-MinAtar",
+    "SpaceInvaders-MinAtar",
+]
+
+
+def time_fn(fn, *args, num_iters: int = 50) -> float:
+    """Return average wall clock time of a compiled function call."""
+    jax.block_until_ready(fn(*args))  # Compile
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        out = fn(*args)
+    jax.block_until_ready(out)
+    return (time.perf_counter() - start) / num_iters
+
+
+def benchmark(env_id: str, num_envs: int):
+    """Return render time and obs bytes/frame for each observation dtype."""
+    env, env_params = gymnax.make(env_id)
+    rng = jax.random.split(jax.random.PRNGKey(0), num_envs)
+    _, state = jax.vmap(env.reset, in_axes=(0, None))(rng, env_params)
+    results = {}
+    for obs_dtype in OBS_DTYPES:
+        env, _ = gymnax.make(env_id, obs_dtype=obs_dtype)
+        render = jax.jit(jax.vmap(env.get_obs))
+        results[obs_dtype] = (
+            1e6 * time_fn(render, state) / num_envs,
+            render(state)[0].nbytes,
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--env_ids", nargs="+", default=minatar_envs)
+    parser.add_argument("--num_envs", type=int, default=4096)
+    args = parser.parse_args()
+
+    print(f"{'Environment':<24}{'dtype':>10}{'us/step':>10}{'bytes/frame':>14}")
+    for env_id in args.env_ids:
+        results = benchmark(env_id, args.num_envs)
+        for obs_dtype, (render_us, obs_bytes) in results.items():
+            print(
+                f"{env_id:<24}{obs_dtype:>10}{render_us:>10.3f}{obs_bytes:>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark random-policy rollouts with pre-sampled vs. per-step actions.
+
+Usage: python benchmarks/random_policy.py --num_envs 1024
+"""
+
+import argparse
+import time
+
+import jax
+from gymnax.experimental import RolloutWrapper
+
+
+def time_fn(fn, *args, num_iters: int = 5) -> float:
+    """Return average wall clock time of a compiled function call."""
+    jax.block_until_ready(fn(*args))  # Compile
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        out = fn(*args)
+    jax.block_until_ready(out)
+    return (time.perf_counter() - start) / num_iters
+
+
+def benchmark(env_id: str, num_envs: int, num_steps: int):
+    """Return steps/sec of the random-policy fast path and per-step sampling."""
+    rng_batch = jax.random.split(jax.random.PRNGKey(0), num_envs)
+    manager = RolloutWrapper(
+        env_name=env_id, num_env_steps=num_steps, output="stats"
+    )
+    action_space = manager.env.action_space(manager.env_params)
+    # Same policy as a network forward, i.e. split + sample in every step
+    manager_step = RolloutWrapper(
+        lambda params, obs, rng: action_space.sample(rng),
+        env_name=env_id,
+        num_env_steps=num_steps,
+        output="stats",
+    )
+    return {
+        name: num_envs * num_steps / time_fn(m.batch_rollout, rng_batch, None)
+        for name, m in [("presampled", manager), ("per_step", manager_step)]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--env_ids",
+        nargs="+",
+        default=["GaussianBandit-misc", "Catch-bsuite", "CartPole-v1"],
+    )
+    parser.add_argument("--num_envs", type=int, default=1024)
+    parser.add_argument("--num_steps", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'Environment':<24}{'presampled':>14}{'per_step':>14}")
+    for env_id in args.env_ids:
+        results = benchmark(env_id, args.num_envs, args.num_steps)
+        print(
+            f"{env_id:<24}{results['presampled']:>14,.0f}"
+            f"{results['per_step']:>14,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
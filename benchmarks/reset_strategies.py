@@ -0,0 +1,72 @@
+"""Benchmark steps/sec of the different auto-reset strategies.
+
+Usage: python benchmarks/reset_strategies.py --num_envs 8192 --num_steps 100
+"""
+import argparse
+import time
+
+import jax
+import gymnax
+from gymnax.environments.environment import RESET_STRATEGIES
+
+
+def rollout_fn(env, env_params, num_envs: int, num_steps: int):
+    """Jitted random-policy rollout of `num_envs` envs for `num_steps`."""
+
+    def single_rollout(rng):
+        rng_reset, rng_episode = jax.random.split(rng)
+        obs, state = env.reset(rng_reset, env_params)
+
+        def policy_step(carry, rng_t):
+            obs, state = carry
+            rng_act, rng_step = jax.random.split(rng_t)
+            action = env.action_space(env_params).sample(rng_act)
+            next_obs, next_state, reward, done, _ = env.step(
+                rng_step, state, action, env_params
+            )
+            return (next_obs, next_state), reward
+
+        _, rewards = jax.lax.scan(
+            policy_step, (obs, state), jax.random.split(rng_episode, num_steps)
+        )
+        return rewards.sum()
+
+    return jax.jit(jax.vmap(single_rollout))
+
+
+def benchmark(env_id: str, num_envs: int, num_steps: int, pool_size: int):
+    """Return steps/sec for each reset strategy of an environment."""
+    env, env_params = gymnax.make(env_id)
+    rng = jax.random.split(jax.random.PRNGKey(0), num_envs)
+    results = {}
+    for strategy in RESET_STRATEGIES:
+        env_s = env.with_reset_strategy(strategy, pool_size)
+        rollout = rollout_fn(env_s, env_params, num_envs, num_steps)
+        rollout(rng).block_until_ready()  # Compile
+        start = time.perf_counter()
+        rollout(rng).block_until_ready()
+        results[strategy] = num_envs * num_steps / (time.perf_counter() - start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--env_ids", nargs="+", default=gymnax.registered_envs)
+    parser.add_argument("--num_envs", type=int, default=8192)
+    parser.add_argument("--num_steps", type=int, default=100)
+    parser.add_argument("--pool_size", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'Environment':<26}" + "".join(f"{s:>14}" for s in RESET_STRATEGIES))
+    for env_id in args.env_ids:
+        results = benchmark(
+            env_id, args.num_envs, args.num_steps, args.pool_size
+        )
+        print(
+            f"{env_id:<26}"
+            + "".join(f"{results[s]:>14,.0f}" for s in RESET_STRATEGIES)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark population rollout scaling across host CPU devices.
+
+Usage: python benchmarks/sharded_rollout.py --max_devices 8 --pop_size 64
+"""
+
+import argparse
+import os
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--env_id", default="CartPole-v1")
+    parser.add_argument("--max_devices", type=int, default=8)
+    parser.add_argument("--pop_size", type=int, default=64)
+    parser.add_argument("--num_envs", type=int, default=16)
+    args = parser.parse_args()
+
+    # Host devices have to be configured before jax is imported
+    if "jax" in sys.modules:
+        raise RuntimeError("Run this benchmark as a standalone script.")
+    os.environ["XLA_FLAGS"] = (
+        f"--xla_force_host_platform_device_count={args.max_devices}"
+    )
+    import jax
+    import jax.numpy as jnp
+    from gymnax.experimental import RolloutWrapper
+
+    rng_batch = jax.random.split(jax.random.PRNGKey(0), args.num_envs)
+    pop_params = jnp.linspace(-1.0, 1.0, args.pop_size)
+
+    def model_forward(params, obs, rng):
+        return jnp.int32(obs[2] * params > 0)
+
+    num_devices = 1
+    print(f"{'Devices':>8}{'time [ms]':>12}{'speedup':>10}")
+    while num_devices <= args.max_devices:
+        manager = RolloutWrapper(
+            model_forward,
+            args.env_id,
+            output="stats",
+            num_devices=num_devices,
+        )
+        rollout = manager.population_rollout
+        jax.block_until_ready(rollout(rng_batch, pop_params))  # Compile
+        start = time.perf_counter()
+        for _ in range(5):
+            out = rollout(rng_batch, pop_params)
+        jax.block_until_ready(out)
+        elapsed = (time.perf_counter() - start) / 5
+        if num_devices == 1:
+            base = elapsed
+        print(f"{num_devices:>8}{1e3 * elapsed:>12.2f}{base / elapsed:>10.2f}")
+        num_devices *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""Throughput benchmark suite across all registered gymnax environments.
+
+For every environment id the suite measures compile time, steps/sec and
+the memory of the compiled executable for four execution modes:
+
+- "step": A single jitted environment step (dispatch bound).
+- "vmap": jit(vmap(step)) for each batch size.
+- "scan": A scan-fused random-policy rollout of `num_steps` for each batch
+  size, i.e. one XLA program for the whole rollout.
+- "gym_vector": Stepping through `GymnaxToVectorGymWrapper` from Python.
+
+Results can be written to JSON or CSV and compared against a previous run
+to gate throughput regressions locally (CPU-only runs are supported).
+
+Usage: python -m benchmarks --env_ids CartPole-v1 --batch_sizes 1 1024
+    --output results.json [--baseline baseline.json --max_slowdown 0.2]
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import jax
+import numpy as np
+import gymnax
+from gymnax._version import __version__
+from gymnax.registration import registered_envs
+
+MODES = ("step", "vmap", "scan", "gym_vector")
+DEFAULT_BATCH_SIZES = [4**i for i in range(9)]  # 1 ... 65536
+MEMORY_FIELDS = ("peak_bytes", "temp_bytes", "code_bytes")
+FIELDS = [
+    "env_id",
+    "mode",
+    "batch_size",
+    "compile_time",
+    "steps_per_sec",
+    "peak_bytes",
+    "temp_bytes",
+    "code_bytes",
+    "error",
+]
+
+
+def time_fn(
+    fn: Callable,
+    *args,
+    min_time: float = 0.2,
+    max_iters: int = 1000,
+) -> float:
+    """Return average wall clock time of a (compiled) function call.
+
+    Calls are repeated until `min_time` seconds have passed, so fast
+    functions are averaged over many calls and slow ones are called once.
+    """
+    jax.block_until_ready(fn(*args))  # Warm-up
+    num_iters, start = 0, time.perf_counter()
+    while True:
+        out = fn(*args)
+        num_iters += 1
+        if num_iters >= max_iters or time.perf_counter() - start > min_time:
+            break
+    jax.block_until_ready(out)
+    return (time.perf_counter() - start) / num_iters
+
+
+def compile_fn(fn: Callable, *args):
+    """Lower and compile a jitted function.
+
+    Returns the executable, the compile time and its memory statistics.
+    """
+    start = time.perf_counter()
+    compiled = jax.jit(fn).lower(*args).compile()
+    compile_time = time.perf_counter() - start
+    memory = memory_stats(compiled, args, jax.eval_shape(fn, *args))
+    return compiled, compile_time, memory
+
+
+def _tree_bytes(tree) -> int:
+    leaves = jax.tree_util.tree_leaves(jax.eval_shape(lambda x: x, tree))
+    return sum(int(np.prod(x.shape)) * x.dtype.itemsize for x in leaves)
+
+
+def memory_stats(compiled, args, out_shape) -> Dict[str, Optional[int]]:
+    """Peak, temporary and code bytes from XLA's memory analysis.
+
+    The CPU backend only reports the generated code size, so argument and
+    output buffers fall back to the sizes of the (abstract) arrays.
+    """
+    try:
+        stats = compiled.memory_analysis()
+    except Exception:
+        stats = None
+    if stats is None:
+        return dict.fromkeys(MEMORY_FIELDS)
+    argument_bytes = stats.argument_size_in_bytes or _tree_bytes(args)
+    output_bytes = stats.output_size_in_bytes or _tree_bytes(out_shape)
+    peak = (
+        argument_bytes
+        + output_bytes
+        - stats.alias_size_in_bytes
+        + stats.temp_size_in_bytes
+    )
+    return {
+        "peak_bytes": int(peak),
+        "temp_bytes": int(stats.temp_size_in_bytes),
+        "code_bytes": int(stats.generated_code_size_in_bytes),
+    }
+
+
+def _result(env_id, mode, batch_size, memory, compile_time, step_time, n):
+    return {
+        "env_id": env_id,
+        "mode": mode,
+        "batch_size": batch_size,
+        "compile_time": compile_time,
+        "steps_per_sec": n / step_time,
+        **memory,
+        "error": None,
+    }
+
+
+def benchmark_step(env_id: str, min_time: float) -> Dict[str, Any]:
+    """Single unbatched environment step."""
+    env, env_params = gymnax.make(env_id)
+    rng, rng_reset, rng_act = jax.random.split(jax.random.PRNGKey(0), 3)
+    _, state = env.reset(rng_reset, env_params)
+    action = env.action_space(env_params).sample(rng_act)
+    compiled, compile_time, memory = compile_fn(
+        env.step, rng, state, action, env_params
+    )
+    step_time = time_fn(
+        compiled, rng, state, action, env_params, min_time=min_time
+    )
+    return _result(env_id, "step", 1, memory, compile_time, step_time, 1)
+
+
+def benchmark_vmap(
+    env_id: str, batch_size: int, min_time: float
+) -> Dict[str, Any]:
+    """jit(vmap(step)) over a batch of environments."""
+    env, env_params = gymnax.make(env_id)
+    rng, rng_reset, rng_act = jax.random.split(jax.random.PRNGKey(0), 3)
+    keys = jax.random.split(rng, batch_size)
+    reset_keys = jax.random.split(rng_reset, batch_size)
+    _, state = jax.vmap(env.reset, in_axes=(0, None))(reset_keys, env_params)
+    action = env.action_space(env_params).sample_batch(rng_act, batch_size)
+    step = jax.vmap(env.step, in_axes=(0, 0, 0, None))
+    compiled, compile_time, memory = compile_fn(
+        step, keys, state, action, env_params
+    )
+    step_time = time_fn(
+        compiled, keys, state, action, env_params, min_time=min_time
+    )
+    return _result(
+        env_id,
+        "vmap",
+        batch_size,
+        memory,
+        compile_time,
+        step_time,
+        batch_size,
+    )
+
+
+def benchmark_scan(
+    env_id: str, batch_size: int, num_steps: int, min_time: float
+) -> Dict[str, Any]:
+    """Scan-fused random-policy rollout of a batch of environments."""
+    env, env_params = gymnax.make(env_id)
+    action_space = env.action_space(env_params)
+    step = jax.vmap(env.step, in_axes=(0, 0, 0, None))
+
+    def rollout(rng, state, params):
+        def policy_step(carry, _):
+            state, rng, total_reward = carry
+            rng, rng_act, rng_step = jax.random.split(rng, 3)
+            action = action_space.sample_batch(rng_act, batch_size)
+            keys = jax.random.split(rng_step, batch_size)
+            _, state, reward, _, _ = step(keys, state, action, params)
+            return (state, rng, total_reward + reward), None
+
+        carry = (state, rng, jax.numpy.zeros(batch_size))
+        carry, _ = jax.lax.scan(policy_step, carry, None, num_steps)
+        return carry
+
+    rng, rng_reset = jax.random.split(jax.random.PRNGKey(0))
+    reset_keys = jax.random.split(rng_reset, batch_size)
+    _, state = jax.vmap(env.reset, in_axes=(0, None))(reset_keys, env_params)
+    compiled, compile_time, memory = compile_fn(rollout, rng, state, env_params)
+    step_time = time_fn(compiled, rng, state, env_params, min_time=min_time)
+    return _result(
+        env_id,
+        "scan",
+        batch_size,
+        memory,
+        compile_time,
+        step_time,
+        batch_size * num_steps,
+    )
+
+
+def benchmark_gym_vector(
+    env_id: str, batch_size: int, min_time: float
+) -> Dict[str, Any]:
+    """Python-driven stepping of the `GymnaxToVectorGymWrapper`."""
+    from gymnax.wrappers.gym import GymnaxToVectorGymWrapper
+
+    env, env_params = gymnax.make(env_id)
+    action = env.action_space(env_params).sample_batch(
+        jax.random.PRNGKey(1), batch_size
+    )
+    # Compilation happens lazily at construction and the first step
+    start = time.perf_counter()
+    wrapper = GymnaxToVectorGymWrapper(env, batch_size, env_params, seed=0)
+    wrapper.reset()
+    jax.block_until_ready(wrapper.step(action))
+    compile_time = time.perf_counter() - start
+    step_time = time_fn(lambda: wrapper.step(action)[:3], min_time=min_time)
+    return _result(
+        env_id,
+        "gym_vector",
+        batch_size,
+        dict.fromkeys(MEMORY_FIELDS),
+        compile_time,
+        step_time,
+        batch_size,
+    )
+
+
+def run_suite(
+    env_ids: Sequence[str],
+    modes: Sequence[str] = MODES,
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    num_steps: int = 100,
+    min_time: float = 0.2,
+    verbose: bool = False,
+) -> List[Dict[str, Any]]:
+    """Run the selected benchmarks, failures are recorded in `error`."""
+    tasks = []
+    for env_id in env_ids:
+        if "step" in modes:
+            tasks.append((env_id, "step", 1, benchmark_step, (min_time,)))
+        for batch_size in batch_sizes:
+            if "vmap" in modes:
+                args = (batch_size, min_time)
+                tasks.append((env_id, "vmap", batch_size, benchmark_vmap, args))
+            if "scan" in modes:
+                args = (batch_size, num_steps, min_time)
+                tasks.append((env_id, "scan", batch_size, benchmark_scan, args))
+            if "gym_vector" in modes:
+                args = (batch_size, min_time)
+                tasks.append(
+                    (
+                        env_id,
+                        "gym_vector",
+                        batch_size,
+                        benchmark_gym_vector,
+                        args,
+                    )
+                )
+
+    results = []
+    for env_id, mode, batch_size, fn, args in tasks:
+        try:
+            result = fn(env_id, *args)
+        except Exception as e:
+            result = {key: None for key in FIELDS}
+            result.update(
+                env_id=env_id,
+                mode=mode,
+                batch_size=batch_size,
+                error=f"{type(e).__name__}: {e}",
+            )
+        if verbose:
+            print_result(result)
+        results.append(result)
+    return results
+
+
+def print_result(result: Dict[str, Any]):
+    """Print a single result as table row."""
+    row = f"{result['env_id']:<26}{result['mode']:>11}{result['batch_size']:>8}"
+    if result["error"] is not None:
+        print(f"{row}  failed: {result['error']}")
+        return
+    peak = result["peak_bytes"]
+    peak = "-" if peak is None else f"{peak / 2**10:,.1f}"
+    print(
+        f"{row}{result['compile_time']:>10.2f}"
+        f"{result['steps_per_sec']:>16,.0f}{peak:>12}"
+    )
+
+
+def metadata() -> Dict[str, Any]:
+    """Software and hardware the results were measured on."""
+    return {
+        "gymnax": __version__,
+        "jax": jax.__version__,
+        "backend": jax.default_backend(),
+        "devices": [str(d) for d in jax.devices()],
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def save_results(
+    results: List[Dict[str, Any]],
+    path: str,
+    fields: Sequence[str] = FIELDS,
+):
+    """Store results as CSV (`.csv` suffix) or JSON with metadata."""
+    if os.path.splitext(path)[1] == ".csv":
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, "w") as f:
+            json.dump({"metadata": metadata(), "results": results}, f, indent=2)
+
+
+def load_results(path: str) -> List[Dict[str, Any]]:
+    """Load results stored by `save_results`."""
+    if os.path.splitext(path)[1] == ".csv":
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            row["batch_size"] = int(row["batch_size"])
+            for key in FIELDS[3:-1]:
+                row[key] = float(row[key]) if row[key] else None
+            row["error"] = row["error"] or None
+        return rows
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare_results(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    max_slowdown: float = 0.2,
+) -> List[str]:
+    """Return regressions, i.e. steps/sec below `1 - max_slowdown` of baseline.
+
+    Benchmarks that fail now but succeeded in the baseline also count.
+    """
+    reference = {(r["env_id"], r["mode"], r["batch_size"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        key = (result["env_id"], result["mode"], result["batch_size"])
+        ref = reference.get(key)
+        if ref is None or ref["steps_per_sec"] is None:
+            continue
+        name = "/".join(str(k) for k in key)
+        if result["steps_per_sec"] is None:
+            regressions.append(f"{name}: failed ({result['error']})")
+        elif (
+            result["steps_per_sec"] < (1 - max_slowdown) * ref["steps_per_sec"]
+        ):
+            regressions.append(
+                f"{name}: {result['steps_per_sec']:,.0f} steps/s vs."
+                f" {ref['steps_per_sec']:,.0f} steps/s in baseline"
+            )
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark gymnax environment throughput."
+    )
+    parser.add_argument("--env_ids", nargs="+", default=registered_envs)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument(
+        "--batch_sizes", nargs="+", type=int, default=DEFAULT_BATCH_SIZES
+    )
+    parser.add_argument("--num_steps", type=int, default=100)
+    parser.add_argument("--min_time", type=float, default=0.2)
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--baseline", type=str, default=None)
+    parser.add_argument("--max_slowdown", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    print(f"Backend: {jax.default_backend()}, devices: {jax.devices()}")
+    print(
+        f"{'Environment':<26}{'mode':>11}{'batch':>8}{'compile/s':>10}"
+        f"{'steps/sec':>16}{'peak/KiB':>12}"
+    )
+    results = run_suite(
+        args.env_ids,
+        args.modes,
+        args.batch_sizes,
+        args.num_steps,
+        args.min_time,
+        verbose=True,
+    )
+    if args.output is not None:
+        save_results(results, args.output)
+    if args.baseline is not None:
+        regressions = compare_results(
+            results, load_results(args.baseline), args.max_slowdown
+        )
+        for regression in regressions:
+            print(f"Regression - {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
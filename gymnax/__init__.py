@@ -1,4 +1,4 @@
-from .registration import make, registered_envs
+from .registration import make, register, registered_envs
 from .environments import EnvState, EnvParams
 
-__all__ = ["make", "registered_envs", "EnvState", "EnvParams"]
+__all__ = ["make", "register", "registered_envs", "EnvState", "EnvParams"]
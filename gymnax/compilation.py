@@ -0,0 +1,74 @@
+"""Persistent compilation cache and AOT pre-warming of gymnax environments.
+
+Usage: python -m gymnax.compilation --batch_sizes 1 1024 [--env_ids ...]
+"""
+
+import argparse
+import os
+import time
+from typing import Optional
+
+import jax
+from jax.experimental.compilation_cache import compilation_cache
+
+from ._version import __version__
+
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "gymnax")
+
+
+def cache_dir_path(cache_dir: Optional[str] = None) -> str:
+    """Version-specific directory of the persistent compilation cache."""
+    if cache_dir is None:
+        cache_dir = os.environ.get("GYMNAX_CACHE_DIR", DEFAULT_CACHE_DIR)
+    return os.path.join(
+        os.path.expanduser(cache_dir),
+        f"gymnax-{__version__}-jax-{jax.__version__}",
+    )
+
+
+def enable_compilation_cache(cache_dir: Optional[str] = None) -> str:
+    """Store compiled executables in JAX's persistent compilation cache.
+
+    Entries are keyed by the lowered HLO, which depends on the environment
+    class, its constructor kwargs and the batch shape. The directory is
+    namespaced by the gymnax and jax versions, so upgrades start a new cache.
+    Defaults to `$GYMNAX_CACHE_DIR` or `~/.cache/gymnax`.
+    """
+    path = cache_dir_path(cache_dir)
+    os.makedirs(path, exist_ok=True)
+    jax.config.update("jax_compilation_cache_dir", path)
+    # Cache all env functions, these are mostly fast but numerous compiles
+    jax.config.update("jax_persistent_cache_min_compile_time_secs", 0.0)
+    # Re-initialize in case something was compiled before the cache was set
+    compilation_cache.reset_cache()
+    return path
+
+
+def main():
+    from .registration import make, registered_envs
+
+    parser = argparse.ArgumentParser(
+        description="Pre-warm the compilation cache of gymnax environments."
+    )
+    parser.add_argument("--env_ids", nargs="+", default=registered_envs)
+    parser.add_argument("--batch_sizes", nargs="+", type=int, default=[1])
+    parser.add_argument("--cache_dir", type=str, default=None)
+    args = parser.parse_args()
+
+    path = enable_compilation_cache(args.cache_dir)
+    print(f"Compilation cache: {path}")
+    for env_id in args.env_ids:
+        for batch_size in args.batch_sizes:
+            start = time.perf_counter()
+            try:
+                env, env_params = make(env_id)
+                env.compile(batch_size, env_params)
+            except Exception as e:
+                print(f"{env_id:<26}{batch_size:>8}  failed: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            print(f"{env_id:<26}{batch_size:>8}{elapsed:>10.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,35 @@
 from .environment import EnvParams, EnvState
-from .classic_control import (
-    Pendulum,
-    CartPole,
-    MountainCar,
-    ContinuousMountainCar,
-    Acrobot,
-)
+from .lazy import lazy_getattr
 
-from .bsuite import (
-    Catch,
-    DeepSea,
-    DiscountingChain,
-    MemoryChain,
-    UmbrellaChain,
-    MNISTBandit,
-    SimpleBandit,
-)
-
-from .minatar import (
-    MinAsterix,
-    MinBreakout,
-    MinFreeway,
-    MinSeaquest,
-    MinSpaceInvaders,
-)
-
-from .misc import (
-    BernoulliBandit,
-    GaussianBandit,
-    FourRooms,
-    MetaMaze,
-    PointRobot,
-    Reacher,
-    Swimmer,
-    Pong,
-)
+# Environments are imported on first access, see `gymnax.registration`
+_env_modules = {
+    "Pendulum": ".classic_control",
+    "CartPole": ".classic_control",
+    "MountainCar": ".classic_control",
+    "ContinuousMountainCar": ".classic_control",
+    "Acrobot": ".classic_control",
+    "Catch": ".bsuite",
+    "DeepSea": ".bsuite",
+    "DiscountingChain": ".bsuite",
+    "MemoryChain": ".bsuite",
+    "UmbrellaChain": ".bsuite",
+    "MNISTBandit": ".bsuite",
+    "SimpleBandit": ".bsuite",
+    "MinAsterix": ".minatar",
+    "MinBreakout": ".minatar",
+    "MinFreeway": ".minatar",
+    "MinSeaquest": ".minatar",
+    "MinSpaceInvaders": ".minatar",
+    "BernoulliBandit": ".misc",
+    "GaussianBandit": ".misc",
+    "FourRooms": ".misc",
+    "MetaMaze": ".misc",
+    "PointRobot": ".misc",
+    "Reacher": ".misc",
+    "Swimmer": ".misc",
+    "Pong": ".misc",
+}
+__getattr__ = lazy_getattr(__name__, _env_modules)
 
 
 __all__ = [
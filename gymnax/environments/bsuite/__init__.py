@@ -1,10 +1,16 @@
-from .catch import Catch
-from .deep_sea import DeepSea
-from .discounting_chain import DiscountingChain
-from .memory_chain import MemoryChain
-from .umbrella_chain import UmbrellaChain
-from .mnist import MNISTBandit
-from .bandit import SimpleBandit
+from ..lazy import lazy_getattr
+
+# Environments are imported on first access
+_env_modules = {
+    "Catch": ".catch",
+    "DeepSea": ".deep_sea",
+    "DiscountingChain": ".discounting_chain",
+    "MemoryChain": ".memory_chain",
+    "UmbrellaChain": ".umbrella_chain",
+    "MNISTBandit": ".mnist",
+    "SimpleBandit": ".bandit",
+}
+__getattr__ = lazy_getattr(__name__, _env_modules)
 
 
 __all__ = [
@@ -2,6 +2,7 @@ import jax
 import jax.numpy as jnp
 from jax import lax
 from gymnax.environments import environment, spaces
+from gymnax.environments.obs_dtype import check_obs_dtype, cast_obs, obs_space
 from typing import Tuple, Optional
 import chex
 from flax import struct
@@ -28,10 +29,14 @@ class Catch(environment.Environment):
     github.com/deepmind/bsuite/blob/master/bsuite/environments/catch.py
     """
 
-    def __init__(self, rows: int = 10, columns: int = 5):
+    def __init__(
+        self, rows: int = 10, columns: int = 5, obs_dtype: str = "float32"
+    ):
         super().__init__()
         self.rows = rows
         self.columns = columns
+        # Observation dtype - float32, bool, uint8 or bit-packed uint8
+        self.obs_dtype = check_obs_dtype(obs_dtype)
 
     @property
     def default_params(self) -> EnvParams:
@@ -99,7 +104,7 @@ class Catch(environment.Environment):
         obs = jnp.zeros((self.rows, self.columns))
         obs = obs.at[state.ball_y, state.ball_x].set(1.0)
         obs = obs.at[state.paddle_y, state.paddle_x].set(1.0)
-        return obs
+        return cast_obs(obs, self.obs_dtype)
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
         """Check whether state is terminal."""
@@ -126,7 +131,7 @@ class Catch(environment.Environment):
 
     def observation_space(self, params: EnvParams) -> spaces.Box:
         """Observation space of the environment."""
-        return spaces.Box(0, 1, (self.rows, self.columns), dtype=jnp.int_)
+        return obs_space((self.rows, self.columns), self.obs_dtype)
 
     def state_space(self, params: EnvParams) -> spaces.Dict:
         """State space of the environment."""
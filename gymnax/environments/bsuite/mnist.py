@@ -2,7 +2,8 @@ import jax
 import jax.numpy as jnp
 from jax import lax
 from gymnax.environments import environment, spaces
-from gymnax.utils.load_mnist import load_mnist
+from gymnax.utils.dataset_store import get_dataset
+from gymnax.utils.load_mnist import DEFAULT_DIRECTORY, load_mnist_split
 from typing import Tuple, Optional
 import chex
 from flax import struct
@@ -17,24 +18,36 @@ class EnvState:
 
 @struct.dataclass
 class EnvParams:
+    # Shared uint8 (N, 28, 28) device buffer and labels - start from
+    # `env.default_params` (None only allows constructing EnvParams())
+    images: Optional[chex.Array] = None
+    labels: Optional[chex.Array] = None
+    num_data: Optional[int] = None  # Sample from the first `num_data` images
     optimal_return: int = 1
     max_steps_in_episode: int = 1
 
 
 class MNISTBandit(environment.Environment):
-    def __init__(self, fraction: float = 1.0):
+    def __init__(
+        self,
+        fraction: float = 1.0,
+        split: str = "train",
+        data_dir: str = DEFAULT_DIRECTORY,
+        source_dir: Optional[str] = None,
+    ):
         super().__init__()
-        # Load the image MNIST data at environment init
-        (images, labels), _ = load_mnist()
-        self.num_data = int(fraction * len(labels))
-        self.image_shape = images.shape[1:]
-        self.images = jnp.array(images[: self.num_data])
-        self.labels = jnp.array(labels[: self.num_data])
+        # One uint8 device buffer per split, shared by all instances
+        self.images, self.labels = get_dataset(
+            f"mnist-{split}-{data_dir}",
+            lambda: load_mnist_split(split, data_dir, source_dir),
+        )
+        self.num_data = int(fraction * len(self.labels))
+        self.image_shape = self.images.shape[1:]
 
     @property
     def default_params(self) -> EnvParams:
-        # Default environment parameters
-        return EnvParams()
+        # Default environment parameters - data is passed as argument
+        return EnvParams(self.images, self.labels, self.num_data)
 
     def step_env(
         self, key: chex.PRNGKey, state: EnvState, action: int, params: EnvParams
@@ -63,9 +76,18 @@ class MNISTBandit(environment.Environment):
         self, key: chex.PRNGKey, params: EnvParams
     ) -> Tuple[chex.Array, EnvState]:
         """Reset environment state by sampling initial position."""
-        idx = jax.random.randint(key, minval=0, maxval=self.num_data, shape=())
-        image = self.images[idx].astype(jnp.float32) / 255
-        state = EnvState(self.labels[idx], 0.0, 0)
+        if params.images is None or params.num_data is None:
+            # Falling back to self.images would bake the data into the HLO
+            raise ValueError(
+                "MNISTBandit params need the dataset, use"
+                " `env.default_params.replace(...)`."
+            )
+        idx = jax.random.randint(
+            key, minval=0, maxval=params.num_data, shape=()
+        )
+        # Normalize only the gathered image
+        image = params.images[idx].astype(jnp.float32) / 255
+        state = EnvState(params.labels[idx], 0.0, 0)
         return image, state
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
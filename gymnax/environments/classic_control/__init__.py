@@ -1,8 +1,14 @@
-from .pendulum import Pendulum
-from .cartpole import CartPole
-from .mountain_car import MountainCar
-from .continuous_mountain_car import ContinuousMountainCar
-from .acrobot import Acrobot
+from ..lazy import lazy_getattr
+
+# Environments are imported on first access
+_env_modules = {
+    "Pendulum": ".pendulum",
+    "CartPole": ".cartpole",
+    "MountainCar": ".mountain_car",
+    "ContinuousMountainCar": ".continuous_mountain_car",
+    "Acrobot": ".acrobot",
+}
+__getattr__ = lazy_getattr(__name__, _env_modules)
 
 
 __all__ = [
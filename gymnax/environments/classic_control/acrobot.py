@@ -33,13 +33,15 @@ class EnvParams:
     max_steps_in_episode: int = 500
 
 
-class Acrobot(environment.Environment):
+class Acrobot(environment.BatchedEnvironment):
     """
     JAX Compatible version of Acrobot-v1 OpenAI gym environment. Source:
     github.com/openai/gym/blob/master/gym/envs/classic_control/acrobot.py
     Note that we only implement the default 'book' version.
     """
 
+    elementwise_step = True
+
     def __init__(self):
         super().__init__()
         self.obs_shape = (6,)
@@ -61,7 +63,7 @@ class Acrobot(environment.Environment):
         # Add noise to force action - always sample - conditionals in JAX
         torque = torque + jax.random.uniform(
             key,
-            shape=(),
+            shape=jnp.shape(action),
             minval=-params.torque_noise_max,
             maxval=params.torque_noise_max,
         )
@@ -120,9 +122,19 @@ class Acrobot(environment.Environment):
         )
         return self.get_obs(state), state
 
+    def reset_env_batched(
+        self, key: chex.PRNGKey, batch_size: int, params: EnvParams
+    ) -> Tuple[chex.Array, chex.Array]:
+        """Reset a batch of environments with a single uniform draw."""
+        init_state = jax.random.uniform(
+            key, shape=(batch_size, 4), minval=-0.1, maxval=0.1
+        )
+        state = EnvState(*init_state.T, time=jnp.zeros(batch_size, jnp.int32))
+        return self.get_obs(state), self.pack_state(state)
+
     def get_obs(self, state: EnvState) -> chex.Array:
         """Return observation from raw state trafo."""
-        return jnp.array(
+        return jnp.stack(
             [
                 jnp.cos(state.joint_angle1),
                 jnp.sin(state.joint_angle1),
@@ -130,7 +142,8 @@ class Acrobot(environment.Environment):
                 jnp.sin(state.joint_angle2),
                 state.velocity_1,
                 state.velocity_2,
-            ]
+            ],
+            axis=-1,
         )
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
@@ -230,7 +243,7 @@ def dsdt(s_augmented: chex.Array, t: float, params: EnvParams) -> chex.Array:
         - phi2
     ) / (m2 * lc2 ** 2 + I2 - d2 ** 2 / d1)
     ddtheta1 = -(d2 * ddtheta2 + phi1) / d1
-    return jnp.array([dtheta1, dtheta2, ddtheta1, ddtheta2, 0.0])
+    return jnp.array([dtheta1, dtheta2, ddtheta1, ddtheta2, jnp.zeros_like(a)])
 
 
 def wrap(x: float, m: float, M: float) -> float:
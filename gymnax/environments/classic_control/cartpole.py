@@ -31,12 +31,14 @@ class EnvParams:
     max_steps_in_episode: int = 500  # v0 had only 200 steps!
 
 
-class CartPole(environment.Environment):
+class CartPole(environment.BatchedEnvironment):
     """
     JAX Compatible version of CartPole-v1 OpenAI gym environment. Source:
     github.com/openai/gym/blob/master/gym/envs/classic_control/cartpole.py
     """
 
+    elementwise_step = True
+
     def __init__(self):
         super().__init__()
         self.obs_shape = (4,)
@@ -104,9 +106,21 @@ class CartPole(environment.Environment):
         )
         return self.get_obs(state), state
 
+    def reset_env_batched(
+        self, key: chex.PRNGKey, batch_size: int, params: EnvParams
+    ) -> Tuple[chex.Array, chex.Array]:
+        """Reset a batch of environments with a single uniform draw."""
+        init_state = jax.random.uniform(
+            key, minval=-0.05, maxval=0.05, shape=(batch_size, 4)
+        )
+        state = EnvState(*init_state.T, time=jnp.zeros(batch_size, jnp.int32))
+        return self.get_obs(state), self.pack_state(state)
+
     def get_obs(self, state: EnvState) -> chex.Array:
         """Applies observation function to state."""
-        return jnp.array([state.x, state.x_dot, state.theta, state.theta_dot])
+        return jnp.stack(
+            [state.x, state.x_dot, state.theta, state.theta_dot], axis=-1
+        )
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
         """Check whether state is terminal."""
@@ -26,12 +26,14 @@ class EnvParams:
     max_steps_in_episode: int = 200
 
 
-class MountainCar(environment.Environment):
+class MountainCar(environment.BatchedEnvironment):
     """
     JAX Compatible  version of MountainCar-v0 OpenAI gym environment. Source:
     github.com/openai/gym/blob/master/gym/envs/classic_control/mountain_car.py
     """
 
+    elementwise_step = True
+
     def __init__(self):
         super().__init__()
 
@@ -78,9 +80,23 @@ class MountainCar(environment.Environment):
         state = EnvState(position=init_state, velocity=0.0, time=0)
         return self.get_obs(state), state
 
+    def reset_env_batched(
+        self, key: chex.PRNGKey, batch_size: int, params: EnvParams
+    ) -> Tuple[chex.Array, chex.Array]:
+        """Reset a batch of environments with a single uniform draw."""
+        init_state = jax.random.uniform(
+            key, shape=(batch_size,), minval=-0.6, maxval=-0.4
+        )
+        state = EnvState(
+            position=init_state,
+            velocity=jnp.zeros(batch_size),
+            time=jnp.zeros(batch_size, jnp.int32),
+        )
+        return self.get_obs(state), self.pack_state(state)
+
     def get_obs(self, state: EnvState) -> chex.Array:
         """Return observation from raw state trafo."""
-        return jnp.array([state.position, state.velocity])
+        return jnp.stack([state.position, state.velocity], axis=-1)
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
         """Check whether state is terminal."""
@@ -1,8 +1,15 @@
 import jax
+import jax.numpy as jnp
+import numpy as np
 import chex
+import copy
 from typing import Tuple, Union, Optional
 from functools import partial
 from flax import struct
+from gymnax.environments.profiling import stage
+
+
+RESET_STRATEGIES = ("eager", "cond", "pool")
 
 
 @struct.dataclass
@@ -15,14 +22,111 @@ class EnvParams:
     max_steps_in_episode: int
 
 
+class CompiledEnv(object):
+    """AOT-compiled (optionally batched) step/reset of an environment."""
+
+    def __init__(self, step, reset, batch_size: Optional[int]):
+        self.step = step
+        self.reset = reset
+        self.batch_size = batch_size
+
+
+@struct.dataclass
+class ResetPoolState:
+    env_state: EnvState
+    pool_obs: chex.Array
+    pool_state: EnvState
+    pool_index: int
+
+
 class Environment(object):
     """Jittable abstract base class for all gymnax Environments."""
 
+    # Auto-reset strategy used by `step` - see `with_reset_strategy`
+    reset_strategy: str = "eager"
+    reset_pool_size: int = 16
+
     @property
     def default_params(self) -> EnvParams:
         return EnvParams()
 
+    def with_reset_strategy(
+        self, strategy: str = "eager", pool_size: int = 16
+    ) -> "Environment":
+        """Return a copy of the environment using a different auto-reset.
+
+        - "eager": Call `reset_env` at every step and select the reset state
+          on termination (default, original behaviour).
+        - "cond": Only call `reset_env` on termination via `lax.cond`. Note
+          that under `vmap` the condition is batched and XLA executes both
+          branches, so this mainly pays off for unbatched/scanned rollouts.
+        - "pool": Pre-sample `pool_size` reset states in `reset` and store
+          them as a ring buffer in the carried state (`ResetPoolState`). On
+          termination the next pool entry is used, so episodes cycle through
+          the `pool_size` initial conditions.
+        A copy is returned since `step`/`reset` are jitted with the env
+        instance as static argument and cache on it.
+        """
+        if strategy not in RESET_STRATEGIES:
+            raise ValueError(
+                f"{strategy} is not a valid reset strategy {RESET_STRATEGIES}."
+            )
+        if pool_size < 1:
+            raise ValueError("Reset pool needs to hold at least one state.")
+        env = copy.copy(self)
+        env.reset_strategy = strategy
+        env.reset_pool_size = pool_size
+        return env
+
+    def compile(
+        self,
+        batch_size: Optional[int] = None,
+        params: Optional[EnvParams] = None,
+    ) -> CompiledEnv:
+        """Lower and compile `step`/`reset` ahead of time.
+
+        Returns executables for a single env or a vmapped batch of
+        `batch_size` envs (keys, states and actions with a leading batch
+        axis, shared `params`). The executables are stored in JAX's
+        persistent compilation cache if it was enabled, e.g. with
+        `gymnax.compilation.enable_compilation_cache`.
+        """
+        step_fn, reset_fn, (key, state, action, params) = self.abstract_inputs(
+            batch_size, params
+        )
+        step = jax.jit(step_fn).lower(key, state, action, params).compile()
+        reset = jax.jit(reset_fn).lower(key, params).compile()
+        return CompiledEnv(step, reset, batch_size)
+
+    def abstract_inputs(
+        self,
+        batch_size: Optional[int] = None,
+        params: Optional[EnvParams] = None,
+    ):
+        """Return `step`/`reset` and abstract `(key, state, action, params)`.
+
+        The functions are vmapped over `batch_size` envs with shared
+        `params` if given. Key, state and action are `ShapeDtypeStruct`s,
+        e.g. to lower `step_fn(key, state, action, params)` and
+        `reset_fn(key, params)` without running the environment.
+        """
+        if params is None:
+            params = self.default_params
+        step_fn, reset_fn = self.step, self.reset
+        sample_fn = self.action_space(params).sample
+        key = jax.random.PRNGKey(0)
+        if batch_size is not None:
+            step_fn = jax.vmap(step_fn, in_axes=(0, 0, 0, None))
+            reset_fn = jax.vmap(reset_fn, in_axes=(0, None))
+            sample_fn = jax.vmap(sample_fn)
+            key = jax.random.split(key, batch_size)
+        key = jax.ShapeDtypeStruct(key.shape, key.dtype)
+        _, state = jax.eval_shape(reset_fn, key, params)
+        action = jax.eval_shape(sample_fn, key)
+        return step_fn, reset_fn, (key, state, action, params)
+
     @partial(jax.jit, static_argnums=(0,))
+    @stage("step")
     def step(
         self,
         key: chex.PRNGKey,
@@ -35,18 +139,35 @@ class Environment(object):
         if params is None:
             params = self.default_params
         key, key_reset = jax.random.split(key)
-        obs_st, state_st, reward, done, info = self.step_env(
+        if self.reset_strategy == "pool":
+            return self._step_pool(key, state, action, params)
+        obs_st, state_st, reward, done, info = stage("step_env")(self.step_env)(
             key, state, action, params
         )
-        obs_re, state_re = self.reset_env(key_reset, params)
+        if self.reset_strategy == "cond":
+            # Only evaluate reset branch if the episode terminated
+            obs, state = jax.lax.cond(
+                done,
+                lambda: self._reset_like(key_reset, params, obs_st, state_st),
+                lambda: (obs_st, state_st),
+            )
+            return obs, state, reward, done, info
+        obs_re, state_re = stage("reset_env")(self.reset_env)(key_reset, params)
         # Auto-reset environment based on termination
-        state = jax.tree_map(
-            lambda x, y: jax.lax.select(done, x, y), state_re, state_st
+        obs, state = stage("auto_reset")(self._select_reset)(
+            done, (obs_re, state_re), (obs_st, state_st)
         )
-        obs = jax.lax.select(done, obs_re, obs_st)
         return obs, state, reward, done, info
 
+    @staticmethod
+    def _select_reset(done: bool, reset_outputs, step_outputs):
+        """Select the reset observation and state on termination."""
+        return jax.tree_map(
+            lambda x, y: jax.lax.select(done, x, y), reset_outputs, step_outputs
+        )
+
     @partial(jax.jit, static_argnums=(0,))
+    @stage("reset")
     def reset(
         self, key: chex.PRNGKey, params: Optional[EnvParams] = None
     ) -> Tuple[chex.Array, EnvState]:
@@ -54,9 +175,52 @@ class Environment(object):
         # Use default env parameters if no others specified
         if params is None:
             params = self.default_params
-        obs, state = self.reset_env(key, params)
+        if self.reset_strategy == "pool":
+            key, key_pool = jax.random.split(key)
+            obs, state = self.reset_env(key, params)
+            pool_obs, pool_state = jax.vmap(self.reset_env, in_axes=(0, None))(
+                jax.random.split(key_pool, self.reset_pool_size), params
+            )
+            return obs, ResetPoolState(state, pool_obs, pool_state, 0)
+        obs, state = stage("reset_env")(self.reset_env)(key, params)
         return obs, state
 
+    def _step_pool(
+        self,
+        key: chex.PRNGKey,
+        state: ResetPoolState,
+        action: Union[int, float],
+        params: EnvParams,
+    ) -> Tuple[chex.Array, ResetPoolState, float, bool, dict]:
+        """Step transition that resets from the carried ring buffer."""
+        obs_st, state_st, reward, done, info = stage("step_env")(self.step_env)(
+            key, state.env_state, action, params
+        )
+        obs_re, state_re = jax.tree_map(
+            lambda x: x[state.pool_index], (state.pool_obs, state.pool_state)
+        )
+        obs, env_state = stage("auto_reset")(self._select_reset)(
+            done, (obs_re, state_re), (obs_st, state_st)
+        )
+        pool_index = (state.pool_index + done) % self.reset_pool_size
+        state = state.replace(env_state=env_state, pool_index=pool_index)
+        return obs, state, reward, done, info
+
+    def _reset_like(
+        self,
+        key: chex.PRNGKey,
+        params: EnvParams,
+        obs: chex.Array,
+        state: EnvState,
+    ) -> Tuple[chex.Array, EnvState]:
+        """Reset and cast outputs to the dtypes of a step transition."""
+        obs_re, state_re = self.reset_env(key, params)
+        return jax.tree_map(
+            lambda x, y: jnp.asarray(x, dtype=y.dtype),
+            (obs_re, state_re),
+            (obs, state),
+        )
+
     def step_env(
         self,
         key: chex.PRNGKey,
@@ -83,7 +247,7 @@ class Environment(object):
 
     def discount(self, state: EnvState, params: EnvParams) -> float:
         """Return a discount of zero if the episode has terminated."""
-        return jax.lax.select(self.is_terminal(state, params), 0.0, 1.0)
+        return jnp.where(self.is_terminal(state, params), 0.0, 1.0)
 
     @property
     def name(self) -> str:
@@ -106,3 +270,175 @@ class Environment(object):
     def state_space(self, params: EnvParams):
         """State space of the environment."""
         raise NotImplementedError
+
+
+class BatchedEnvironment(Environment):
+    """Environment stepping a batch of states packed into two matrices.
+
+    The packed state `(floats, ints)` holds the flattened float leaves of one
+    `EnvState` per row of `floats` ([B, F_float]) and the integer and boolean
+    leaves per row of `ints` ([B, F_int]), so that every column keeps an exact
+    dtype (see `pack_state`/`unpack_state`). Environments can implement
+    native `step_env_batched`/`reset_env_batched` operating on whole columns,
+    otherwise `step_env`/`reset_env` are vmapped over the unpacked states.
+    The per-env `step`/`reset` API is unchanged.
+    """
+
+    # `step_env` only uses elementwise ops on the state fields, so that it is
+    # applied to the columns of the packed state directly instead of vmapped
+    elementwise_step: bool = False
+
+    def _state_layout(self):
+        """Tree structure, leaf shapes/dtypes and dtypes of packed states."""
+        if not hasattr(self, "_layout"):
+            _, state = jax.eval_shape(
+                self.reset_env, jax.random.PRNGKey(0), self.default_params
+            )
+            leaves, treedef = jax.tree_util.tree_flatten(state)
+            shapes = [x.shape for x in leaves]
+            dtypes = [jnp.dtype(x.dtype) for x in leaves]
+            # Each matrix has the dtype of its widest leaves
+            is_float = [jnp.issubdtype(d, jnp.floating) for d in dtypes]
+            float_bits = max(
+                [8 * d.itemsize for d, f in zip(dtypes, is_float) if f],
+                default=32,
+            )
+            int_bits = max(
+                [8 * d.itemsize for d, f in zip(dtypes, is_float) if not f],
+                default=8,
+            )
+            packed_dtypes = (
+                jnp.dtype(f"float{float_bits}"),
+                jnp.dtype(f"int{int_bits}"),
+            )
+            self._layout = treedef, shapes, dtypes, packed_dtypes
+        return self._layout
+
+    def pack_state(self, state: EnvState) -> Tuple[chex.Array, chex.Array]:
+        """Concatenate the (batched) state leaves into float/int columns."""
+        _, shapes, dtypes, packed_dtypes = self._state_layout()
+        leaves = jax.tree_util.tree_leaves(state)
+        batch_shape = leaves[0].shape[: leaves[0].ndim - len(shapes[0])]
+        columns = ([], [])
+        for x, shape, dtype in zip(leaves, shapes, dtypes):
+            is_int = not jnp.issubdtype(dtype, jnp.floating)
+            columns[is_int].append(
+                jnp.reshape(x, batch_shape + (-1,)).astype(
+                    packed_dtypes[is_int]
+                )
+            )
+        return tuple(
+            jnp.concatenate(
+                [jnp.zeros(batch_shape + (0,), dtype)] + block, axis=-1
+            )
+            for block, dtype in zip(columns, packed_dtypes)
+        )
+
+    def unpack_state(self, state: Tuple[chex.Array, chex.Array]) -> EnvState:
+        """Split packed float/int columns into a (batched) `EnvState`."""
+        treedef, shapes, dtypes, _ = self._state_layout()
+        offsets = [0, 0]
+        leaves = []
+        for shape, dtype in zip(shapes, dtypes):
+            is_int = not jnp.issubdtype(dtype, jnp.floating)
+            size = int(np.prod(shape))
+            x = state[is_int][..., offsets[is_int] : offsets[is_int] + size]
+            offsets[is_int] += size
+            leaves.append(jnp.reshape(x, x.shape[:-1] + shape).astype(dtype))
+        return jax.tree_util.tree_unflatten(treedef, leaves)
+
+    @partial(jax.jit, static_argnums=(0,))
+    @stage("step_batched")
+    def step_batched(
+        self,
+        key: chex.PRNGKey,
+        state: Tuple[chex.Array, chex.Array],
+        action: chex.Array,
+        params: Optional[EnvParams] = None,
+    ) -> Tuple[
+        chex.Array, Tuple[chex.Array, chex.Array], chex.Array, chex.Array, dict
+    ]:
+        """Performs step transitions of a packed batch of states.
+
+        Takes a single key for the whole batch. Terminated rows are always
+        reset eagerly with one select per packed matrix.
+        """
+        if params is None:
+            params = self.default_params
+        key, key_reset = jax.random.split(key)
+        obs_st, state_st, reward, done, info = stage("step_env")(
+            self.step_env_batched
+        )(key, state, action, params)
+        obs_re, state_re = stage("reset_env")(self.reset_env_batched)(
+            key_reset, state[0].shape[0], params
+        )
+        obs, state = stage("auto_reset")(self._select_reset_batched)(
+            done, (obs_re, state_re), (obs_st, state_st)
+        )
+        return obs, state, reward, done, info
+
+    @staticmethod
+    def _select_reset_batched(done: chex.Array, reset_outputs, step_outputs):
+        """Select the reset rows of the batched outputs on termination."""
+        return jax.tree_map(
+            lambda x, y: jnp.where(
+                jnp.expand_dims(done, tuple(range(1, x.ndim))), x, y
+            ),
+            reset_outputs,
+            step_outputs,
+        )
+
+    @partial(jax.jit, static_argnums=(0, 2))
+    @stage("reset_batched")
+    def reset_batched(
+        self,
+        key: chex.PRNGKey,
+        batch_size: int,
+        params: Optional[EnvParams] = None,
+    ) -> Tuple[chex.Array, Tuple[chex.Array, chex.Array]]:
+        """Performs resetting of a batch of `batch_size` environments."""
+        if params is None:
+            params = self.default_params
+        return stage("reset_env")(self.reset_env_batched)(
+            key, batch_size, params
+        )
+
+    def step_env_batched(
+        self,
+        key: chex.PRNGKey,
+        state: Tuple[chex.Array, chex.Array],
+        action: chex.Array,
+        params: EnvParams,
+    ) -> Tuple[
+        chex.Array, Tuple[chex.Array, chex.Array], chex.Array, chex.Array, dict
+    ]:
+        """Batched step transition, defaults to `step_env` on the columns."""
+        batch_size = state[0].shape[0]
+        if self.elementwise_step:
+            obs, state, reward, done, info = self.step_env(
+                key, self.unpack_state(state), action, params
+            )
+        else:
+            obs, state, reward, done, info = jax.vmap(
+                self.step_env, in_axes=(0, 0, 0, None)
+            )(
+                jax.random.split(key, batch_size),
+                self.unpack_state(state),
+                action,
+                params,
+            )
+        # Scalar rewards/infos of elementwise steps are shared by all rows
+        reward, done, info = jax.tree_map(
+            lambda x: jnp.broadcast_to(x, (batch_size,) + jnp.shape(x)[1:]),
+            (reward, done, info),
+        )
+        return obs, self.pack_state(state), reward, done, info
+
+    def reset_env_batched(
+        self, key: chex.PRNGKey, batch_size: int, params: EnvParams
+    ) -> Tuple[chex.Array, Tuple[chex.Array, chex.Array]]:
+        """Batched reset, defaults to vmapping `reset_env`."""
+        obs, state = jax.vmap(self.reset_env, in_axes=(0, None))(
+            jax.random.split(key, batch_size), params
+        )
+        return obs, self.pack_state(state)
@@ -0,0 +1,20 @@
+import importlib
+from typing import Callable, Dict
+
+
+def lazy_getattr(package: str, attr_modules: Dict[str, str]) -> Callable:
+    """Module `__getattr__` importing attributes from submodules on access.
+
+    Keeps `import gymnax` cheap - environments (and their dependencies) are
+    only imported once they are used.
+    """
+
+    def __getattr__(name: str):
+        if name not in attr_modules:
+            raise AttributeError(
+                f"module {package!r} has no attribute {name!r}"
+            )
+        module = importlib.import_module(attr_modules[name], package)
+        return getattr(module, name)
+
+    return __getattr__
@@ -1,8 +1,14 @@
-from .asterix import MinAsterix
-from .breakout import MinBreakout
-from .freeway import MinFreeway
-from .seaquest import MinSeaquest
-from .space_invaders import MinSpaceInvaders
+from ..lazy import lazy_getattr
+
+# Environments are imported on first access
+_env_modules = {
+    "MinAsterix": ".asterix",
+    "MinBreakout": ".breakout",
+    "MinFreeway": ".freeway",
+    "MinSeaquest": ".seaquest",
+    "MinSpaceInvaders": ".space_invaders",
+}
+__getattr__ = lazy_getattr(__name__, _env_modules)
 
 
 __all__ = [
@@ -2,6 +2,9 @@ import jax
 import jax.numpy as jnp
 from jax import lax
 from gymnax.environments import environment, spaces
+from gymnax.environments.profiling import stage
+from gymnax.environments.minatar.render import render_grid
+from gymnax.environments.obs_dtype import check_obs_dtype, obs_space
 from typing import Tuple, Optional
 import chex
 from flax import struct
@@ -50,8 +53,12 @@ class MinAsterix(environment.Environment):
     - Actions are encoded as: ['n', 'l', 'u', 'r', 'd']
     """
 
-    def __init__(self, use_minimal_action_set: bool = True):
+    def __init__(
+        self, use_minimal_action_set: bool = True, obs_dtype: str = "float32"
+    ):
         super().__init__()
+        # Observation dtype - float32, bool, uint8 or bit-packed uint8
+        self.obs_dtype = check_obs_dtype(obs_dtype)
         self.obs_shape = (10, 10, 4)
         # Full action set: ['n','l','u','r','d','f']
         self.full_action_set = jnp.array([0, 1, 2, 3, 4, 5])
@@ -128,25 +135,32 @@ class MinAsterix(environment.Environment):
         )
         return self.get_obs(state), state
 
+    @stage("get_obs")
     def get_obs(self, state: EnvState) -> chex.Array:
         """Return observation from raw state trafo."""
-        # Add a 5th channel to help with not used entities
-        obs = jnp.zeros((10, 10, 5), dtype=bool)
-        # Set the position of the agent in the grid
-        obs = obs.at[state.player_y, state.player_x, 0].set(1)
-        # Loop over entity identities and set entity locations
-        for i in range(state.entities.shape[0]):
-            x = state.entities[i, :]
-            # Enemy channel 1, Trail channel 2, Gold channel 3, Not used 4
-            c = 3 * x[3] + 1 * (1 - x[3])
-            c_eff = c * x[4] + 4 * (1 - x[4])
-            obs = obs.at[x[1], x[0], c_eff].set(1)
-
-            back_x = (x[0] - 1) * x[2] + (x[0] + 1) * (1 - x[2])
-            leave_trail = jnp.logical_and(back_x >= 0, back_x <= 9)
-            c_eff = 2 * x[4] + 4 * (1 - x[4])
-            obs = obs.at[x[1], back_x, c_eff].set(leave_trail)
-        return obs[:, :, :4].astype(jnp.float32)
+        x, y = state.entities[:, 0], state.entities[:, 1]
+        lr, gold, filled = (
+            state.entities[:, 2],
+            state.entities[:, 3],
+            state.entities[:, 4],
+        )
+        # Enemy channel 1, Trail channel 2, Gold channel 3
+        # Not used entities are routed to channel 4 and dropped by the scatter
+        c = 3 * gold + 1 * (1 - gold)
+        c_entity = c * filled + 4 * (1 - filled)
+        back_x = (x - 1) * lr + (x + 1) * (1 - lr)
+        leave_trail = jnp.logical_and(back_x >= 0, back_x <= 9)
+        c_trail = jnp.where(leave_trail, 2 * filled + 4 * (1 - filled), 4)
+        entity_table = jnp.concatenate(
+            [
+                jnp.array([[state.player_y, state.player_x, 0]]),
+                jnp.stack([y, x, c_entity], axis=1),
+                jnp.stack([y, back_x, c_trail], axis=1),
+            ]
+        )
+        return render_grid(
+            self.obs_shape, entity_table, obs_dtype=self.obs_dtype
+        )
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
         """Check whether state is terminal."""
@@ -171,7 +185,7 @@ class MinAsterix(environment.Environment):
 
     def observation_space(self, params: EnvParams) -> spaces.Box:
         """Observation space of the environment."""
-        return spaces.Box(0, 1, self.obs_shape)
+        return obs_space(self.obs_shape, self.obs_dtype)
 
     def state_space(self, params: EnvParams) -> spaces.Dict:
         """State space of the environment."""
@@ -193,6 +207,7 @@ class MinAsterix(environment.Environment):
         )
 
 
+@stage("step_agent")
 def step_agent(state: EnvState, action: int) -> EnvState:
     """Update the position of the agent."""
     # Resolve player action via implicit conditional updates of coordinates
@@ -210,6 +225,7 @@ def step_agent(state: EnvState, action: int) -> EnvState:
     return state.replace(player_x=player_x, player_y=player_y)
 
 
+@stage("spawn_entity")
 def spawn_entity(key: chex.PRNGKey, state: EnvState) -> Tuple[chex.Array, int]:
     """Spawn new enemy or treasure at random location
     with random direction (if all rows are filled do nothing).
@@ -229,105 +245,79 @@ def spawn_entity(key: chex.PRNGKey, state: EnvState) -> Tuple[chex.Array, int]:
     # Check if element is free with while loop and stop if position is found
     # or all elements have been checked
     state_entities = state.entities[:, 4]  # Only use col 4 indicating free
-    slot, free = while_sample_slots(key_slot, state_entities)
+    slot, free = sample_slot(key_slot, state_entities)
     entity = jnp.array([x, slot + 1, lr, is_gold, free])
     return entity, slot
 
 
-def while_sample_slots(
+def sample_slot(
     key: chex.PRNGKey, state_entities: chex.Array
 ) -> Tuple[int, int]:
-    """Go through random order of slots until slot is found that is free."""
-    init_val = jnp.array([0, 0])
+    """Pick first free slot in a random order of slots via argmax."""
     # Sample random order of slot entries to go through - hack around jnp.where
     order_to_go_through = jax.random.permutation(key, jnp.arange(8))
-    perm_entities = state_entities[order_to_go_through]
-
-    def condition_to_check(val):
-        # Check if we haven't gone through all possible slots and whether free
-        return jnp.logical_and(val[0] < 7, val[1] == 0)
-
-    def update(val):
-        # Increase list counter - slot that has been checked
-        val = val.at[0].set(val[0] + 1)
-        # Check if slot is still free
-        free = perm_entities[val[0]] == 0
-        val = val.at[1].set(free)
-        return val
-
-    id_and_free = jax.lax.while_loop(condition_to_check, update, init_val)
-    # Return slot id and whether it is free
-    slot_id = order_to_go_through[id_and_free[0]]
-    free_slot = id_and_free[1]
-    return slot_id, free_slot
+    perm_free = state_entities[order_to_go_through] == 0
+    # Note: The first permuted slot is never checked (kept for consistency)
+    perm_free = perm_free.at[0].set(False)
+    free_slot = perm_free.any()
+    # Fall back to the last permuted slot if no slot is free
+    slot_idx = jax.lax.select(free_slot, jnp.argmax(perm_free), 7)
+    slot_id = order_to_go_through[slot_idx]
+    return slot_id, free_slot.astype(jnp.int32)
 
 
+@stage("step_entities")
 def step_entities(state: EnvState) -> Tuple[EnvState, float, bool]:
     """Update positions of the entities and return reward, done."""
-    done, reward = 0, 0
-    # Loop over entities and check for collisions - either gold or enemy
+    # Check collisions of all entities - either gold or enemy
     entities = state.entities
-    for i in range(8):
-        x = entities[i]
-        slot_filled = x[4] != 0
-        # Get boolean for any collision with either gold or enemy
-        coords = jnp.logical_and(x[0] == state.player_x, x[1] == state.player_y)
-        collision = jnp.logical_and(coords, slot_filled)
-        # If collision with gold: empty gold and give positive reward
-        collision_gold = jnp.logical_and(collision, x[3])
-        reward += collision_gold
-        # Set row i to zeros if collision with gold
-        entities = entities.at[i].set(x * (1 - collision_gold))
-
-        # If collision with enemy: terminate the episode
-        collision_enemy = jnp.logical_and(collision, 1 - x[3])
-        done += collision_enemy
-
-    # Loop over entities and move them in direction
+    slot_filled = entities[:, 4] != 0
+    is_gold = entities[:, 3] != 0
+    coords = jnp.logical_and(
+        entities[:, 0] == state.player_x, entities[:, 1] == state.player_y
+    )
+    collision = jnp.logical_and(coords, slot_filled)
+    # If collision with gold: empty gold and give positive reward
+    collision_gold = jnp.logical_and(collision, is_gold)
+    reward = collision_gold.sum()
+    entities = entities * (1 - collision_gold[:, None])
+    # If collision with enemy: terminate the episode
+    done = jnp.logical_and(collision, ~is_gold).any()
+
+    # Move all entities in their direction
     time_to_move = state.move_timer == 0
     move_timer = jax.lax.select(
         time_to_move, state.move_speed, state.move_timer
     )
-
-    old_entities = entities
-    for i in range(8):
-        x = entities[i]
-        slot_filled = x[4] != 0
-        lr = x[2]
-        # Update position left and right move
-        x = x.at[0].set(
-            jax.lax.select(slot_filled, x[0] + 1 * lr - 1 * (1 - lr), x[0])
-        )
-
-        # Update if entity moves out of the frame - reset everything to zeros
-        outside_of_frame = jnp.logical_or(x[0] < 0, x[0] > 9)
-        entities = jax.lax.select(
-            time_to_move,
-            entities.at[i].set(x * slot_filled * (1 - outside_of_frame)),
-            old_entities,
-        )
-
-        # Update if entity moves into the player after its state is updated
-        coords = jnp.logical_and(x[0] == state.player_x, x[1] == state.player_y)
-        collision = jnp.logical_and(coords, slot_filled)
-        # If collision with gold: empty gold and give positive reward
-        collision_gold = jnp.logical_and(collision, x[3])
-        reward += jax.lax.select(time_to_move, collision_gold, False) * 1
-        entities = jax.lax.select(
-            time_to_move,
-            entities.at[i].set(entities[i] * (1 - collision_gold)),
-            old_entities,
-        )
-        # If collision with enemy: terminate the episode
-        collision_enemy = jnp.logical_and(collision, 1 - x[3])
-        done += jax.lax.select(time_to_move, collision_enemy, False)
+    slot_filled = entities[:, 4] != 0
+    lr = entities[:, 2]
+    new_x = jnp.where(
+        slot_filled, entities[:, 0] + 1 * lr - 1 * (1 - lr), entities[:, 0]
+    )
+    # Update if entity moves out of the frame - reset everything to zeros
+    outside_of_frame = jnp.logical_or(new_x < 0, new_x > 9)
+    # Update if entity moves into the player after its state is updated
+    coords = jnp.logical_and(
+        new_x == state.player_x, entities[:, 1] == state.player_y
+    )
+    collision = jnp.logical_and(coords, slot_filled)
+    collision_gold = jnp.logical_and(collision, is_gold)
+    collision_enemy = jnp.logical_and(collision, ~is_gold)
+    keep = slot_filled & ~outside_of_frame & ~collision_gold
+    moved_entities = entities.at[:, 0].set(new_x) * keep[:, None]
+    entities = jax.lax.select(time_to_move, moved_entities, entities)
+    reward += jnp.logical_and(time_to_move, collision_gold).sum()
+    done = jnp.logical_or(
+        done, jnp.logical_and(time_to_move, collision_enemy).any()
+    )
     return (
         state.replace(entities=entities, move_timer=move_timer),
         reward,
-        done > 0,
+        done,
     )
 
 
+@stage("step_timers")
 def step_timers(state: EnvState, params: EnvParams) -> EnvState:
     # Update various timers and check the ramping condition
     spawn_timer = state.spawn_timer - 1
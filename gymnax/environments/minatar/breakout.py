@@ -2,6 +2,9 @@ import jax
 import jax.numpy as jnp
 from jax import lax
 from gymnax.environments import environment, spaces
+from gymnax.environments.profiling import stage
+from gymnax.environments.minatar.render import render_grid
+from gymnax.environments.obs_dtype import check_obs_dtype, obs_space
 from typing import Tuple, Optional
 import chex
 from flax import struct
@@ -13,7 +16,7 @@ class EnvState:
     ball_x: int
     ball_dir: int
     pos: int
-    brick_map: chex.Array
+    brick_mask: int
     strike: bool
     last_y: int
     last_x: int
@@ -26,6 +29,36 @@ class EnvParams:
     max_steps_in_episode: int = 1000
 
 
+# Bricks only exist in rows 1-3, stored as 30-bit mask (bit (y - 1) * 10 + x)
+BRICK_ROWS = (1, 4)
+FULL_BRICK_MASK = 2**30 - 1
+# Ball (dx, dy) for the diagonal directions 0-3
+BALL_MOVES = jnp.array([[-1, -1], [1, -1], [1, 1], [-1, 1]])
+# Direction after a bounce: none, x-border, y-border/brick/paddle, paddle edge
+NO_BOUNCE, BOUNCE_X, BOUNCE_Y, BOUNCE_PADDLE = 0, 1, 2, 3
+BOUNCE_TABLE = jnp.array(
+    [[0, 1, 2, 3], [1, 0, 3, 2], [3, 2, 1, 0], [2, 3, 0, 1]]
+)
+# Paddle x-movement for the full action set ['n','l','u','r','d','f']
+PADDLE_MOVES = jnp.array([0, -1, 0, 1, 0, 0])
+
+
+def pack_bricks(brick_map: chex.Array) -> chex.Array:
+    """Encode a (10, 10) brick map as bitmask integer."""
+    bricks = jnp.asarray(brick_map)[BRICK_ROWS[0] : BRICK_ROWS[1]].reshape(-1)
+    bits = jnp.left_shift(1, jnp.arange(bricks.shape[0]))
+    return jnp.sum(jnp.where(bricks != 0, bits, 0)).astype(jnp.int32)
+
+
+def unpack_bricks(brick_mask: int) -> chex.Array:
+    """Decode the bitmask into a boolean (10, 10) brick map."""
+    bits = jnp.right_shift(brick_mask, jnp.arange(30)) & 1
+    brick_map = jnp.zeros((10, 10), dtype=bool)
+    return brick_map.at[BRICK_ROWS[0] : BRICK_ROWS[1]].set(
+        bits.reshape(3, 10).astype(bool)
+    )
+
+
 class MinBreakout(environment.Environment):
     """
     JAX Compatible version of Breakout MinAtar environment. Source:
@@ -45,8 +78,12 @@ class MinBreakout(environment.Environment):
     - Actions are encoded as follows: ['n','l','r']
     """
 
-    def __init__(self, use_minimal_action_set: bool = True):
+    def __init__(
+        self, use_minimal_action_set: bool = True, obs_dtype: str = "float32"
+    ):
         super().__init__()
+        # Observation dtype - float32, bool, uint8 or bit-packed uint8
+        self.obs_dtype = check_obs_dtype(obs_dtype)
         self.obs_shape = (10, 10, 4)
         # Full action set: ['n','l','u','r','d','f']
         self.full_action_set = jnp.array([0, 1, 2, 3, 4, 5])
@@ -99,7 +136,7 @@ class MinBreakout(environment.Environment):
             ball_x=jnp.array([0, 9])[ball_start],
             ball_dir=jnp.array([2, 3])[ball_start],
             pos=4,
-            brick_map=jnp.zeros((10, 10)).at[1:4, :].set(1),
+            brick_mask=jnp.int32(FULL_BRICK_MASK),
             strike=False,
             last_y=3,
             last_x=jnp.array([0, 9])[ball_start],
@@ -108,15 +145,23 @@ class MinBreakout(environment.Environment):
         )
         return self.get_obs(state), state
 
+    @stage("get_obs")
     def get_obs(self, state: EnvState) -> chex.Array:
         """Return observation from raw state trafo."""
-        obs = jnp.zeros(self.obs_shape, dtype=bool)
         # Set the position of the player paddle, paddle, trail & brick map
-        obs = obs.at[9, state.pos, 0].set(1)
-        obs = obs.at[state.ball_y, state.ball_x, 1].set(1)
-        obs = obs.at[state.last_y, state.last_x, 2].set(1)
-        obs = obs.at[:, :, 3].set(state.brick_map)
-        return obs.astype(jnp.float32)
+        entity_table = jnp.array(
+            [
+                [9, state.pos, 0],
+                [state.ball_y, state.ball_x, 1],
+                [state.last_y, state.last_x, 2],
+            ]
+        )
+        return render_grid(
+            self.obs_shape,
+            entity_table,
+            {3: unpack_bricks(state.brick_mask)},
+            obs_dtype=self.obs_dtype,
+        )
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
         """Check whether state is terminal."""
@@ -141,7 +186,7 @@ class MinBreakout(environment.Environment):
 
     def observation_space(self, params: EnvParams) -> spaces.Box:
         """Observation space of the environment."""
-        return spaces.Box(0, 1, self.obs_shape)
+        return obs_space(self.obs_shape, self.obs_dtype)
 
     def state_space(self, params: EnvParams) -> spaces.Dict:
         """State space of the environment."""
@@ -151,7 +196,7 @@ class MinBreakout(environment.Environment):
                 "ball_x": spaces.Discrete(10),
                 "ball_dir": spaces.Discrete(10),
                 "pos": spaces.Discrete(10),
-                "brick_map": spaces.Box(0, 1, (10, 10)),
+                "brick_mask": spaces.Discrete(FULL_BRICK_MASK + 1),
                 "strike": spaces.Discrete(2),
                 "last_y": spaces.Discrete(10),
                 "last_x": spaces.Discrete(10),
@@ -161,48 +206,25 @@ class MinBreakout(environment.Environment):
         )
 
 
+@stage("step_agent")
 def step_agent(state: EnvState, action: int) -> Tuple[EnvState, int, int]:
     """Helper that steps the agent and checks boundary conditions."""
     # Update player position
-    pos = (
-        # Action left & border condition
-        jnp.maximum(0, state.pos - 1) * (action == 1)
-        # Action right & border condition
-        + jnp.minimum(9, state.pos + 1) * (action == 3)
-        # Don't move player if not l/r chosen
-        + state.pos * jnp.logical_and(action != 1, action != 3)
-    )
+    pos = jnp.clip(state.pos + PADDLE_MOVES[action], 0, 9)
 
     # Update ball position - based on direction of movement
-    last_x = state.ball_x
-    last_y = state.ball_y
-    new_x = (
-        (state.ball_x - 1) * (state.ball_dir == 0)
-        + (state.ball_x + 1) * (state.ball_dir == 1)
-        + (state.ball_x + 1) * (state.ball_dir == 2)
-        + (state.ball_x - 1) * (state.ball_dir == 3)
-    )
-    new_y = (
-        (state.ball_y - 1) * (state.ball_dir == 0)
-        + (state.ball_y - 1) * (state.ball_dir == 1)
-        + (state.ball_y + 1) * (state.ball_dir == 2)
-        + (state.ball_y + 1) * (state.ball_dir == 3)
-    )
+    move = BALL_MOVES[state.ball_dir]
+    new_x, new_y = state.ball_x + move[0], state.ball_y + move[1]
 
-    # Boundary conditions for x position
-    border_cond_x = jnp.logical_or(new_x < 0, new_x > 9)
-    new_x = jax.lax.select(
-        border_cond_x, (0 * (new_x < 0) + 9 * (new_x > 9)), new_x
-    )
     # Reflect ball direction if bounced off at x border
-    ball_dir = jax.lax.select(
-        border_cond_x, jnp.array([1, 0, 3, 2])[state.ball_dir], state.ball_dir
-    )
+    border_cond_x = jnp.logical_or(new_x < 0, new_x > 9)
+    new_x = jnp.clip(new_x, 0, 9)
+    ball_dir = BOUNCE_TABLE[BOUNCE_X * border_cond_x, state.ball_dir]
     return (
         state.replace(
             pos=pos,
-            last_x=last_x,
-            last_y=last_y,
+            last_x=state.ball_x,
+            last_y=state.ball_y,
             ball_dir=ball_dir,
         ),
         new_x,
@@ -210,72 +232,63 @@ def step_agent(state: EnvState, action: int) -> Tuple[EnvState, int, int]:
     )
 
 
+@stage("step_ball_brick")
 def step_ball_brick(
     state: EnvState, new_x: int, new_y: int
 ) -> Tuple[EnvState, float]:
-    """Helper that computes reward and termination cond. from brickmap."""
-    reward = 0
-
-    # Reflect ball direction if bounced off at y border
-    border_cond1_y = new_y < 0
-    new_y = lax.select(border_cond1_y, 0, new_y)
-    ball_dir = lax.select(
-        border_cond1_y, jnp.array([3, 2, 1, 0])[state.ball_dir], state.ball_dir
-    )
-
-    # 1st NASTY ELIF BEGINS HERE... = Brick collision
-    strike_toggle = jnp.logical_and(
-        1 - border_cond1_y, state.brick_map[new_y, new_x] == 1
-    )
-    strike_bool = jnp.logical_and((1 - state.strike), strike_toggle)
-    reward += strike_bool * 1.0
-    strike = jax.lax.select(strike_toggle, strike_bool, False)
+    """Helper that computes reward and termination cond. from brickmap.
 
-    brick_map = jax.lax.select(
-        strike_bool, state.brick_map.at[new_y, new_x].set(0), state.brick_map
-    )
-    new_y = jax.lax.select(strike_bool, state.last_y, new_y)
-    ball_dir = jax.lax.select(
-        strike_bool, jnp.array([3, 2, 1, 0])[ball_dir], ball_dir
+    The cases (top border, brick, bottom row) are mutually exclusive, so the
+    new direction is a single lookup in `BOUNCE_TABLE`.
+    """
+    # Ball bounces off the top border
+    top_cond = new_y < 0
+    new_y = jnp.maximum(new_y, 0)
+
+    # Brick collision - only remove brick/reward if not already striking
+    brick_bit = jnp.clip((new_y - BRICK_ROWS[0]) * 10 + new_x, 0, 29)
+    in_brick_rows = jnp.logical_and(
+        new_y >= BRICK_ROWS[0], new_y < BRICK_ROWS[1]
     )
-
-    # 2nd NASTY ELIF BEGINS HERE... = Wall collision
-    brick_cond = jnp.logical_and(1 - strike_toggle, new_y == 9)
-
-    # Spawn new bricks if there are no more around - everything is collected
-    spawn_bricks = jnp.logical_and(
-        brick_cond, jnp.count_nonzero(brick_map) == 0
+    strike_toggle = jnp.logical_and(
+        in_brick_rows, jnp.right_shift(state.brick_mask, brick_bit) & 1 == 1
     )
-    brick_map = jax.lax.select(
-        spawn_bricks, brick_map.at[1:4, :].set(1), brick_map
+    strike_bool = jnp.logical_and(strike_toggle, jnp.logical_not(state.strike))
+    brick_mask = jnp.where(
+        strike_bool,
+        state.brick_mask & ~jnp.left_shift(1, brick_bit),
+        state.brick_mask,
     )
 
-    # Redirect ball because it collided with old player position
+    # Ball reaches bottom row - respawn bricks if all are cleared
+    brick_cond = jnp.logical_and(jnp.logical_not(strike_toggle), new_y == 9)
+    spawn_bricks = jnp.logical_and(brick_cond, brick_mask == 0)
+    brick_mask = jnp.where(spawn_bricks, FULL_BRICK_MASK, brick_mask)
+    # Redirect ball if it collided with old or new player position
     redirect_ball1 = jnp.logical_and(brick_cond, state.ball_x == state.pos)
-    ball_dir = jax.lax.select(
-        redirect_ball1, jnp.array([3, 2, 1, 0])[ball_dir], ball_dir
+    redirect_ball2 = jnp.logical_and(
+        jnp.logical_and(brick_cond, jnp.logical_not(redirect_ball1)),
+        new_x == state.pos,
     )
-    new_y = jax.lax.select(redirect_ball1, state.last_y, new_y)
-
-    # Redirect ball because it collided with new player position
-    redirect_ball2a = jnp.logical_and(brick_cond, 1 - redirect_ball1)
-    redirect_ball2 = jnp.logical_and(redirect_ball2a, new_x == state.pos)
-    ball_dir = jax.lax.select(
-        redirect_ball2, jnp.array([2, 3, 0, 1])[ball_dir], ball_dir
+    terminal = jnp.logical_and(
+        brick_cond,
+        jnp.logical_not(jnp.logical_or(redirect_ball1, redirect_ball2)),
     )
-    new_y = jax.lax.select(redirect_ball2, state.last_y, new_y)
-    redirect_cond = jnp.logical_and(1 - redirect_ball1, 1 - redirect_ball2)
-    terminal = jnp.logical_and(brick_cond, redirect_cond)
 
-    strike = jax.lax.select(1 - strike_toggle == 1, False, True)
+    bounce_y = top_cond | strike_bool | redirect_ball1
+    bounce = BOUNCE_Y * bounce_y + BOUNCE_PADDLE * redirect_ball2
+    ball_dir = BOUNCE_TABLE[bounce, state.ball_dir]
+    new_y = jnp.where(
+        strike_bool | redirect_ball1 | redirect_ball2, state.last_y, new_y
+    )
     return (
         state.replace(
             ball_dir=ball_dir,
-            brick_map=brick_map,
-            strike=strike,
+            brick_mask=brick_mask.astype(jnp.int32),
+            strike=strike_toggle,
             ball_x=new_x,
             ball_y=new_y,
             terminal=terminal,
         ),
-        reward,
+        strike_bool * 1.0,
     )
@@ -2,6 +2,9 @@ import jax
 import jax.numpy as jnp
 from jax import lax
 from gymnax.environments import environment, spaces
+from gymnax.environments.profiling import stage
+from gymnax.environments.minatar.render import render_grid
+from gymnax.environments.obs_dtype import check_obs_dtype, obs_space
 from typing import Tuple, Optional
 import chex
 from flax import struct
@@ -42,8 +45,12 @@ class MinFreeway(environment.Environment):
     - Actions are encoded as follows: ['n', 'u', 'd']
     """
 
-    def __init__(self, use_minimal_action_set: bool = True):
+    def __init__(
+        self, use_minimal_action_set: bool = True, obs_dtype: str = "float32"
+    ):
         super().__init__()
+        # Observation dtype - float32, bool, uint8 or bit-packed uint8
+        self.obs_dtype = check_obs_dtype(obs_dtype)
         self.obs_shape = (10, 10, 7)
         # Full action set: ['n','l','u','r','d','f']
         self.full_action_set = jnp.array([0, 1, 2, 3, 4, 5])
@@ -115,32 +122,26 @@ class MinFreeway(environment.Environment):
         )
         return self.get_obs(state), state
 
+    @stage("get_obs")
     def get_obs(self, state: EnvState) -> chex.Array:
         """Return observation from raw state trafo."""
-        obs = jnp.zeros(self.obs_shape, dtype=bool)
         # Set the position of the chicken agent, cars, and trails
-        obs = obs.at[state.pos, 4, 0].set(1)
-        for car_id in range(8):
-            car = state.cars[car_id]
-            obs = obs.at[car[1], car[0], 1].set(1)
-            # Boundary conditions for cars
-            back_x = (car[3] > 0) * (car[0] - 1) + (1 - (car[3] > 0)) * (
-                car[0] + 1
-            )
-            left_out = back_x < 0
-            right_out = back_x > 9
-            back_x = left_out * 9 + (1 - left_out) * back_x
-            back_x = right_out * 0 + (1 - right_out) * back_x
-            # Set trail to be on
-            trail_channel = (
-                2 * (jnp.abs(car[3]) == 1)
-                + 3 * (jnp.abs(car[3]) == 2)
-                + 4 * (jnp.abs(car[3]) == 3)
-                + 5 * (jnp.abs(car[3]) == 4)
-                + 6 * (jnp.abs(car[3]) == 5)
-            )
-            obs = obs.at[car[1], back_x, trail_channel].set(1)
-        return obs.astype(jnp.float32)
+        cars = state.cars
+        # Trail is one cell behind the car (wrapped around the screen edge)
+        back_x = (cars[:, 0] - car_direction(cars[:, 3])) % 10
+        # Trail channel encodes the car speed (1-5 -> channels 2-6)
+        speed = jnp.abs(cars[:, 3])
+        trail_channel = (speed + 1) * ((speed >= 1) & (speed <= 5))
+        entity_table = jnp.concatenate(
+            [
+                jnp.array([[state.pos, 4, 0]]),
+                jnp.stack([cars[:, 1], cars[:, 0], jnp.ones_like(speed)], 1),
+                jnp.stack([cars[:, 1], back_x, trail_channel], 1),
+            ]
+        )
+        return render_grid(
+            self.obs_shape, entity_table, obs_dtype=self.obs_dtype
+        )
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
         """Check whether state is terminal."""
@@ -165,14 +166,14 @@ class MinFreeway(environment.Environment):
 
     def observation_space(self, params: EnvParams) -> spaces.Box:
         """Observation space of the environment."""
-        return spaces.Box(0, 1, self.obs_shape)
+        return obs_space(self.obs_shape, self.obs_dtype)
 
     def state_space(self, params: EnvParams) -> spaces.Dict:
         """State space of the environment."""
         return spaces.Dict(
             {
                 "pos": spaces.Discrete(10),
-                "cars": spaces.Box(0, 1, jnp.zeros((8, 4)), dtype=jnp.int_),
+                "cars": spaces.Box(0, 1, (8, 4), dtype=jnp.int_),
                 "move_timer": spaces.Discrete(params.player_speed),
                 "time": spaces.Discrete(params.max_steps_in_episode),
                 "terminal": spaces.Discrete(2),
@@ -180,6 +181,7 @@ class MinFreeway(environment.Environment):
         )
 
 
+@stage("step_agent")
 def step_agent(
     action: int, state: EnvState, params: EnvParams
 ) -> Tuple[EnvState, float, bool]:
@@ -200,63 +202,32 @@ def step_agent(
     return state.replace(pos=pos, move_timer=move_timer), reward, win_cond
 
 
-def step_cars(state: EnvState) -> EnvState:
-    """Perform 3rd part of step transition for car."""
-    # Update cars and check for collisions! - respawn agent at bottom
-    pos = state.pos
-    cars = state.cars
-    for car_id in range(8):
-        # Check for agent collision with car and if so reset agent
-        collision_cond = jnp.logical_and(
-            cars[car_id][0] == 4,
-            cars[car_id][1] == pos,
-        )
-
-        pos = jax.lax.select(collision_cond, 9, pos)
-
-        # Check for exiting frame, reset car and then check collision again
-        car_cond = cars[car_id][2] == 0
-        upd_2 = jax.lax.select(
-            car_cond, jnp.abs(cars[car_id][3]), cars[car_id][2]
-        )
-
-        cars = cars.at[car_id, 2].set(upd_2)
-        upd_0 = jax.lax.select(
-            car_cond,
-            (
-                cars[car_id][0]
-                + 1 * (cars[car_id][3] > 0)
-                - 1 * (1 - (cars[car_id][3] > 0))
-            ),
-            cars[car_id][0],
-        )
-        cars = cars.at[car_id, 0].set(upd_0)
+def car_direction(speed: chex.Array) -> chex.Array:
+    """Move direction of the cars: +1 (right) if speed > 0 else -1 (left)."""
+    return jnp.where(speed > 0, 1, -1)
 
-        cond_sm_0 = jnp.logical_and(car_cond, cars[car_id][0] < 0)
-        upd_0_sm = jax.lax.select(cond_sm_0, 9, cars[car_id][0])
-        cars = cars.at[car_id, 0].set(upd_0_sm)
-        cond_gr_9 = jnp.logical_and(car_cond, cars[car_id][0] > 9)
-        upd_0_gr = jax.lax.select(cond_gr_9, 0, cars[car_id][0])
-        cars = cars.at[car_id, 0].set(upd_0_gr)
 
-        # Check collision after car position update - respawn agent
-        # Note: Need to reevaluate collision condition since cars change!
-        collision_cond = jnp.logical_and(
-            cars[car_id][0] == 4,
-            cars[car_id][1] == pos,
-        )
-        cond_pos = jnp.logical_and(car_cond, collision_cond)
-        pos = jax.lax.select(cond_pos, 9, pos)
-        # Move car if no previous car_cond update
-        alt_upd_2 = jax.lax.select(
-            car_cond, cars[car_id][2], cars[car_id][2] - 1
-        )
-        cars = cars.at[car_id, 2].set(alt_upd_2)
+@stage("step_cars")
+def step_cars(state: EnvState) -> EnvState:
+    """Perform 3rd part of step transition for car."""
+    # All 8 lanes are updated at once - columns are [x, y, timer, speed]
+    x, y, timer, speed = state.cars.T
+    # Cars only move if their timer ran out - then it is reset to the speed
+    car_cond = timer == 0
+    new_timer = jnp.where(car_cond, jnp.abs(speed), timer - 1)
+    new_x = jnp.where(car_cond, (x + car_direction(speed)) % 10, x)
+    # Check agent collision before and after the car moved - respawn agent
+    # Note: Lanes are distinct rows, so the agent can be hit by one car only
+    collision = jnp.logical_and(x == 4, y == state.pos)
+    collision_moved = car_cond & (new_x == 4) & (y == state.pos)
+    pos = jnp.where(jnp.any(collision | collision_moved), 9, state.pos)
+    cars = jnp.stack([new_x, y, new_timer, speed], axis=1)
     # 4. Update various timers
     move_timer = state.move_timer - (state.move_timer > 0)
     return state.replace(pos=pos, cars=cars, move_timer=move_timer)
 
 
+@stage("randomize_cars")
 def randomize_cars(
     speeds: chex.Array,
     directions: chex.Array,
@@ -265,19 +236,15 @@ def randomize_cars(
 ) -> chex.Array:
     """Randomize car speeds & directions. Reset position if initialize."""
     speeds_new = directions * speeds
-    new_cars = jnp.zeros((8, 4), dtype=int)
-
-    # Loop over all 8 cars and set their data
-    for i in range(8):
-        # Reset both speeds, directions and positions
-        new_cars = new_cars.at[i, :].set(
-            [0, i + 1, jnp.abs(speeds_new[i]), speeds_new[i]],
-        )
-        # Reset only speeds and directions
-        old_cars = old_cars.at[i, 2:4].set(
-            [jnp.abs(speeds_new[i]), speeds_new[i]],
-        )
-
+    timers = jnp.abs(speeds_new)
+    # Reset both speeds, directions and positions (car i drives in row i+1)
+    new_cars = jnp.stack(
+        [jnp.zeros(8, dtype=int), jnp.arange(1, 9), timers, speeds_new], 1
+    )
+    # Reset only speeds and directions
+    old_cars = jnp.concatenate(
+        [old_cars[:, :2], jnp.stack([timers, speeds_new], 1)], axis=1
+    )
     # Mask the car array manipulation according to initialize
-    cars = jax.lax.select(initialize, new_cars, old_cars)
-    return jnp.array(cars, dtype=jnp.int_)
+    cars = jnp.where(initialize, new_cars, old_cars)
+    return jnp.asarray(cars, dtype=jnp.int32)
@@ -0,0 +1,40 @@
+import jax.numpy as jnp
+import chex
+from typing import Dict, Optional, Tuple
+from gymnax.environments.obs_dtype import cast_obs
+
+
+def render_grid(
+    obs_shape: Tuple[int, int, int],
+    entity_table: chex.Array,
+    dense_channels: Optional[Dict[int, chex.Array]] = None,
+    obs_dtype: str = "float32",
+) -> chex.Array:
+    """Render a MinAtar grid observation with a single scatter.
+
+    Args:
+        obs_shape: (rows, cols, channels) of the observation grid.
+        entity_table: (N, 3) integer table of (y, x, channel) cells to set.
+            Entries with a channel index >= channels are dropped, which can be
+            used to mask out inactive entities.
+        dense_channels: Optional mapping channel -> (rows, cols) map, which is
+            used as full channel (e.g. brick or alien maps).
+        obs_dtype: Observation dtype - "float32", "bool", "uint8" or "packed"
+            uint8 bit-planes along the last axis (see `obs_dtype.unpack_bits`).
+    """
+    if dense_channels is None:
+        dense_channels = {}
+    rows, cols, channels = obs_shape
+    empty = jnp.zeros((rows, cols), dtype=bool)
+    grid = jnp.stack(
+        [
+            dense_channels[c].astype(bool) if c in dense_channels else empty
+            for c in range(channels)
+        ],
+        axis=-1,
+    )
+    entity_table = jnp.asarray(entity_table)
+    grid = grid.at[
+        entity_table[:, 0], entity_table[:, 1], entity_table[:, 2]
+    ].set(True, mode="drop")
+    return cast_obs(grid, obs_dtype)
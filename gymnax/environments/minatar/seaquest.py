@@ -2,27 +2,41 @@ import jax
 import jax.numpy as jnp
 from jax import lax
 from gymnax.environments import environment, spaces
+from gymnax.environments.profiling import stage
+from gymnax.environments.minatar.render import render_grid
+from gymnax.environments.obs_dtype import check_obs_dtype, obs_space
 from typing import Tuple, Optional
 import chex
 from flax import struct
 
+# Minimal capacities of the entity buffers. Entities are stored in the first
+# `count` rows in the order of the MinAtar lists. With the default parameters
+# at most 30 enemies (1 spawn/step, 30 steps to cross) and 2-3 friendly
+# bullets and divers are alive at once. `MinSeaquest` grows the buffers for
+# parameters that need more (see `entity_capacities`).
+MAX_F_BULLETS = 5
+MAX_E_BULLETS = 32
+MAX_ENEMIES = 32
+MAX_DIVERS = 5
+
 
 @struct.dataclass
 class EnvState:
     oxygen: int
+    diver_count: int
     sub_x: int
     sub_y: int
     sub_or: int
     f_bullet_count: int
-    f_bullets: chex.Array
+    f_bullets: chex.Array  # [x, y, dir]
     e_bullet_count: int
-    e_bullets: chex.Array
+    e_bullets: chex.Array  # [x, y, dir]
     e_fish_count: int
-    e_fish: chex.Array
+    e_fish: chex.Array  # [x, y, dir, move_timer]
     e_subs_count: int
-    e_subs: chex.Array
-    diver_count: int
-    divers: chex.Array
+    e_subs: chex.Array  # [x, y, dir, move_timer, shot_timer]
+    divers_count: int
+    divers: chex.Array  # [x, y, dir, move_timer]
     e_spawn_speed: int
     e_spawn_timer: int
     d_spawn_timer: int
@@ -80,10 +94,33 @@ class MinSeaquest(environment.Environment):
                                        'diver_guage':8, 'diver':9
     - Observation has dimensionality (10, 10, 10)
     - Actions are encoded as follows: ['n','l','u','r','d','f']
+    - The entity buffers are sized for `params` (defaults: `EnvParams()`),
+      which are also returned as `default_params`.
     """
 
-    def __init__(self, use_minimal_action_set: bool = True):
+    def __init__(
+        self,
+        use_minimal_action_set: bool = True,
+        obs_dtype: str = "float32",
+        params: Optional[EnvParams] = None,
+    ):
         super().__init__()
+        self.params = EnvParams() if params is None else params
+        # Entity buffer capacities - new entities are dropped if one is full
+        (
+            self.max_f_bullets,
+            self.max_e_bullets,
+            self.max_enemies,
+            self.max_divers,
+        ) = [
+            max(minimum, capacity)
+            for minimum, capacity in zip(
+                (MAX_F_BULLETS, MAX_E_BULLETS, MAX_ENEMIES, MAX_DIVERS),
+                entity_capacities(self.params),
+            )
+        ]
+        # Observation dtype - float32, bool, uint8 or bit-packed uint8
+        self.obs_dtype = check_obs_dtype(obs_dtype)
         self.obs_shape = (10, 10, 10)
         # Full action set: ['n','l','u','r','d','f']
         self.full_action_set = jnp.array([0, 1, 2, 3, 4, 5])
@@ -99,7 +136,7 @@ class MinSeaquest(environment.Environment):
     @property
     def default_params(self) -> EnvParams:
         # Default environment parameters
-        return EnvParams()
+        return self.params
 
     def step_env(
         self, key: chex.PRNGKey, state: EnvState, action: int, params: EnvParams
@@ -107,32 +144,29 @@ class MinSeaquest(environment.Environment):
         """Perform single timestep state transition."""
         # If timer is up spawn enemy and divers [always sample]
         key_enemy, key_diver = jax.random.split(key)
-        spawned_enemy = spawn_enemy(key_enemy)
         spawn_enemy_cond = state.e_spawn_timer == 0
+        state = spawn_enemy(key_enemy, state, spawn_enemy_cond, params)
+        spawn_diver_cond = state.d_spawn_timer == 0
+        state = spawn_diver(key_diver, state, spawn_diver_cond, params)
         state = state.replace(
             e_spawn_timer=lax.select(
                 spawn_enemy_cond, state.e_spawn_speed, state.e_spawn_timer
-            )
-        )
-
-        spawned_diver = spawn_diver(key_diver)
-        spawn_diver_cond = state.d_spawn_timer == 0
-        state = state.replace(
+            ),
             d_spawn_timer=lax.select(
-                spawn_diver_cond, state.d_spawn_speed, state.d_spawn_timer
-            )
+                spawn_diver_cond, params.diver_spawn_speed, state.d_spawn_timer
+            ),
         )
 
         # Sequentially go through substate and update the state
         a = self.action_set[action]
-        state = step_agent(state, a, self.env_params)
-        reward = step_bullets(state)
-        state = step_divers(state)
-        state, reward = step_e_subs(state, reward)
+        state = step_agent(state, a, params)
+        state, reward = step_bullets(state)
+        state = step_divers(state, params)
+        state, reward = step_e_subs(state, reward, params)
         state, reward = step_e_bullets(state, reward)
-        state, reward = step_timers(state, reward)
+        state, reward = step_timers(state, reward, params)
         # Check game condition & no. steps for termination condition
-        state.replace(time=state.time + 1)
+        state = state.replace(time=state.time + 1)
         done = self.is_terminal(state, params)
         state = state.replace(terminal=done)
         info = {"discount": self.discount(state, params)}
@@ -148,93 +182,102 @@ class MinSeaquest(environment.Environment):
         self, key: chex.PRNGKey, params: EnvParams
     ) -> Tuple[chex.Array, EnvState]:
         """Reset environment state by sampling initial position."""
+        self.check_params(params)
         state = EnvState(
             oxygen=params.max_oxygen,
+            diver_count=0,
             sub_x=5,
             sub_y=0,
-            sub_or=0,
+            sub_or=False,
             f_bullet_count=0,
-            f_bullets=jnp.zeros((100, 3), dtype=jnp.int32),
+            f_bullets=jnp.zeros((self.max_f_bullets, 3), dtype=jnp.int32),
             e_bullet_count=0,
-            e_bullets=jnp.zeros((100, 3), dtype=jnp.int32),
+            e_bullets=jnp.zeros((self.max_e_bullets, 3), dtype=jnp.int32),
             e_fish_count=0,
-            e_fish=jnp.zeros((100, 5), dtype=jnp.int32),
+            e_fish=jnp.zeros((self.max_enemies, 4), dtype=jnp.int32),
             e_subs_count=0,
-            e_subs=jnp.zeros((100, 5), dtype=jnp.int32),
-            diver_count=0,
-            divers=jnp.zeros((100, 4), dtype=jnp.int32),
+            e_subs=jnp.zeros((self.max_enemies, 5), dtype=jnp.int32),
+            divers_count=0,
+            divers=jnp.zeros((self.max_divers, 4), dtype=jnp.int32),
             e_spawn_speed=params.init_spawn_speed,
             e_spawn_timer=params.init_spawn_speed,
             d_spawn_timer=params.diver_spawn_speed,
             move_speed=params.init_move_interval,
             ramp_index=0,
             shot_timer=0,
-            surface=1,
+            surface=True,
             time=0,
             terminal=False,
         )
         return self.get_obs(state, params), state
 
-    def get_obs(self, state: EnvState, params: EnvParams) -> chex.Array:
+    @stage("get_obs")
+    def get_obs(
+        self, state: EnvState, params: Optional[EnvParams] = None
+    ) -> chex.Array:
         """Return observation from raw state trafo."""
-        fish, sub, diver = [], [], []
-        obs = jnp.zeros(self.obs_shape, dtype=bool)
-        # Set agents sub-front and back, oxygen_gauge and diver_gauge
-        obs = obs.at[state.sub_y, state.sub_x, 0].set(1)
-        back_x = (state.sub_x - 1) * state.sub_or + (state.sub_x + 1) * (
-            1 - state.sub_or
+        if params is None:
+            params = self.default_params
+        # Sub front and back (back is behind the sub w.r.t. its orientation)
+        back_x = state.sub_x + jnp.where(state.sub_or, -1, 1)
+        tables = [
+            jnp.array([[state.sub_y, state.sub_x, 0], [state.sub_y, back_x, 1]])
+        ]
+        # Bullets, enemies and divers - invalid rows are routed to channel 10
+        # and dropped by the scatter, as are trails outside of the frame
+        for entities, count, channel, trail in [
+            (state.f_bullets, state.f_bullet_count, 2, False),
+            (state.e_bullets, state.e_bullet_count, 4, False),
+            (state.e_fish, state.e_fish_count, 5, True),
+            (state.e_subs, state.e_subs_count, 6, True),
+            (state.divers, state.divers_count, 9, True),
+        ]:
+            valid = entity_mask(entities, count)
+            x, y = entities[:, 0], entities[:, 1]
+            tables.append(jnp.stack([y, x, jnp.where(valid, channel, 10)], 1))
+            if trail:
+                back_x = x + jnp.where(entities[:, 2], -1, 1)
+                inside = valid & (back_x >= 0) & (back_x <= 9)
+                tables.append(
+                    jnp.stack([y, back_x, jnp.where(inside, 3, 10)], 1)
+                )
+        # Oxygen and rescued diver gauges in the bottom row
+        cols = jnp.arange(10)
+        oxygen = jnp.maximum(0, state.oxygen) * 10 // params.max_oxygen
+        gauges = jnp.zeros((2, 10, 10), dtype=bool)
+        gauges = gauges.at[0, 9].set(cols < oxygen)
+        gauges = gauges.at[1, 9].set(
+            jnp.logical_and(cols >= 9 - state.diver_count, cols < 9)
+        )
+        return render_grid(
+            self.obs_shape,
+            jnp.concatenate(tables),
+            dense_channels={7: gauges[0], 8: gauges[1]},
+            obs_dtype=self.obs_dtype,
         )
-        obs = obs.at[state.sub_y, back_x, 1].set(1)
-        obs = obs.at[9, 0 : state.oxygen * 10 // params.max_oxygen, 7].set(1)
-        obs = obs.at[9, 9 - state.diver_count : 9, 8].set(1)
-
-        # Set friendly bulltes, enemy bullets, enemy fish+trail, enemey sub+trail
-        for f_b_id in range(state.f_bullet_count):
-            obs = obs.at[
-                state.f_bullets[f_b_id, 1],
-                state.f_bullets[f_b_id, 0],
-                2,
-            ].set(1)
-        for e_b_id in range(state.e_bullet_count):
-            obs = obs.at[
-                state.e_bullets[e_b_id, 1],
-                state.e_bullets[e_b_id, 0],
-                4,
-            ].set(1)
-        for e_f_id in range(state.e_fish_count):
-            obs = obs.at[
-                state.e_fish[e_f_id, 1], state.e_fish[e_f_id, 0], 5
-            ].set(1)
-            back_x = (fish[0] - 1) * fish[2] + (fish[0] + 1) * (1 - fish[2])
-            border_cond = jnp.logical_and(back_x >= 0, back_x <= 9)
-            obs = jax.lax.select(
-                border_cond,
-                obs.at[state.e_fish[e_f_id][1], back_x, 3].set(1),
-                obs,
-            )
-
-        for e_s_id in range(state.e_subs_count):
-            obs = obs.at[
-                state.e_subs[e_s_id, 1], state.e_subs[e_s_id, 0], 6
-            ].set(1)
-            back_x = (sub[0] - 1) * sub[2] + (sub[0] + 1) * (1 - sub[2])
-            border_cond = jnp.logical_and(back_x >= 0, back_x <= 9)
-            obs = jax.lax.select(
-                border_cond,
-                obs.at[state.e_subs[e_s_id, 1], back_x, 3].set(1),
-                obs,
-            )
 
-        for d_id in range(state.diver_count):
-            obs = obs.at[state.divers[d_id, 1], state.divers[d_id, 0], 9].set(1)
-            back_x = (diver[0] - 1) * diver[2] + (diver[0] + 1) * (1 - diver[2])
-            border_cond = jnp.logical_and(back_x >= 0, back_x <= 9)
-            obs = jax.lax.select(
-                border_cond,
-                obs.at[state.divers[d_id, 1], back_x, 3].set(1),
-                obs,
+    def check_params(self, params: EnvParams) -> None:
+        """Raise if the entity buffers are too small for concrete `params`."""
+        # Traced params (e.g. under jit) can't be checked here
+        if any(
+            isinstance(leaf, jax.core.Tracer)
+            for leaf in jax.tree_util.tree_leaves(params)
+        ):
+            return
+        capacities = (
+            self.max_f_bullets,
+            self.max_e_bullets,
+            self.max_enemies,
+            self.max_divers,
+        )
+        if any(
+            needed > capacity
+            for needed, capacity in zip(entity_capacities(params), capacities)
+        ):
+            raise ValueError(
+                f"Entity buffers {capacities} are too small for {params}, "
+                "create the environment with `MinSeaquest(params=params)`."
             )
-        return obs.astype(jnp.float32)
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
         """Check whether state is terminal."""
@@ -259,22 +302,31 @@ class MinSeaquest(environment.Environment):
 
     def observation_space(self, params: EnvParams) -> spaces.Box:
         """Observation space of the environment."""
-        return spaces.Box(0, 1, self.obs_shape)
+        return obs_space(self.obs_shape, self.obs_dtype)
 
     def state_space(self, params: EnvParams) -> spaces.Dict:
         """State space of the environment."""
         return spaces.Dict(
             {
                 "oxygen": spaces.Discrete(params.max_oxygen),
-                "diver_count": spaces.Discrete(20),
+                "diver_count": spaces.Discrete(7),
                 "sub_x": spaces.Discrete(10),
                 "sub_y": spaces.Discrete(10),
                 "sub_or": spaces.Discrete(2),
-                "f_bullets": spaces.Box(0, 1, (100, 3)),
-                "e_bullets": spaces.Box(0, 1, (100, 3)),
-                "e_fish": spaces.Box(0, 1, (100, 5)),
-                "e_subs": spaces.Box(0, 1, (100, 5)),
-                "divers": spaces.Box(0, 1, (100, 4)),
+                "f_bullet_count": spaces.Discrete(self.max_f_bullets + 1),
+                "f_bullets": spaces.Box(
+                    0, 1, (self.max_f_bullets, 3), jnp.int32
+                ),
+                "e_bullet_count": spaces.Discrete(self.max_e_bullets + 1),
+                "e_bullets": spaces.Box(
+                    0, 1, (self.max_e_bullets, 3), jnp.int32
+                ),
+                "e_fish_count": spaces.Discrete(self.max_enemies + 1),
+                "e_fish": spaces.Box(0, 1, (self.max_enemies, 4), jnp.int32),
+                "e_subs_count": spaces.Discrete(self.max_enemies + 1),
+                "e_subs": spaces.Box(0, 1, (self.max_enemies, 5), jnp.int32),
+                "divers_count": spaces.Discrete(self.max_divers + 1),
+                "divers": spaces.Box(0, 1, (self.max_divers, 4), jnp.int32),
                 "e_spawn_speed": spaces.Discrete(params.init_spawn_speed),
                 "e_spawn_timer": spaces.Discrete(params.init_spawn_speed),
                 "d_spawn_timer": spaces.Discrete(params.diver_spawn_speed),
@@ -288,199 +340,415 @@ class MinSeaquest(environment.Environment):
         )
 
 
-def step_agent(state: EnvState, action: int, env_params: EnvParams) -> EnvState:
-    """Perform submarine position and friendly bullets transition."""
-    # Update submarine position based on l, r or u, d actions
-    not_l_or_r = jnp.logical_and(action != 1, action != 3)
-    state["sub_x"] = (
-        (action == 1) * jnp.maximum(0, state["sub_x"] - 1)
-        + (action == 3) * jnp.minimum(9, state["sub_x"] + 1)
-        + not_l_or_r * state["sub_x"]
+def entity_capacities(params: EnvParams) -> Tuple[int, int, int, int]:
+    """Maximal number of entities alive at once for concrete `params`.
+
+    Returns the counts of friendly bullets, enemy bullets, enemy fish (or
+    subs) and divers. Entities take 10 moves to cross the frame.
+    """
+
+    def ceil_div(a: int, b: int) -> int:
+        return -(-a // max(b, 1))
+
+    f_bullets = ceil_div(10, params.shot_cool_down)
+    divers = ceil_div(
+        10 * (params.diver_move_interval + 1), params.diver_spawn_speed
     )
-    state["sub_or"] = lax.select(action == 1, False, state["sub_or"])
-    state["sub_or"] = lax.select(action == 3, True, state["sub_or"])
-
-    not_u_or_d = jnp.logical_and(action != 2, action != 4)
-    state["sub_y"] = (
-        (action == 2) * jnp.maximum(0, state["sub_y"] - 1)
-        + (action == 4) * jnp.minimum(8, state["sub_y"] + 1)
-        + not_u_or_d * state["sub_y"]
+    # Spawn and move speed at each difficulty ramp (see `surface`) - enemies
+    # spawned on the previous ramp can still be alive
+    spawn_speed, move_speed = params.init_spawn_speed, params.init_move_interval
+    enemies = ceil_div(10 * (move_speed + 1), spawn_speed)
+    ramp_index = 0
+    while params.ramping and (spawn_speed > 1 or move_speed > 2):
+        prev_move_speed = move_speed
+        move_speed -= move_speed > 2 and ramp_index % 2 == 1
+        spawn_speed -= spawn_speed > 1
+        ramp_index += 1
+        enemies = max(
+            enemies, ceil_div(10 * (prev_move_speed + 1), spawn_speed)
+        )
+    # Every sub shoots once per `enemy_shot_interval + 1` steps
+    e_bullets = enemies * ceil_div(10, params.enemy_shot_interval + 1)
+    return int(f_bullets), int(e_bullets), int(enemies), int(divers)
+
+
+def entity_mask(entities: chex.Array, count: int) -> chex.Array:
+    """Validity mask of an entity buffer - the first `count` rows are used."""
+    return jnp.arange(entities.shape[0]) < count
+
+
+def compact(entities: chex.Array, keep: chex.Array) -> Tuple[chex.Array, int]:
+    """Move the kept rows to the front (in order) and zero the others."""
+    idx = jnp.where(keep, jnp.cumsum(keep) - 1, entities.shape[0])
+    entities = jnp.zeros_like(entities).at[idx].set(entities, mode="drop")
+    return entities, keep.sum()
+
+
+def append(
+    entities: chex.Array, count: int, new: chex.Array, add: chex.Array
+) -> Tuple[chex.Array, int]:
+    """Append the rows of `new` where `add` after the first `count` rows.
+
+    Rows that do not fit into the buffer anymore are dropped.
+    """
+    idx = jnp.where(add, count + jnp.cumsum(add) - 1, entities.shape[0])
+    entities = entities.at[idx].set(new.astype(entities.dtype), mode="drop")
+    return entities, jnp.minimum(count + add.sum(), entities.shape[0])
+
+
+def move_x(entities: chex.Array) -> chex.Array:
+    """Position after one move in the entity's direction (1: right)."""
+    return entities[:, 0] + jnp.where(entities[:, 2], 1, -1)
+
+
+def cell_ids(entities: chex.Array, mask: chex.Array, empty: int) -> chex.Array:
+    """Cell index 16 * y + x of the masked entities and `empty` otherwise."""
+    return jnp.where(mask, 16 * entities[:, 1] + entities[:, 0], empty)
+
+
+def cell_rank(cells: chex.Array, reverse: bool = False) -> chex.Array:
+    """Number of preceding entities in the same cell."""
+    same = cells[:, None] == cells[None]
+    return jnp.sum(jnp.triu(same, 1) if reverse else jnp.tril(same, -1), 1)
+
+
+def match_first(
+    hitter: chex.Array,
+    hitter_mask: chex.Array,
+    target: chex.Array,
+    target_mask: chex.Array,
+) -> Tuple[chex.Array, chex.Array]:
+    """Resolve collisions of the hitters with the first remaining target.
+
+    MinAtar goes through the hitters in reversed order and removes the first
+    target (in order) in the same cell. Hence, the k-th hitter of a cell hits
+    the k-th target of the cell (if it exists). Returns both hit masks.
+    """
+    # Masked out hitters and targets get distinct cells which never match
+    hitter_cells = cell_ids(hitter, hitter_mask, -100)
+    target_cells = cell_ids(target, target_mask, -200)
+    pairs = (hitter_cells[:, None] == target_cells[None]) & (
+        cell_rank(hitter_cells, reverse=True)[:, None]
+        == cell_rank(target_cells)[None]
     )
+    return pairs.any(1), pairs.any(0)
+
+
+def at_sub(entities: chex.Array, state: EnvState, x=None) -> chex.Array:
+    """Whether the entities (or positions `x` in their rows) hit the sub."""
+    x = entities[:, 0] if x is None else x
+    return jnp.logical_and(x == state.sub_x, entities[:, 1] == state.sub_y)
 
-    # Update friendly bullets based on f action and shot_timer
-    bullet_cond = jnp.logical_and(action == 5, state["shot_timer"] == 0)
-    state["shot_timer"] = lax.select(
-        bullet_cond, env_params.shot_cool_down, state["shot_timer"]
+
+@stage("step_agent")
+def step_agent(state: EnvState, action: int, params: EnvParams) -> EnvState:
+    """Perform submarine position and friendly bullets transition."""
+    # Fire a bullet if the shot timer is ready, otherwise move the submarine
+    fire = jnp.logical_and(action == 5, state.shot_timer == 0)
+    sub_x = (
+        (action == 1) * jnp.maximum(0, state.sub_x - 1)
+        + (action == 3) * jnp.minimum(9, state.sub_x + 1)
+        + jnp.logical_and(action != 1, action != 3) * state.sub_x
+    )
+    sub_or = jnp.where(
+        action == 1, False, jnp.where(action == 3, True, state.sub_or)
     )
-    bullet_array = jnp.array([state["sub_x"], state["sub_y"], state["sub_or"]])
-    # Use counter to keep track of row idx to update!
-    f_bullets_add = jax.ops.index_update(
-        state["f_bullets"], jax.ops.index[state["f_bullet_count"]], bullet_array
+    sub_y = (
+        (action == 2) * jnp.maximum(0, state.sub_y - 1)
+        + (action == 4) * jnp.minimum(8, state.sub_y + 1)
+        + jnp.logical_and(action != 2, action != 4) * state.sub_y
     )
-    state["f_bullets"] = lax.select(
-        bullet_cond, f_bullets_add, state["f_bullets"]
+    bullet = jnp.array([[state.sub_x, state.sub_y, state.sub_or]])
+    f_bullets, f_bullet_count = append(
+        state.f_bullets, state.f_bullet_count, bullet, fire[None]
+    )
+    return state.replace(
+        sub_x=sub_x,
+        sub_y=sub_y,
+        sub_or=sub_or,
+        f_bullets=f_bullets,
+        f_bullet_count=f_bullet_count,
+        shot_timer=lax.select(fire, params.shot_cool_down, state.shot_timer),
     )
-    state["f_bullet_count"] += bullet_cond
-    return state
 
 
-def step_bullets(state: EnvState) -> Tuple[EnvState, float]:
+@stage("step_bullets")
+def step_bullets(state: EnvState) -> Tuple[EnvState, int]:
     """Perform friendly bullets transition."""
-    reward = 0.0
-    f_bullet_count = 0
-    f_bullets = jnp.zeros((100, 3))
-    e_fish = jnp.zeros((100, 3))
-    for f_b_id in range(state["f_bullet_count"]):
-        bullet_to_check = state["f_bullets"][f_b_id].copy()
-        bullet_to_check[0] = lax.select(
-            bullet_to_check[2], bullet_to_check[0] + 1, bullet_to_check[0] - 1
-        )
-
-        # Add bullet if it has not exited
-        bullet_border = jnp.logical_or(
-            bullet_to_check[0] < 0, bullet_to_check[0] > 9
-        )
-        f_bullets = jax.ops.index_update(
-            f_bullets,
-            jax.ops.index(f_bullet_count),
-            bullet_to_check * (1 - bullet_border),
-        )
-        f_bullet_count += 1 - bullet_border
-
-        # Check for collision with enemy fish
-        removed = 0
-        for e_f_id in range(state["e_fish_count"]):
-            e_fish_to_check = state["e_fish"][e_f_id].copy()
-            hit = (
-                state["f_bullets"][f_b_id][0:2] == state["e_fish"][e_f_id][0:2]
-            )
-
+    # Move bullets and remove them if they exit the frame
+    f_bullets = state.f_bullets.at[:, 0].set(move_x(state.f_bullets))
+    active = entity_mask(f_bullets, state.f_bullet_count)
+    active &= (f_bullets[:, 0] >= 0) & (f_bullets[:, 0] <= 9)
+    # Bullets hit fish first, the remaining ones may hit enemy subs
+    fish = entity_mask(state.e_fish, state.e_fish_count)
+    hit_fish, fish_hit = match_first(f_bullets, active, state.e_fish, fish)
+    subs = entity_mask(state.e_subs, state.e_subs_count)
+    active &= ~hit_fish
+    hit_sub, sub_hit = match_first(f_bullets, active, state.e_subs, subs)
+    reward = hit_fish.sum() + hit_sub.sum()
+    f_bullets, f_bullet_count = compact(f_bullets, active & ~hit_sub)
+    e_fish, e_fish_count = compact(state.e_fish, fish & ~fish_hit)
+    e_subs, e_subs_count = compact(state.e_subs, subs & ~sub_hit)
+    state = state.replace(
+        f_bullets=f_bullets,
+        f_bullet_count=f_bullet_count,
+        e_fish=e_fish,
+        e_fish_count=e_fish_count,
+        e_subs=e_subs,
+        e_subs_count=e_subs_count,
+    )
     return state, reward
 
 
-def collision_and_remove(indiv_to_check, entity_counter, entities):
-    """Helper function that checks for collision and updates entities."""
-    entities_clean = jnp.zeros(entities.shape)
-    entity_counter_clean = 0
-    for e_id in range(entity_counter):
-        hit = (indiv_to_check[0:2] == entities[e_id][0:2]).all()
-        # If no hit - add entity to array and increase clean counter
-        entities_clean = jax.ops.index_update(
-            entities_clean,
-            jax.ops.index(entity_counter_clean),
-            entities[e_id] * (1 - hit),
-        )
-        entity_counter_clean += hit
-    return
+@stage("step_divers")
+def step_divers(state: EnvState, params: EnvParams) -> EnvState:
+    """Perform diver transition."""
+    divers = state.divers
+    valid = entity_mask(divers, state.divers_count)
+    # Divers move if their timer is up and are removed if they exit the frame
+    move = divers[:, 3] == 0
+    new_x = jnp.where(move, move_x(divers), divers[:, 0])
+    exits = (new_x < 0) | (new_x > 9)
+    # Divers at the sub (before or after moving) are picked up in reversed
+    # order as long as less than 6 divers are on board
+    touch = valid & (
+        at_sub(divers, state) | (move & ~exits & at_sub(divers, state, new_x))
+    )
+    rank = jnp.cumsum(touch[::-1])[::-1] - touch
+    pick = touch & (state.diver_count + rank < 6)
+    timer = jnp.where(move, params.diver_move_interval, divers[:, 3] - 1)
+    divers = divers.at[:, 0].set(new_x).at[:, 3].set(timer)
+    divers, divers_count = compact(divers, valid & ~pick & ~exits)
+    return state.replace(
+        divers=divers,
+        divers_count=divers_count,
+        diver_count=state.diver_count + pick.sum(),
+    )
 
 
-def step_divers():
-    """Perform diver transition."""
-    return
+def step_enemies(
+    enemies: chex.Array,
+    count: int,
+    state: EnvState,
+    f_bullets: chex.Array,
+    f_bullet_count: int,
+):
+    """Move enemies, check sub collisions and hits by friendly bullets.
+
+    Returns the moved enemies, which of them are kept, whether the sub was
+    hit, the remaining friendly bullets (and count) and the number of hits.
+    """
+    valid = entity_mask(enemies, count)
+    # Collision before the enemies move
+    collision = valid & at_sub(enemies, state)
+    # Enemies move if their timer is up and are removed if they exit the frame
+    move = valid & (enemies[:, 3] == 0)
+    new_x = jnp.where(move, move_x(enemies), enemies[:, 0])
+    exits = move & ((new_x < 0) | (new_x > 9))
+    timer = jnp.where(move, state.move_speed, enemies[:, 3] - 1)
+    enemies = enemies.at[:, 0].set(new_x).at[:, 3].set(timer)
+    # Moved enemies collide with the sub or can be hit by a friendly bullet
+    moved_collision = move & ~exits & at_sub(enemies, state)
+    collision |= moved_collision
+    hittable = move & ~exits & ~moved_collision
+    bullets = entity_mask(f_bullets, f_bullet_count)
+    hit, bullet_hit = match_first(enemies, hittable, f_bullets, bullets)
+    f_bullets, f_bullet_count = compact(f_bullets, bullets & ~bullet_hit)
+    keep = valid & ~exits & ~hit
+    return (
+        enemies,
+        keep,
+        collision.any(),
+        (f_bullets, f_bullet_count),
+        hit.sum(),
+    )
 
 
-def step_e_subs():
+@stage("step_e_subs")
+def step_e_subs(
+    state: EnvState, reward: int, params: EnvParams
+) -> Tuple[EnvState, int]:
     """Perform enemy submarine transition."""
-    return
+    valid = entity_mask(state.e_subs, state.e_subs_count)
+    e_subs, keep, collision, (f_bullets, f_bullet_count), hits = step_enemies(
+        state.e_subs,
+        state.e_subs_count,
+        state,
+        state.f_bullets,
+        state.f_bullet_count,
+    )
+    # All subs shoot if their shot timer is up (also the ones removed above)
+    shoot = valid & (e_subs[:, 4] == 0)
+    shot_timer = jnp.where(shoot, params.enemy_shot_interval, e_subs[:, 4] - 1)
+    e_subs = e_subs.at[:, 4].set(shot_timer)
+    # New bullets are appended in the (reversed) order of the subs
+    e_bullets, e_bullet_count = append(
+        state.e_bullets,
+        state.e_bullet_count,
+        e_subs[::-1, :3],
+        shoot[::-1],
+    )
+    e_subs, e_subs_count = compact(e_subs, keep)
+    state = state.replace(
+        e_subs=e_subs,
+        e_subs_count=e_subs_count,
+        e_bullets=e_bullets,
+        e_bullet_count=e_bullet_count,
+        f_bullets=f_bullets,
+        f_bullet_count=f_bullet_count,
+        terminal=jnp.logical_or(state.terminal, collision),
+    )
+    return state, reward + hits
 
 
-def step_e_bullets():
+@stage("step_e_bullets")
+def step_e_bullets(state: EnvState, reward: int) -> Tuple[EnvState, int]:
     """Perform enemy bullets and enemy fish transition."""
-    return
+    # Enemy bullets hit the sub before and after moving, exit at the border
+    e_bullets = state.e_bullets
+    valid = entity_mask(e_bullets, state.e_bullet_count)
+    new_x = move_x(e_bullets)
+    exits = (new_x < 0) | (new_x > 9)
+    bullet_collision = valid & (
+        at_sub(e_bullets, state) | (~exits & at_sub(e_bullets, state, new_x))
+    )
+    e_bullets, e_bullet_count = compact(
+        e_bullets.at[:, 0].set(new_x), valid & ~exits
+    )
+
+    # Enemy fish move and can be hit by friendly bullets
+    e_fish, keep, collision, (f_bullets, f_bullet_count), hits = step_enemies(
+        state.e_fish,
+        state.e_fish_count,
+        state,
+        state.f_bullets,
+        state.f_bullet_count,
+    )
+    e_fish, e_fish_count = compact(e_fish, keep)
+    state = state.replace(
+        e_bullets=e_bullets,
+        e_bullet_count=e_bullet_count,
+        e_fish=e_fish,
+        e_fish_count=e_fish_count,
+        f_bullets=f_bullets,
+        f_bullet_count=f_bullet_count,
+        terminal=state.terminal | bullet_collision.any() | collision,
+    )
+    return state, reward + hits
 
 
+@stage("spawn_enemy")
 def spawn_enemy(
-    key: chex.PRNGKey, state: EnvState, env_params: EnvParams
-) -> chex.Array:
-    """Spawn a new enemy."""
-    lr_key, sub_key, y_key = jax.random.splt(key, 3)
-    lr = jax.random.choice(lr_key, 2, ())
-    is_sub = jax.random.choice(sub_key, 2, (), p=jnp.array([1 / 3, 2 / 3]))
-    x = lax.select(lr, 0, 9)
-    y = jax.random.choice(y_key, jnp.arange(1, 9), ())
-
-    # # Do not spawn in same row an opposite direction as existing
-    # if(any([z[1]==y and z[2]!=lr for z in self.e_subs+self.e_fish])):
-    #     return
-    # if(is_sub):
-    #     self.e_subs+=[[x,y,lr,self.move_speed,enemy_shot_interval]]
-    # else:
-    #     self.e_fish+=[[x,y,lr,self.move_speed]]
-    return jnp.array(
-        [
-            is_sub,
-            x,
-            y,
-            lr,
-            state["move_speed"],
-            env_params["enemy_shot_interval"],
-        ]
+    key: chex.PRNGKey, state: EnvState, spawn: bool, params: EnvParams
+) -> EnvState:
+    """Spawn an enemy fish or sub in a random row and direction.
+
+    Nothing is spawned if an enemy moves in the opposite direction in the row.
+    """
+    key_lr, key_sub, key_y = jax.random.split(key, 3)
+    lr = jax.random.uniform(key_lr) < 1 / 2
+    is_sub = jax.random.uniform(key_sub) < 1 / 3
+    x = jnp.where(lr, 0, 9)
+    y = jax.random.randint(key_y, (), 1, 9)
+    # Do not spawn in same row and opposite direction as an existing enemy
+    blocked = False
+    for enemies, count in [
+        (state.e_subs, state.e_subs_count),
+        (state.e_fish, state.e_fish_count),
+    ]:
+        opposite = (enemies[:, 1] == y) & (enemies[:, 2] != lr)
+        blocked |= jnp.any(entity_mask(enemies, count) & opposite)
+    spawn = jnp.logical_and(spawn, ~blocked)
+    e_subs, e_subs_count = append(
+        state.e_subs,
+        state.e_subs_count,
+        jnp.array([[x, y, lr, state.move_speed, params.enemy_shot_interval]]),
+        jnp.logical_and(spawn, is_sub)[None],
+    )
+    e_fish, e_fish_count = append(
+        state.e_fish,
+        state.e_fish_count,
+        jnp.array([[x, y, lr, state.move_speed]]),
+        jnp.logical_and(spawn, ~is_sub)[None],
+    )
+    return state.replace(
+        e_subs=e_subs,
+        e_subs_count=e_subs_count,
+        e_fish=e_fish,
+        e_fish_count=e_fish_count,
     )
 
 
-def spawn_diver(key: chex.PRNGKey, env_params: EnvParams) -> chex.Array:
-    """Spawn a new diver."""
-    lr_key, y_key = jax.random.splt(key)
-    lr = jax.random.choice(lr_key, 2, ())
-    x = lax.select(lr, 0, 9)
-    y = jax.random.choice(y_key, jnp.arange(1, 9), ())
-    return jnp.array([x, y, lr, env_params.diver_move_interval])
+@stage("spawn_diver")
+def spawn_diver(
+    key: chex.PRNGKey, state: EnvState, spawn: bool, params: EnvParams
+) -> EnvState:
+    """Spawn a diver in a random row and direction."""
+    key_lr, key_y = jax.random.split(key)
+    lr = jax.random.uniform(key_lr) < 1 / 2
+    x = jnp.where(lr, 0, 9)
+    y = jax.random.randint(key_y, (), 1, 9)
+    divers, divers_count = append(
+        state.divers,
+        state.divers_count,
+        jnp.array([[x, y, lr, params.diver_move_interval]]),
+        jnp.asarray(spawn)[None],
+    )
+    return state.replace(divers=divers, divers_count=divers_count)
 
 
-def step_timers(state: EnvState, reward: float, env_params: EnvParams):
+@stage("step_timers")
+def step_timers(
+    state: EnvState, reward: int, params: EnvParams
+) -> Tuple[EnvState, int]:
     """Update the timers of the environment and calculate surface reward."""
-    e_spawn_timer = state.e_spawn_timer - state.e_spawn_timer > 0
-    d_spawn_timer = state.d_spawn_timer - state.d_spawn_timer > 0
-    shot_timer = state.shot_timer - state.shot_timer > 0
-    oxy_term = lax.select(state.oxygen < 0, 1, 0)
-
-    # Update oxygen and surface indicator if submarine is above
-    above_surface = state.sub_y > 0
-    oxygen = lax.select(above_surface, state.oxygen - 1, state.oxygen)
-    surface = lax.select(above_surface, 1, 0)
-
-    # Calculate reward/terminate episode otherwise
-    below_cond = jnp.logical_and(1 - above_surface, 1 - surface)
-    diver_term = jnp.logical_and(below_cond, state.diver_count == 0)
-    surface_cond = jnp.logical_and(below_cond, 1 - (state.diver_count == 0))
-    state, surface_reward = surface(surface_cond, state, env_params)
-    reward += surface_cond * surface_reward
-    # TODO: Replace state ingredients
-    return state, reward
+    out_of_oxygen = state.oxygen <= 0
+    state = state.replace(
+        e_spawn_timer=state.e_spawn_timer - (state.e_spawn_timer > 0),
+        d_spawn_timer=state.d_spawn_timer - (state.d_spawn_timer > 0),
+        shot_timer=state.shot_timer - (state.shot_timer > 0),
+    )
+    # Below surface: use oxygen - At surface: surface if divers are on board
+    below = state.sub_y > 0
+    surfacing = jnp.logical_and(~below, jnp.logical_not(state.surface))
+    no_divers = jnp.logical_and(surfacing, state.diver_count == 0)
+    surfaced, surface_reward = surface(state, params)
+    surface_cond = jnp.logical_and(surfacing, state.diver_count != 0)
+    state = jax.tree_map(
+        lambda x, y: jnp.where(surface_cond, x, y), surfaced, state
+    )
+    state = state.replace(
+        oxygen=state.oxygen - below,
+        surface=jnp.where(below, False, state.surface),
+        terminal=state.terminal | out_of_oxygen | no_divers,
+    )
+    return state, reward + surface_cond * surface_reward
 
 
-def surface(
-    surface_cond: bool, state: EnvState, env_params: EnvParams
-) -> Tuple[EnvState, float]:
+@stage("surface")
+def surface(state: EnvState, params: EnvParams) -> Tuple[EnvState, int]:
     """Perform surface transition and reward calculations."""
-    surface = 1
-    diver_count = lax.select(state.diver_count == 6, 0, state.diver_count)
-    reward = lax.select(
-        state.diver_count == 6,
-        state.oxygen * 10 // env_params.max_oxygen,
-        0,
-    )
-    oxygen = state.oxygen
-    diver_count -= 1
+    # Reward remaining oxygen if 6 divers are on board and drop all of them
+    # Note: As in MinAtar one more diver is dropped afterwards (count -1)
+    all_divers = state.diver_count == 6
+    reward = jnp.where(all_divers, state.oxygen * 10 // params.max_oxygen, 0)
+    diver_count = jnp.where(all_divers, 0, state.diver_count) - 1
+    # Ramp difficulty by faster enemy spawning and movement
     ramp_cond = jnp.logical_and(
-        env_params.ramping,
+        params.ramping,
         jnp.logical_or(state.e_spawn_speed > 1, state.move_speed > 2),
     )
     move_cond = jnp.logical_and(
         ramp_cond,
-        jnp.logical_and(state.move_speed > 2, state.ramp_index % 2),
+        jnp.logical_and(state.move_speed > 2, state.ramp_index % 2 == 1),
     )
-    move_speed = lax.select(move_cond, state.move_speed - 1, state.move_speed)
     e_spawn_cond = jnp.logical_and(ramp_cond, state.e_spawn_speed > 1)
-    e_spawn_speed = lax.select(
-        e_spawn_cond, state.e_spawn_speed - 1, state.e_spawn_speed
-    )
-
-    # Update the state based on the surface_cond - only update if cond met!
-    state.diver_count = lax.select(surface_cond, diver_count, state.diver_count)
-    state.oxygen = lax.select(surface_cond, oxygen, state.oxygen)
-    state.move_speed = lax.select(surface_cond, move_speed, state.move_speed)
-    state.e_spawn_speed = lax.select(
-        surface_cond, e_spawn_speed, state.e_spawn_speed
+    state = state.replace(
+        surface=True,
+        oxygen=params.max_oxygen,
+        diver_count=diver_count,
+        move_speed=state.move_speed - move_cond,
+        e_spawn_speed=state.e_spawn_speed - e_spawn_cond,
+        ramp_index=state.ramp_index + ramp_cond,
     )
     return state, reward
@@ -2,6 +2,9 @@ import jax
 import jax.numpy as jnp
 from jax import lax
 from gymnax.environments import environment, spaces
+from gymnax.environments.profiling import stage
+from gymnax.environments.minatar.render import render_grid
+from gymnax.environments.obs_dtype import check_obs_dtype, obs_space
 from typing import Tuple, Optional
 import chex
 from flax import struct
@@ -54,8 +57,12 @@ class MinSpaceInvaders(environment.Environment):
     - Actions are encoded as follows: ['n','l','r','f']
     """
 
-    def __init__(self, use_minimal_action_set: bool = True):
+    def __init__(
+        self, use_minimal_action_set: bool = True, obs_dtype: str = "float32"
+    ):
         super().__init__()
+        # Observation dtype - float32, bool, uint8 or bit-packed uint8
+        self.obs_dtype = check_obs_dtype(obs_dtype)
         self.obs_shape = (10, 10, 6)
         # Full action set: ['n','l','u','r','d','f']
         self.full_action_set = jnp.array([0, 1, 2, 3, 4, 5])
@@ -81,9 +88,9 @@ class MinSpaceInvaders(environment.Environment):
         a = self.action_set[action]
         state = step_agent(a, state, params)
         # Update aliens - border and collision check.
-        state = step_aliens(state)
+        state, alien_cols = stage("step_aliens")(_step_aliens)(state)
         # Update aliens - shooting check and calculate rewards.
-        state, reward = step_shoot(state, params)
+        state, reward = step_shoot(state, params, alien_cols)
 
         # Update various timers & evaluate all terminal conditions
         shot_timer = state.shot_timer - (state.shot_timer > 0)
@@ -91,7 +98,7 @@ class MinSpaceInvaders(environment.Environment):
         alien_shot_timer = state.alien_shot_timer - 1
 
         # Reset alien map and increase speed if map is cleared
-        reset_map_cond = jnp.count_nonzero(state.alien_map) == 0
+        reset_map_cond = jnp.sum(alien_cols) == reward
         ramping_cond = jnp.logical_and(
             state.enemy_move_interval > 6, state.ramping
         )
@@ -148,21 +155,24 @@ class MinSpaceInvaders(environment.Environment):
         )
         return self.get_obs(state), state
 
+    @stage("get_obs")
     def get_obs(self, state: EnvState) -> chex.Array:
         """Return observation from raw state trafo."""
-        obs = jnp.zeros((10, 10, 6), dtype=bool)
         # Update cannon, aliens - left + right dir, friendly + enemy bullet
-        obs = obs.at[9, state.pos, 0].set(1)
-        obs = obs.at[:, :, 1].set(state.alien_map)
         left_dir_cond = state.alien_dir < 0
-        obs = jax.lax.select(
-            left_dir_cond,
-            obs.at[:, :, 2].set(state.alien_map),
-            obs.at[:, :, 3].set(state.alien_map),
+        alien_map = state.alien_map.astype(bool)
+        return render_grid(
+            self.obs_shape,
+            jnp.array([[9, state.pos, 0]]),
+            {
+                1: alien_map,
+                2: jnp.logical_and(alien_map, left_dir_cond),
+                3: jnp.logical_and(alien_map, jnp.logical_not(left_dir_cond)),
+                4: state.f_bullet_map,
+                5: state.e_bullet_map,
+            },
+            obs_dtype=self.obs_dtype,
         )
-        obs = obs.at[:, :, 4].set(state.f_bullet_map)
-        obs = obs.at[:, :, 5].set(state.e_bullet_map)
-        return obs.astype(jnp.float32)
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
         """Check whether state is terminal."""
@@ -187,7 +197,7 @@ class MinSpaceInvaders(environment.Environment):
 
     def observation_space(self, params: EnvParams) -> spaces.Box:
         """Observation space of the environment."""
-        return spaces.Box(0, 1, self.obs_shape)
+        return obs_space(self.obs_shape, self.obs_dtype)
 
     def state_space(self, params: EnvParams) -> spaces.Dict:
         """State space of the environment."""
@@ -212,6 +222,7 @@ class MinSpaceInvaders(environment.Environment):
         )
 
 
+@stage("step_agent")
 def step_agent(action: int, state: EnvState, params: EnvParams) -> EnvState:
     """Resolve player action - fire, left, right."""
     fire_cond = jnp.logical_and(action == 5, state.shot_timer == 0)
@@ -248,24 +259,32 @@ def step_agent(action: int, state: EnvState, params: EnvParams) -> EnvState:
     )
 
 
+def alien_occupancy(alien_map: chex.Array) -> chex.Array:
+    """Number of aliens in each column of the alien map."""
+    return jnp.sum(alien_map, axis=0)
+
+
+@stage("step_aliens")
 def step_aliens(state: EnvState) -> EnvState:
     """Update aliens - border and collision check."""
+    return _step_aliens(state)[0]
+
+
+def _step_aliens(state: EnvState) -> Tuple[EnvState, chex.Array]:
+    """Move aliens, also return the column occupancy of the moved map."""
+    alien_cols = alien_occupancy(state.alien_map)
     alien_terminal_1 = state.alien_map[9, state.pos]
     alien_move_cond = state.alien_move_timer == 0
 
     alien_move_timer = jax.lax.select(
         alien_move_cond,
         jnp.minimum(
-            jnp.count_nonzero(state.alien_map), state.enemy_move_interval
+            jnp.sum(alien_cols).astype(jnp.int32), state.enemy_move_interval
         ),
         state.alien_move_timer,
     )
-    cond1 = jnp.logical_and(
-        jnp.sum(state.alien_map[:, 0]) > 0, state.alien_dir < 0
-    )
-    cond2 = jnp.logical_and(
-        jnp.sum(state.alien_map[:, 9]) > 0, state.alien_dir > 0
-    )
+    cond1 = jnp.logical_and(alien_cols[0] > 0, state.alien_dir < 0)
+    cond2 = jnp.logical_and(alien_cols[9] > 0, state.alien_dir > 0)
     alien_border_cond = jnp.logical_and(
         alien_move_cond, jnp.logical_or(cond1, cond2)
     )
@@ -275,6 +294,10 @@ def step_aliens(state: EnvState) -> EnvState:
     alien_terminal_2 = jnp.logical_and(
         alien_border_cond, jnp.sum(state.alien_map[9, :]) > 0
     )
+    # Moving down keeps the column occupancy, moving sideways shifts it
+    move_sideways = jnp.logical_and(
+        alien_move_cond, jnp.logical_not(alien_border_cond)
+    )
     alien_map = jax.lax.select(
         alien_move_cond,
         (
@@ -286,6 +309,9 @@ def step_aliens(state: EnvState) -> EnvState:
         ),
         state.alien_map,
     )
+    alien_cols = jax.lax.select(
+        move_sideways, jnp.roll(alien_cols, alien_dir), alien_cols
+    )
     alien_terminal_3 = jnp.logical_and(alien_move_cond, alien_map[9, state.pos])
 
     # Jointly evaluate the 3 alien terminal conditions
@@ -293,16 +319,26 @@ def step_aliens(state: EnvState) -> EnvState:
         alien_terminal_1 + alien_terminal_2 + alien_terminal_3
     ) > 0
     terminal = jnp.logical_or(state.terminal, alien_terminal)
-    return state.replace(
+    state = state.replace(
         alien_move_timer=alien_move_timer,
         alien_dir=alien_dir,
         alien_map=alien_map,
         terminal=terminal,
     )
+    return state, alien_cols
 
 
-def step_shoot(state: EnvState, params: EnvParams) -> Tuple[EnvState, float]:
-    """Update aliens - shooting check and calculate rewards."""
+@stage("step_shoot")
+def step_shoot(
+    state: EnvState,
+    params: EnvParams,
+    alien_cols: Optional[chex.Array] = None,
+) -> Tuple[EnvState, float]:
+    """Update aliens - shooting check and calculate rewards.
+
+    `alien_cols` is the column occupancy of `state.alien_map` (computed if
+    not provided, see `_step_aliens`).
+    """
     reward = 0
     alien_shot_cond = state.alien_shot_timer == 0
     alien_shot_timer = jax.lax.select(
@@ -310,7 +346,9 @@ def step_shoot(state: EnvState, params: EnvParams) -> Tuple[EnvState, float]:
     )
 
     # nearest_alien has 3 outputs used to update map: [alien_exists, loc, id]
-    alien_exists, loc, idx = get_nearest_alien(state.pos, state.alien_map)
+    alien_exists, loc, idx = get_nearest_alien(
+        state.pos, state.alien_map, alien_cols
+    )
     update_aliens_cond = jnp.logical_and(alien_shot_cond, alien_exists)
     e_bullet_map = jax.lax.select(
         update_aliens_cond,
@@ -337,27 +375,24 @@ def step_shoot(state: EnvState, params: EnvParams) -> Tuple[EnvState, float]:
     )
 
 
-def get_nearest_alien(pos: int, alien_map: chex.Array) -> Tuple[int, int, int]:
-    """Find alien closest to player in manhattan distance -> shot target."""
-    ids = jnp.array([jnp.abs(jnp.array([i for i in range(10)]) - pos)])
-    search_order = jnp.argsort(ids).squeeze()
-    results_temp = jnp.zeros(3)
-    aliens_exist = jnp.sum(alien_map, axis=0) > 0
-
-    # Work around for np.where via element-wise multiplication with ids
-    # The output has 3 dims: [alien_exists, location, id]
-    counter = 0
-    for i in search_order[::-1]:
-        locations = alien_map[:, i] * jnp.arange(alien_map[:, i].shape[0])
-        aliens_loc = jnp.max(locations)
-        results_temp = (
-            aliens_exist[i]
-            * results_temp.at[:].set(
-                jnp.array([aliens_exist[i], aliens_loc, i])
-            )
-            + (1 - aliens_exist[i]) * results_temp
-        )
-        counter += 1
-    results_temp = jnp.array(results_temp, dtype=int)
-    # Loop over results in reverse order
-    return results_temp[0], results_temp[1], results_temp[2]
+def get_nearest_alien(
+    pos: int, alien_map: chex.Array, alien_cols: Optional[chex.Array] = None
+) -> Tuple[int, int, int]:
+    """Find alien closest to player in manhattan distance -> shot target.
+
+    Returns [alien_exists, location, id] of the lowest alien in the nearest
+    occupied column (ties resolved to the left), all zero if no alien exists.
+    """
+    rows, cols = alien_map.shape
+    if alien_cols is None:
+        alien_cols = alien_occupancy(alien_map)
+    aliens_exist = alien_cols > 0
+    # Masked argmin returns the first, i.e. leftmost, of equally near columns
+    distance = jnp.where(aliens_exist, jnp.abs(jnp.arange(cols) - pos), cols)
+    idx = jnp.argmin(distance)
+    loc = jnp.max(jnp.where(alien_map[:, idx] > 0, jnp.arange(rows), 0))
+    return (
+        jnp.any(aliens_exist).astype(jnp.int32),
+        loc.astype(jnp.int32),
+        idx.astype(jnp.int32),
+    )
@@ -1,11 +1,17 @@
-from .bernoulli_bandit import BernoulliBandit
-from .gaussian_bandit import GaussianBandit
-from .rooms import FourRooms
-from .meta_maze import MetaMaze
-from .point_robot import PointRobot
-from .reacher import Reacher
-from .swimmer import Swimmer
-from .pong import Pong
+from ..lazy import lazy_getattr
+
+# Environments are imported on first access
+_env_modules = {
+    "BernoulliBandit": ".bernoulli_bandit",
+    "GaussianBandit": ".gaussian_bandit",
+    "FourRooms": ".rooms",
+    "MetaMaze": ".meta_maze",
+    "PointRobot": ".point_robot",
+    "Reacher": ".reacher",
+    "Swimmer": ".swimmer",
+    "Pong": ".pong",
+}
+__getattr__ = lazy_getattr(__name__, _env_modules)
 
 __all__ = [
     "BernoulliBandit",
@@ -2,6 +2,7 @@ import jax
 import jax.numpy as jnp
 from jax import lax
 from gymnax.environments import environment, spaces
+from gymnax.environments.obs_dtype import check_obs_dtype, cast_obs, obs_space
 from typing import Tuple, Optional
 import chex
 from flax import struct
@@ -38,8 +39,11 @@ class Pong(environment.Environment):
         width: int = 40,
         height: int = 30,
         paddle_half_height: int = 2,
+        obs_dtype: str = "float32",
     ):
         super().__init__()
+        # Observation dtype - float32, bool, uint8 or bit-packed uint8
+        self.obs_dtype = check_obs_dtype(obs_dtype)
         # 3 channels: P1/P2 and ball_t, ball_t-1
         self.obs_shape = (height, width, 3)
         self.action_set = jnp.array([0, 1, 2])
@@ -133,7 +137,8 @@ class Pong(environment.Environment):
         ].set(
             1
         )  # paddle
-        return obs.reshape((self.height, self.width, 3)).astype(jnp.float32)
+        obs = obs.reshape((self.height, self.width, 3))
+        return cast_obs(obs, self.obs_dtype)
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
         """Check whether state is terminal."""
@@ -160,7 +165,7 @@ class Pong(environment.Environment):
 
     def observation_space(self, params: EnvParams) -> spaces.Box:
         """Observation space of the environment."""
-        return spaces.Box(0, 2, self.obs_shape)
+        return obs_space(self.obs_shape, self.obs_dtype)
 
     def state_space(self, params: EnvParams) -> spaces.Dict:
         """State space of the environment."""
@@ -2,6 +2,7 @@ import jax
 import jax.numpy as jnp
 from jax import lax
 from gymnax.environments import environment, spaces
+from gymnax.environments.obs_dtype import check_obs_dtype, cast_obs, obs_space
 from typing import Tuple, Optional, List
 import chex
 from flax import struct
@@ -58,6 +59,7 @@ class FourRooms(environment.Environment):
         use_visual_obs: bool = False,
         goal_fixed: List[int] = [8, 9],
         pos_fixed: List[int] = [4, 1],
+        obs_dtype: str = "float32",
     ):
         super().__init__()
         self.env_map = string_to_bool_map(four_rooms_map)
@@ -77,6 +79,10 @@ class FourRooms(environment.Environment):
         # Channel ID 0 - Wall (1) or not occupied (0)
         # Channel ID 1 - Agent location in maze
         self.use_visual_obs = use_visual_obs
+        # Visual observation dtype - float32, bool, uint8 or bit-packed uint8
+        self.obs_dtype = check_obs_dtype(obs_dtype)
+        if not use_visual_obs and obs_dtype != "float32":
+            raise ValueError("Compact obs dtypes require `use_visual_obs`.")
 
         # Set fixed goal and position if we dont resample each time
         self.goal_fixed = jnp.array(goal_fixed)
@@ -150,7 +156,7 @@ class FourRooms(environment.Environment):
             agent_map = jnp.zeros(self.occupied_map.shape)
             agent_map = agent_map.at[state.pos[1], state.pos[0]].set(1)
             obs_array = jnp.stack([self.occupied_map, agent_map], axis=2)
-            return obs_array
+            return cast_obs(obs_array, self.obs_dtype)
 
     def is_terminal(self, state: EnvState, params: EnvParams) -> bool:
         """Check whether state is terminal."""
@@ -183,7 +189,7 @@ class FourRooms(environment.Environment):
     def observation_space(self, params: EnvParams) -> spaces.Box:
         """Observation space of the environment."""
         if self.use_visual_obs:
-            return spaces.Box(0, 1, (13, 13, 2), jnp.float32)
+            return obs_space((13, 13, 2), self.obs_dtype)
         else:
             return spaces.Box(
                 jnp.min(self.coords), jnp.max(self.coords), (4,), jnp.float32
@@ -0,0 +1,52 @@
+import math
+import jax.numpy as jnp
+import chex
+from typing import Tuple
+from gymnax.environments import spaces
+
+# Supported dtypes of binary grid observations (MinAtar, Catch, Pong, etc.)
+# "packed" stores up to 8 channels per uint8 along the last axis
+OBS_DTYPES = ("float32", "bool", "uint8", "packed")
+
+
+def check_obs_dtype(obs_dtype: str) -> str:
+    """Raise an error if observation dtype is not supported."""
+    if obs_dtype not in OBS_DTYPES:
+        raise ValueError(
+            f"{obs_dtype} is not a valid observation dtype {OBS_DTYPES}."
+        )
+    return obs_dtype
+
+
+def cast_obs(obs: chex.Array, obs_dtype: str) -> chex.Array:
+    """Cast binary grid observation to the requested dtype."""
+    if obs_dtype == "packed":
+        return pack_bits(obs)
+    return obs.astype(obs_dtype)
+
+
+def obs_space(shape: Tuple[int, ...], obs_dtype: str) -> spaces.Box:
+    """Observation space of a binary grid for the given dtype."""
+    if obs_dtype == "packed":
+        packed_shape = shape[:-1] + (math.ceil(shape[-1] / 8),)
+        return spaces.Box(0, 255, packed_shape, jnp.uint8)
+    return spaces.Box(0, 1, shape, jnp.dtype(obs_dtype))
+
+
+def pack_bits(obs: chex.Array) -> chex.Array:
+    """Pack binary channels (last axis) into uint8 bit-planes."""
+    return jnp.packbits(obs.astype(bool), axis=-1, bitorder="little")
+
+
+def unpack_bits(
+    packed: chex.Array, num_channels: int, dtype: jnp.dtype = jnp.float32
+) -> chex.Array:
+    """Unpack uint8 bit-planes into `num_channels` binary channels.
+
+    Only uses shifts and masks, so it can be jitted as part of the agent's
+    first layer and fuses with the following matmul/convolution.
+    """
+    bits = jnp.arange(8, dtype=jnp.uint8)
+    unpacked = (packed[..., None] >> bits) & 1
+    unpacked = unpacked.reshape(*packed.shape[:-1], -1)[..., :num_channels]
+    return unpacked.astype(dtype)
@@ -0,0 +1,121 @@
+import contextlib
+import functools
+import threading
+import time
+from typing import Callable, Dict, List
+
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+# Recorders of the `ProfileWrapper` currently being traced
+_recorders: List["StageRecorder"] = []
+
+
+class StageRecorder(object):
+    """Host-side start/end timestamps of profiled environment stages."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.events = []
+
+    def record(self, stage: str, kind: str):
+        with self._lock:
+            self.events.append((stage, kind, time.perf_counter()))
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Number of calls, total and mean wall time (seconds) per stage.
+
+        Batched stages emit one event per batch element, so a call spans
+        from the first start to the last end event of the stage.
+        """
+        intervals = {}
+        for stage, kind, t in self.events:
+            calls = intervals.setdefault(stage, [])
+            if kind == "start" and (not calls or calls[-1][2]):
+                calls.append([t, t, False])
+            elif kind == "end" and calls:
+                calls[-1][1], calls[-1][2] = t, True
+        summary = {}
+        for stage, calls in intervals.items():
+            total = sum(end - start for start, end, done in calls if done)
+            count = sum(done for _, _, done in calls)
+            summary[stage] = {
+                "count": count,
+                "total_time": total,
+                "mean_time": total / max(count, 1),
+            }
+        return summary
+
+
+@contextlib.contextmanager
+def record_stages(recorder: StageRecorder):
+    """Instrument all stages traced within the context with host callbacks."""
+    _recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorders.pop()
+
+
+def _is_data(x) -> bool:
+    """Numeric array leaf (no Python scalar, static field or PRNG key)."""
+    return isinstance(x, jax.Array) and not jax.dtypes.issubdtype(
+        x.dtype, jax.dtypes.prng_key
+    )
+
+
+def _first_elements(tree) -> List[chex.Array]:
+    """Tiny slices of all array leaves to create data dependencies."""
+    return [
+        x.ravel()[:1] for x in jax.tree_util.tree_leaves(tree) if _is_data(x)
+    ]
+
+
+def _timed_call(recorder: StageRecorder, name: str, fn: Callable, args, kwargs):
+    """Call `fn` between a start and an end host callback."""
+
+    def start(*_):
+        recorder.record(name, "start")
+        return np.bool_(True)
+
+    # Gate the inputs on the start callback so the stage cannot run before
+    ok = jax.pure_callback(
+        start, jax.ShapeDtypeStruct((), jnp.bool_), _first_elements(args)
+    )
+    args, kwargs = jax.tree_map(
+        lambda x: (jnp.where(ok, x, jnp.zeros_like(x)) if _is_data(x) else x),
+        (args, kwargs),
+    )
+    out = fn(*args, **kwargs)
+    jax.debug.callback(
+        lambda *_: recorder.record(name, "end"), _first_elements(out)
+    )
+    return out
+
+
+def stage(name: str) -> Callable[[Callable], Callable]:
+    """Decorate a step/reset stage with `jax.named_scope(name)`.
+
+    Profiler traces then attribute the fused ops to the stage. When traced
+    by a `ProfileWrapper`, the stage is additionally timed via host
+    callbacks. Can also be applied to a bound method inline, e.g.
+    `stage("step_env")(self.step_env)(key, state, action, params)`.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with jax.named_scope(name):
+                if not _recorders:
+                    return fn(*args, **kwargs)
+                return _timed_call(_recorders[-1], name, fn, args, kwargs)
+
+        return wrapper
+
+    return decorator
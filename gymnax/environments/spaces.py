@@ -1,40 +1,83 @@
-from typing import Tuple, Sequence, Any, Dict
+from typing import Tuple, Sequence, Any, Dict, List
 from collections import OrderedDict
+from collections.abc import Mapping
 import chex
 import jax
 import jax.numpy as jnp
 import numpy as np
-from gym import spaces as gspc
 
 
 class Space:
     """
     Minimal jittable class for abstract gymnax space.
+
+    Spaces are registered pytrees: bounds/category counts are leaves, so
+    spaces can be passed through `jit` and batched with `vmap`, while shape
+    and dtype are static. `sample(rng, shape)` draws a batch of `shape`
+    samples in one call and `contains` reduces only over the space's own
+    dimensions, i.e. it returns one bool per batch element.
     """
 
-    def sample(self, rng: chex.PRNGKey) -> chex.Array:
+    # Attributes stored as pytree leaves and as static aux data
+    _leaf_fields: Tuple[str, ...] = ()
+    _static_fields: Tuple[str, ...] = ("shape", "dtype")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        jax.tree_util.register_pytree_node_class(cls)
+
+    def tree_flatten(self):
+        children = tuple(getattr(self, f) for f in self._leaf_fields)
+        aux = tuple(getattr(self, f) for f in self._static_fields)
+        return children, aux
+
+    @classmethod
+    def tree_unflatten(cls, aux, children):
+        # Leaves may be tracers/None - bypass the checks in __init__
+        space = object.__new__(cls)
+        for f, v in zip(cls._leaf_fields, children):
+            setattr(space, f, v)
+        for f, v in zip(cls._static_fields, aux):
+            setattr(space, f, v)
+        return space
+
+    def sample(self, rng: chex.PRNGKey, shape: Tuple[int, ...] = ()):
         raise NotImplementedError
 
     def contains(self, x: jnp.int_) -> bool:
         raise NotImplementedError
 
+    def sample_batch(self, rng: chex.PRNGKey, n: int):
+        """Sample `n` elements with a single random number call."""
+        return self.sample(rng, (n,))
+
+    def _batch_ndim(self, x: chex.Array) -> int:
+        # Values with fewer dims than the declared shape have no batch axes
+        return max(jnp.ndim(x) - len(self.shape), 0)
+
 
 class Discrete(Space):
     """
     Minimal jittable class for discrete gymnax spaces.
-    TODO: For now this is a 1d space. Make composable for multi-discrete.
+    See `MultiDiscrete` for multiple categorical dimensions.
     """
 
+    _leaf_fields = ("n",)
+
     def __init__(self, num_categories: int):
-        assert num_categories >= 0
+        # Traced sizes (e.g. from batched EnvParams) can't be checked here
+        if not isinstance(num_categories, jax.core.Tracer):
+            assert num_categories >= 0
         self.n = num_categories
         self.shape = ()
         self.dtype = jnp.int_
 
-    def sample(self, rng: chex.PRNGKey) -> chex.Array:
+    def sample(
+        self, rng: chex.PRNGKey, shape: Tuple[int, ...] = ()
+    ) -> chex.Array:
         """Sample random action uniformly from set of categorical choices."""
         return jax.random.randint(
-            rng, shape=self.shape, minval=0, maxval=self.n
+            rng, shape=shape + self.shape, minval=0, maxval=self.n
         ).astype(self.dtype)
 
     def contains(self, x: jnp.int_) -> bool:
@@ -45,12 +88,64 @@ class Discrete(Space):
         return range_cond
 
 
+class MultiDiscrete(Space):
+    """Jittable class for independent categorical dimensions."""
+
+    _leaf_fields = ("nvec",)
+
+    def __init__(self, nvec: Sequence[int]):
+        self.nvec = jnp.asarray(nvec, dtype=jnp.int32)
+        # Traced nvec (space built inside jit) can only be checked at runtime
+        if not isinstance(self.nvec, jax.core.Tracer):
+            assert (self.nvec >= 0).all()
+        self.shape = self.nvec.shape
+        self.dtype = jnp.int_
+
+    def sample(
+        self, rng: chex.PRNGKey, shape: Tuple[int, ...] = ()
+    ) -> chex.Array:
+        """Sample each dimension uniformly from its categories."""
+        return jax.random.randint(
+            rng, shape=shape + self.shape, minval=0, maxval=self.nvec
+        ).astype(self.dtype)
+
+    def contains(self, x: jnp.int_) -> bool:
+        """Check whether all dimensions are valid categories."""
+        range_cond = jnp.logical_and(x >= 0, x < self.nvec)
+        axes = tuple(range(self._batch_ndim(x), jnp.ndim(x)))
+        return jnp.all(range_cond, axis=axes)
+
+
+class MultiBinary(Space):
+    """Jittable class for binary vectors/arrays."""
+
+    def __init__(self, n: Any):
+        self.shape = (n,) if isinstance(n, int) else tuple(n)
+        self.dtype = jnp.int8
+
+    def sample(
+        self, rng: chex.PRNGKey, shape: Tuple[int, ...] = ()
+    ) -> chex.Array:
+        """Sample each entry as fair coin flip."""
+        return jax.random.bernoulli(rng, shape=shape + self.shape).astype(
+            self.dtype
+        )
+
+    def contains(self, x: jnp.int_) -> bool:
+        """Check whether all entries are 0 or 1."""
+        range_cond = jnp.logical_or(x == 0, x == 1)
+        axes = tuple(range(self._batch_ndim(x), jnp.ndim(x)))
+        return jnp.all(range_cond, axis=axes)
+
+
 class Box(Space):
     """
     Minimal jittable class for array-shaped gymnax spaces.
     TODO: Add unboundedness - sampling from other distributions, etc.
     """
 
+    _leaf_fields = ("low", "high")
+
     def __init__(
         self,
         low: float,
@@ -60,21 +155,25 @@ class Box(Space):
     ):
         self.low = low
         self.high = high
-        self.shape = shape
+        self.shape = (shape,) if isinstance(shape, int) else tuple(shape)
         self.dtype = dtype
 
-    def sample(self, rng: chex.PRNGKey) -> chex.Array:
+    def sample(
+        self, rng: chex.PRNGKey, shape: Tuple[int, ...] = ()
+    ) -> chex.Array:
         """Sample random action uniformly from 1D continuous range."""
         return jax.random.uniform(
-            rng, shape=self.shape, minval=self.low, maxval=self.high
+            rng, shape=shape + self.shape, minval=self.low, maxval=self.high
         ).astype(self.dtype)
 
     def contains(self, x: jnp.int_) -> bool:
         """Check whether specific object is within space."""
         # type_cond = isinstance(x, self.dtype)
         # shape_cond = (x.shape == self.shape)
+        axes = tuple(range(self._batch_ndim(x), jnp.ndim(x)))
         range_cond = jnp.logical_and(
-            jnp.all(x >= self.low), jnp.all(x <= self.high)
+            jnp.all(x >= self.low, axis=axes),
+            jnp.all(x <= self.high, axis=axes),
         )
         return range_cond
 
@@ -82,16 +181,26 @@ class Box(Space):
 class Dict(Space):
     """Minimal jittable class for dictionary of simpler jittable spaces."""
 
+    _static_fields = ("keys",)
+
     def __init__(self, spaces: Dict[Any, Space]):
         self.spaces = spaces
         self.num_spaces = len(spaces)
+        self.keys = tuple(spaces.keys())
+
+    def tree_flatten(self):
+        return tuple(self.spaces[k] for k in self.keys), (self.keys,)
 
-    def sample(self, rng: chex.PRNGKey) -> Dict:
+    @classmethod
+    def tree_unflatten(cls, aux, children):
+        return cls(OrderedDict(zip(aux[0], children)))
+
+    def sample(self, rng: chex.PRNGKey, shape: Tuple[int, ...] = ()) -> Dict:
         """Sample random action from all subspaces."""
         key_split = jax.random.split(rng, self.num_spaces)
         return OrderedDict(
             [
-                (k, self.spaces[k].sample(key_split[i]))
+                (k, self.spaces[k].sample(key_split[i], shape))
                 for i, k in enumerate(self.spaces)
             ]
         )
@@ -100,11 +209,12 @@ class Dict(Space):
         """Check whether dimensions of object are within subspace."""
         # type_cond = isinstance(x, Dict)
         # num_space_cond = len(x) != len(self.spaces)
-        # Check for each space individually
-        out_of_space = 0
+        # Check for each space individually (dicts or state dataclasses)
+        in_space = True
         for k, space in self.spaces.items():
-            out_of_space += 1 - space.contains(getattr(x, k))
-        return out_of_space == 0
+            x_k = x[k] if isinstance(x, Mapping) else getattr(x, k)
+            in_space = jnp.logical_and(in_space, space.contains(x_k))
+        return in_space
 
 
 class Tuple(Space):
@@ -114,11 +224,20 @@ class Tuple(Space):
         self.spaces = spaces
         self.num_spaces = len(spaces)
 
-    def sample(self, rng: chex.PRNGKey) -> Tuple[chex.Array]:
+    def tree_flatten(self):
+        return tuple(self.spaces), ()
+
+    @classmethod
+    def tree_unflatten(cls, aux, children):
+        return cls(tuple(children))
+
+    def sample(
+        self, rng: chex.PRNGKey, shape: Tuple[int, ...] = ()
+    ) -> Tuple[chex.Array]:
         """Sample random action from all subspaces."""
         key_split = jax.random.split(rng, self.num_spaces)
         return tuple(
-            [s.sample(key_split[i]) for i, s in enumerate(self.spaces)]
+            [s.sample(key_split[i], shape) for i, s in enumerate(self.spaces)]
         )
 
     def contains(self, x: jnp.int_) -> bool:
@@ -126,16 +245,95 @@ class Tuple(Space):
         # type_cond = isinstance(x, tuple)
         # num_space_cond = len(x) != len(self.spaces)
         # Check for each space individually
-        out_of_space = 0
+        in_space = True
         for i, space in enumerate(self.spaces):
-            out_of_space += 1 - space.contains(x[i])
-        return out_of_space == 0
+            in_space = jnp.logical_and(in_space, space.contains(x[i]))
+        return in_space
+
+
+def _leaf_spaces(space: Space) -> List[Space]:
+    """Non-composite subspaces in flattening order."""
+    if isinstance(space, Dict):
+        return [s for k in space.keys for s in _leaf_spaces(space.spaces[k])]
+    if isinstance(space, Tuple):
+        return [s for sub in space.spaces for s in _leaf_spaces(sub)]
+    return [space]
+
+
+def _leaf_values(space: Space, x: Any) -> List[chex.Array]:
+    """Values of the non-composite subspaces in flattening order."""
+    if isinstance(space, Dict):
+        return [
+            v
+            for k in space.keys
+            for v in _leaf_values(
+                space.spaces[k],
+                x[k] if isinstance(x, Mapping) else getattr(x, k),
+            )
+        ]
+    if isinstance(space, Tuple):
+        return [
+            v for s, x_s in zip(space.spaces, x) for v in _leaf_values(s, x_s)
+        ]
+    return [x]
+
 
+def flat_offsets(space: Space) -> List[int]:
+    """Start offsets of the subspaces in the flat vector (+ total size)."""
+    sizes = [int(np.prod(s.shape)) for s in _leaf_spaces(space)]
+    return list(np.cumsum([0] + sizes))
 
-def gymnax_space_to_gym_space(space: Space) -> gspc.Space:
+
+def flatdim(space: Space) -> int:
+    """Size of the flattened space."""
+    return flat_offsets(space)[-1]
+
+
+def flatten(space: Space, x: Any, dtype: jnp.dtype = jnp.float32) -> chex.Array:
+    """Concatenate a (batch of) space element(s) into flat vectors.
+
+    Discrete/MultiDiscrete/MultiBinary values are stored as numbers (no
+    one-hot encoding), so `unflatten` recovers them exactly.
+    """
+    leaves = _leaf_spaces(space)
+    values = _leaf_values(space, x)
+    batch_shape = jnp.shape(values[0])[: leaves[0]._batch_ndim(values[0])]
+    return jnp.concatenate(
+        [jnp.reshape(v, batch_shape + (-1,)).astype(dtype) for v in values],
+        axis=-1,
+    )
+
+
+def unflatten(space: Space, x: chex.Array) -> Any:
+    """Split flat vectors into (a batch of) space element(s)."""
+    offsets = iter(flat_offsets(space))
+    next(offsets)
+    start = [0]
+
+    def split(s: Space):
+        if isinstance(s, Dict):
+            return OrderedDict([(k, split(s.spaces[k])) for k in s.keys])
+        if isinstance(s, Tuple):
+            return tuple(split(sub) for sub in s.spaces)
+        end = int(next(offsets))
+        value = x[..., start[0] : end].reshape(x.shape[:-1] + tuple(s.shape))
+        start[0] = end
+        return value.astype(s.dtype)
+
+    return split(space)
+
+
+def gymnax_space_to_gym_space(space: Space) -> "gym.spaces.Space":
     """Convert Gymnax space to equivalent Gym space"""
+    # gym is only needed for the conversion, keep it out of `import gymnax`
+    from gym import spaces as gspc
+
     if isinstance(space, Discrete):
         return gspc.Discrete(space.n)
+    elif isinstance(space, MultiDiscrete):
+        return gspc.MultiDiscrete(np.asarray(space.nvec))
+    elif isinstance(space, MultiBinary):
+        return gspc.MultiBinary(space.shape)
     elif isinstance(space, Box):
         low = (
             float(space.low)
@@ -150,10 +348,10 @@ def gymnax_space_to_gym_space(space: Space) -> gspc.Space:
         return gspc.Box(low, high, space.shape, space.dtype)
     elif isinstance(space, Dict):
         return gspc.Dict(
-            {k: gymnax_space_to_gym_space(v) for k, v in space.spaces}
+            {k: gymnax_space_to_gym_space(v) for k, v in space.spaces.items()}
         )
     elif isinstance(space, Tuple):
-        return gspc.Tuple(space.spaces)
+        return gspc.Tuple([gymnax_space_to_gym_space(s) for s in space.spaces])
     else:
         raise NotImplementedError(
             f"Conversion of {space.__class__.__name__} not supported"
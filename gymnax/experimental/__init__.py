@@ -1,6 +1,7 @@
-from .rollout import RolloutWrapper
+from .rollout import RolloutWrapper, Transition
 
 
 __all__ = [
     "RolloutWrapper",
+    "Transition",
 ]
@@ -1,13 +1,36 @@
 import jax
 import jax.numpy as jnp
+import chex
+import numpy as np
 import gymnax
+from flax import struct
+from jax.experimental.shard_map import shard_map
+from jax.sharding import Mesh, NamedSharding, PartitionSpec as P
 from functools import partial
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
-# TODO: Add RNN forward with init_carry/hidden
-# TODO: Add pmap utitlities if multi-device
 # TODO: Use as backend in `GymFitness` or keep separated?
 
+# "trajectory": stacked (obs, action, reward, next_obs, done) + return
+# "stats": only return, length and user accumulators
+# "chunks": stats, with fixed-size trajectory windows streamed to a host
+#           callback or kept as ring buffer of the last window
+ROLLOUT_OUTPUTS = ("trajectory", "stats", "chunks")
+
+
+@struct.dataclass
+class Transition:
+    obs: chex.Array
+    action: chex.Array
+    reward: chex.Array
+    next_obs: chex.Array
+    done: chex.Array
+    valid: chex.Array  # 1 until the first episode terminates
+
+
+# name -> (initial value, fn(acc, transition) -> acc)
+Accumulators = Dict[str, Tuple[Any, Callable[[Any, Transition], Any]]]
+
 
 class RolloutWrapper(object):
     def __init__(
@@ -17,25 +40,121 @@ class RolloutWrapper(object):
         num_env_steps: Optional[int] = None,
         env_kwargs: dict = {},
         env_params: dict = {},
+        output: str = "trajectory",
+        accumulators: Optional[Accumulators] = None,
+        chunk_size: Optional[int] = None,
+        chunk_callback: Optional[Callable] = None,
+        early_exit_chunk: Optional[int] = None,
+        num_devices: int = 1,
+        init_carry: Optional[Callable] = None,
     ):
-        """Wrapper to define batch evaluation for generation parameters."""
+        """Wrapper to define batch evaluation for generation parameters.
+
+        Args:
+            output: One of `ROLLOUT_OUTPUTS`. "stats" and "chunks" never
+                materialize the full trajectory.
+            accumulators: Extra reductions for "stats"/"chunks" outputs,
+                mapping name -> (init, fn(acc, transition) -> acc). Use
+                `transition.valid` to mask steps after the first episode.
+            chunk_size: Window length for "chunks" output, must divide the
+                number of environment steps.
+            chunk_callback: Host function `fn(chunk_id, transition)` called
+                with each stacked window. If None, the last window is
+                returned as ring buffer under the "window" key.
+            early_exit_chunk: If set, step in chunks of this many steps with
+                `lax.while_loop` and stop once the first episode is done.
+                Under vmap the loop runs until all members are done.
+                Trajectories are zero-padded after the first episode ends
+                and the episode length is appended to the "trajectory"
+                outputs.
+            num_devices: Number of local devices to shard the population
+                of `population_rollout` over (-1 for all local devices).
+                The population is padded to a multiple of the devices.
+            init_carry: Recurrent policies - `fn(policy_params) -> hidden`
+                returning the initial hidden state of a single episode. The
+                forward is then called as `model_forward(policy_params, obs,
+                hidden, rng) -> (action, hidden)` and the hidden state is
+                reset to `init_carry(policy_params)` whenever `done`.
+        """
+        if output not in ROLLOUT_OUTPUTS:
+            raise ValueError(
+                f"{output} is not a valid rollout output {ROLLOUT_OUTPUTS}."
+            )
         self.env_name = env_name
         # Define the RL environment & network forward function
         self.env, self.env_params = gymnax.make(self.env_name, **env_kwargs)
         self.env_params = self.env_params.replace(**env_params)
         self.model_forward = model_forward
+        self.init_carry = init_carry
 
         if num_env_steps is None:
             self.num_env_steps = self.env_params.max_steps_in_episode
         else:
             self.num_env_steps = num_env_steps
 
+        self.output = output
+        self.accumulators = accumulators or {}
+        if output == "chunks":
+            if chunk_size is None or self.num_env_steps % chunk_size != 0:
+                raise ValueError(
+                    f"chunk_size {chunk_size} must divide the number of"
+                    f" environment steps {self.num_env_steps}."
+                )
+        self.chunk_size = chunk_size
+        self.chunk_callback = chunk_callback
+        if early_exit_chunk is not None:
+            if output == "chunks":
+                raise ValueError("Early exit only supports trajectory/stats.")
+            if self.num_env_steps % early_exit_chunk != 0:
+                raise ValueError(
+                    f"early_exit_chunk {early_exit_chunk} must divide the"
+                    f" number of environment steps {self.num_env_steps}."
+                )
+        self.early_exit_chunk = early_exit_chunk
+
+        if num_devices == -1:
+            num_devices = jax.local_device_count()
+        if not 1 <= num_devices <= jax.local_device_count():
+            raise ValueError(
+                f"num_devices {num_devices} exceeds the"
+                f" {jax.local_device_count()} local devices."
+            )
+        self.num_devices = num_devices
+        self.mesh = Mesh(np.array(jax.local_devices()[:num_devices]), ("pop",))
+
     @partial(jax.jit, static_argnums=(0,))
     def population_rollout(self, rng_eval, policy_params):
         """Reshape parameter vector and evaluate the generation."""
         # Evaluate population of nets on gymnax task - vmap over rng & params
         pop_rollout = jax.vmap(self.batch_rollout, in_axes=(None, 0))
-        return pop_rollout(rng_eval, policy_params)
+        if self.num_devices == 1:
+            return pop_rollout(rng_eval, policy_params)
+
+        # Pad population to a multiple of the devices by cycling members
+        pop_size = jax.tree_util.tree_leaves(policy_params)[0].shape[0]
+        num_pad = -pop_size % self.num_devices
+        if num_pad:
+            member_ids = jnp.arange(pop_size + num_pad) % pop_size
+            policy_params = jax.tree_map(
+                lambda x: jnp.take(x, member_ids, axis=0), policy_params
+            )
+        # Each device evaluates its slice of the population
+        sharded_rollout = shard_map(
+            pop_rollout,
+            mesh=self.mesh,
+            in_specs=(P(), P("pop")),
+            out_specs=P("pop"),
+            check_rep=False,
+        )
+        out = sharded_rollout(rng_eval, policy_params)
+        # Gather the results back and strip the padded members
+        replicated = NamedSharding(self.mesh, P())
+        return jax.tree_map(
+            lambda x: jax.lax.with_sharding_constraint(x, replicated)[
+                :pop_size
+            ],
+            out,
+        )
 
     @partial(jax.jit, static_argnums=(0,))
     def batch_rollout(self, rng_eval, policy_params):
@@ -46,19 +165,37 @@ class RolloutWrapper(object):
 
     @partial(jax.jit, static_argnums=(0,))
     def single_rollout(self, rng_input, policy_params):
-        """Rollout a pendulum episode with lax.scan."""
+        """Rollout an episode with lax.scan."""
+        if self.early_exit_chunk is not None:
+            return self._early_exit_rollout(rng_input, policy_params)
+        if self.output == "stats":
+            return self._stats_rollout(rng_input, policy_params)
+        if self.output == "chunks":
+            return self._chunked_rollout(rng_input, policy_params)
         # Reset the environment
         rng_reset, rng_episode = jax.random.split(rng_input)
         obs, state = self.env.reset(rng_reset, self.env_params)
+        hidden = self._init_hidden(policy_params)
+        rng_episode, step_inputs = self._random_step_inputs(rng_episode)
 
-        def policy_step(state_input, tmp):
+        def policy_step(state_input, step_input):
             """lax.scan compatible step transition in jax env."""
-            obs, state, policy_params, rng, cum_reward, valid_mask = state_input
-            rng, rng_step, rng_net = jax.random.split(rng, 3)
-            if self.model_forward is not None:
-                action = self.model_forward(policy_params, obs, rng_net)
+            (
+                obs,
+                state,
+                hidden,
+                policy_params,
+                rng,
+                cum_reward,
+                valid_mask,
+            ) = state_input
+            if step_input is None:
+                rng, rng_step, rng_net = jax.random.split(rng, 3)
+                action, hidden = self._policy_action(
+                    policy_params, obs, hidden, rng_net
+                )
             else:
-                action = self.env.action_space(self.env_params).sample(rng_net)
+                rng_step, action = step_input
             next_obs, next_state, reward, done, _ = self.env.step(
                 rng_step, state, action, self.env_params
             )
@@ -67,6 +204,7 @@ class RolloutWrapper(object):
             carry = [
                 next_obs,
                 next_state,
+                self._reset_hidden(policy_params, hidden, done),
                 policy_params,
                 rng,
                 new_cum_reward,
@@ -81,19 +219,243 @@ class RolloutWrapper(object):
             [
                 obs,
                 state,
+                hidden,
                 policy_params,
                 rng_episode,
                 jnp.array([0.0]),
                 jnp.array([1.0]),
             ],
-            (),
-            self.env_params.max_steps_in_episode,
+            step_inputs,
+            self.num_env_steps,
         )
         # Return the sum of rewards accumulated by agent in episode rollout
         obs, action, reward, next_obs, done = scan_out
         cum_return = carry_out[-2]
         return obs, action, reward, next_obs, done, cum_return
 
+    def _init_hidden(self, policy_params):
+        """Initial hidden state of a recurrent policy (None if stateless)."""
+        if self.init_carry is None:
+            return None
+        return self.init_carry(policy_params)
+
+    def _reset_hidden(self, policy_params, hidden, done):
+        """Reset the hidden state of a recurrent policy at episode end."""
+        if self.init_carry is None:
+            return hidden
+        return jax.tree_map(
+            lambda h0, h: jnp.where(done, h0, h),
+            self.init_carry(policy_params),
+            hidden,
+        )
+
+    def _policy_action(self, policy_params, obs, hidden, rng_net):
+        """Select action with the (recurrent) policy or sample randomly."""
+        if self.model_forward is None:
+            action = self.env.action_space(self.env_params).sample(rng_net)
+            return action, hidden
+        if self.init_carry is None:
+            return self.model_forward(policy_params, obs, rng_net), hidden
+        return self.model_forward(policy_params, obs, hidden, rng_net)
+
+    def _random_step_inputs(self, rng_episode):
+        """Pre-sample all step keys and actions of a random policy.
+
+        Replaces the per-step key splits and action sampling in the scan by
+        one `split` and one batched `sample_batch` call. Returns None as
+        scan inputs if a policy network is used.
+        """
+        if self.model_forward is not None:
+            return rng_episode, None
+        rng_episode, rng_keys, rng_actions = jax.random.split(rng_episode, 3)
+        step_keys = jax.random.split(rng_keys, self.num_env_steps)
+        actions = self.env.action_space(self.env_params).sample_batch(
+            rng_actions, self.num_env_steps
+        )
+        return rng_episode, (step_keys, actions)
+
+    def _transition(self, carry, policy_params, step_input=None):
+        """Step the environment once and update the reductions."""
+        obs, state, hidden, rng, stats = carry
+        if step_input is None:
+            rng, rng_step, rng_net = jax.random.split(rng, 3)
+            action, hidden = self._policy_action(
+                policy_params, obs, hidden, rng_net
+            )
+        else:
+            rng_step, action = step_input
+        next_obs, next_state, reward, done, _ = self.env.step(
+            rng_step, state, action, self.env_params
+        )
+        valid = stats["valid"]
+        transition = Transition(obs, action, reward, next_obs, done, valid)
+        new_stats = {
+            "return": stats["return"] + reward * valid,
+            "length": stats["length"] + valid,
+            "valid": valid * (1 - done),
+        }
+        for name, (_, acc_fn) in self.accumulators.items():
+            new_stats[name] = acc_fn(stats[name], transition)
+        hidden = self._reset_hidden(policy_params, hidden, done)
+        return (next_obs, next_state, hidden, rng, new_stats), transition
+
+    def _init_rollout(self, rng_input, policy_params):
+        """Reset the environment, hidden state and the reductions."""
+        rng_reset, rng_episode = jax.random.split(rng_input)
+        obs, state = self.env.reset(rng_reset, self.env_params)
+        stats = {
+            "return": jnp.float32(0.0),
+            "length": jnp.int32(0),
+            "valid": jnp.int32(1),
+        }
+        for name, (init, _) in self.accumulators.items():
+            stats[name] = init
+        hidden = self._init_hidden(policy_params)
+        rng_episode, step_inputs = self._random_step_inputs(rng_episode)
+        return (obs, state, hidden, rng_episode, stats), step_inputs
+
+    def _stats_rollout(self, rng_input, policy_params):
+        """Rollout an episode keeping only the reductions in the carry."""
+
+        def policy_step(carry, step_input):
+            carry, _ = self._transition(carry, policy_params, step_input)
+            return carry, None
+
+        carry, step_inputs = self._init_rollout(rng_input, policy_params)
+        carry, _ = jax.lax.scan(
+            policy_step, carry, step_inputs, self.num_env_steps
+        )
+        stats = carry[-1]
+        stats.pop("valid")
+        return stats
+
+    def _chunked_rollout(self, rng_input, policy_params):
+        """Rollout an episode in fixed-size windows of transitions."""
+
+        num_chunks = self.num_env_steps // self.chunk_size
+
+        def policy_step(carry, step_input):
+            return self._transition(carry, policy_params, step_input)
+
+        def chunk_step(chunk_carry, chunk_input):
+            carry, _ = chunk_carry
+            chunk_id, step_inputs = chunk_input
+            carry, window = jax.lax.scan(
+                policy_step, carry, step_inputs, self.chunk_size
+            )
+            if self.chunk_callback is not None:
+                jax.debug.callback(self.chunk_callback, chunk_id, window)
+                window = None
+            return (carry, window), None
+
+        carry, step_inputs = self._init_rollout(rng_input, policy_params)
+        # Group the pre-sampled step inputs by chunk
+        step_inputs = jax.tree_map(
+            lambda x: x.reshape(num_chunks, self.chunk_size, *x.shape[1:]),
+            step_inputs,
+        )
+        window = None
+        if self.chunk_callback is None:
+            # Ring buffer holding the most recent window of transitions
+            window_shape = jax.eval_shape(
+                lambda c, xs: jax.lax.scan(policy_step, c, xs, self.chunk_size)[
+                    1
+                ],
+                carry,
+                jax.tree_map(lambda x: x[0], step_inputs),
+            )
+            window = jax.tree_map(
+                lambda x: jnp.zeros(x.shape, x.dtype), window_shape
+            )
+        (carry, window), _ = jax.lax.scan(
+            chunk_step,
+            (carry, window),
+            (jnp.arange(num_chunks), step_inputs),
+        )
+        stats = carry[-1]
+        stats.pop("valid")
+        if window is not None:
+            stats["window"] = window
+        return stats
+
+    def _early_exit_rollout(self, rng_input, policy_params):
+        """Rollout chunks of steps until the first episode is done."""
+        chunk_size = self.early_exit_chunk
+        num_chunks = self.num_env_steps // chunk_size
+        keep_trajectory = self.output == "trajectory"
+
+        def policy_step(carry, step_input):
+            carry, transition = self._transition(
+                carry, policy_params, step_input
+            )
+            return carry, (transition if keep_trajectory else None)
+
+        def cond_fn(loop_carry):
+            chunk_id, carry, _ = loop_carry
+            return (chunk_id < num_chunks) & (carry[-1]["valid"] > 0)
+
+        def body_fn(loop_carry):
+            chunk_id, carry, traj = loop_carry
+            chunk_inputs = jax.tree_map(
+                lambda x: jax.lax.dynamic_slice_in_dim(
+                    x, chunk_id * chunk_size, chunk_size
+                ),
+                step_inputs,
+            )
+            carry, window = jax.lax.scan(
+                policy_step, carry, chunk_inputs, chunk_size
+            )
+            if keep_trajectory:
+                # Zero the auto-reset steps after the first episode ended
+                window = jax.tree_map(
+                    lambda w: jnp.where(
+                        jnp.expand_dims(
+                            window.valid > 0, tuple(range(1, w.ndim))
+                        ),
+                        w,
+                        jnp.zeros_like(w),
+                    ),
+                    window,
+                )
+                traj = jax.tree_map(
+                    lambda x, w: jax.lax.dynamic_update_slice_in_dim(
+                        x, w, chunk_id * chunk_size, axis=0
+                    ),
+                    traj,
+                    window,
+                )
+            return chunk_id + 1, carry, traj
+
+        carry, step_inputs = self._init_rollout(rng_input, policy_params)
+        traj = None
+        if keep_trajectory:
+            # Zero-padded buffers for the full episode
+            traj_shape = jax.eval_shape(
+                lambda c, xs: jax.lax.scan(
+                    policy_step, c, xs, self.num_env_steps
+                )[1],
+                carry,
+                step_inputs,
+            )
+            traj = jax.tree_map(
+                lambda x: jnp.zeros(x.shape, x.dtype), traj_shape
+            )
+        _, carry, traj = jax.lax.while_loop(cond_fn, body_fn, (0, carry, traj))
+        stats = carry[-1]
+        stats.pop("valid")
+        if not keep_trajectory:
+            return stats
+        cum_return = jnp.reshape(stats["return"], (1,))
+        return (
+            traj.obs,
+            traj.action,
+            traj.reward,
+            traj.next_obs,
+            traj.done,
+            cum_return,
+            stats["length"],
+        )
+
     @property
     def input_shape(self):
         """Get the shape of the observation."""
@@ -1,104 +1,155 @@
-from .environments import (
-    Pendulum,
-    CartPole,
-    MountainCar,
-    ContinuousMountainCar,
-    Acrobot,
-    Catch,
-    DeepSea,
-    DiscountingChain,
-    MemoryChain,
-    UmbrellaChain,
-    MNISTBandit,
-    SimpleBandit,
-    MinAsterix,
-    MinBreakout,
-    MinFreeway,
-    MinSeaquest,
-    MinSpaceInvaders,
-    BernoulliBandit,
-    GaussianBandit,
-    FourRooms,
-    MetaMaze,
-    PointRobot,
-    Reacher,
-    Swimmer,
-    Pong,
-)
+import importlib
+from collections import namedtuple
+from typing import Any, Callable, Dict, Optional, Union
+
+# Environment id -> "module:class", modules are only imported in `make`
+_builtin_envs = {
+    # 1. Classic OpenAI Control Tasks
+    "Pendulum-v1": "gymnax.environments.classic_control.pendulum:Pendulum",
+    "CartPole-v1": "gymnax.environments.classic_control.cartpole:CartPole",
+    "MountainCar-v0": (
+        "gymnax.environments.classic_control.mountain_car:MountainCar"
+    ),
+    "MountainCarContinuous-v0": (
+        "gymnax.environments.classic_control.continuous_mountain_car:"
+        "ContinuousMountainCar"
+    ),
+    "Acrobot-v1": "gymnax.environments.classic_control.acrobot:Acrobot",
+    # 2. DeepMind's bsuite environments
+    "Catch-bsuite": "gymnax.environments.bsuite.catch:Catch",
+    "DeepSea-bsuite": "gymnax.environments.bsuite.deep_sea:DeepSea",
+    "DiscountingChain-bsuite": (
+        "gymnax.environments.bsuite.discounting_chain:DiscountingChain"
+    ),
+    "MemoryChain-bsuite": "gymnax.environments.bsuite.memory_chain:MemoryChain",
+    "UmbrellaChain-bsuite": (
+        "gymnax.environments.bsuite.umbrella_chain:UmbrellaChain"
+    ),
+    "MNISTBandit-bsuite": "gymnax.environments.bsuite.mnist:MNISTBandit",
+    "SimpleBandit-bsuite": "gymnax.environments.bsuite.bandit:SimpleBandit",
+    # 3. MinAtar Environments
+    "Asterix-MinAtar": "gymnax.environments.minatar.asterix:MinAsterix",
+    "Breakout-MinAtar": "gymnax.environments.minatar.breakout:MinBreakout",
+    "Freeway-MinAtar": "gymnax.environments.minatar.freeway:MinFreeway",
+    "Seaquest-MinAtar": "gymnax.environments.minatar.seaquest:MinSeaquest",
+    "SpaceInvaders-MinAtar": (
+        "gymnax.environments.minatar.space_invaders:MinSpaceInvaders"
+    ),
+    # 4. Miscellanoues Environments
+    "BernoulliBandit-misc": (
+        "gymnax.environments.misc.bernoulli_bandit:BernoulliBandit"
+    ),
+    "GaussianBandit-misc": (
+        "gymnax.environments.misc.gaussian_bandit:GaussianBandit"
+    ),
+    "FourRooms-misc": "gymnax.environments.misc.rooms:FourRooms",
+    "MetaMaze-misc": "gymnax.environments.misc.meta_maze:MetaMaze",
+    "PointRobot-misc": "gymnax.environments.misc.point_robot:PointRobot",
+    "Reacher-misc": "gymnax.environments.misc.reacher:Reacher",
+    "Swimmer-misc": "gymnax.environments.misc.swimmer:Swimmer",
+    "Pong-misc": "gymnax.environments.misc.pong:Pong",
+}
+
+# Environment id -> (entry point, default kwargs)
+_env_registry = {
+    env_id: (entry_point, {}) for env_id, entry_point in _builtin_envs.items()
+}
+
+# Instances returned by `make`, keyed by (env_id, frozen kwargs)
+_make_cache = {}
+_make_cache_stats = {"hits": 0, "misses": 0}
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "currsize"])
 
 # =============================================================================
 
 
+def register(
+    env_id: str,
+    entry_point: Union[str, Callable],
+    default_kwargs: Optional[Dict[str, Any]] = None,
+):
+    """Register a (third-party) environment for `gymnax.make`.
+
+    Args:
+        env_id: Environment id, e.g. "MyEnv-v0".
+        entry_point: Environment class/factory or "module:class" string,
+            which is only imported on the first `make` call.
+        default_kwargs: Constructor kwargs, overwritten by `make` kwargs.
+    """
+    if env_id in registered_envs:
+        raise ValueError(f"{env_id} is already a registered environment.")
+    _env_registry[env_id] = (entry_point, default_kwargs or {})
+    registered_envs.append(env_id)
+
+
 def make(env_id: str, **env_kwargs):
-    """A JAX-version of OpenAI's infamous env.make(env_name)"""
+    """A JAX-version of OpenAI's infamous env.make(env_name)
+
+    Instances are memoized by env id and kwargs, so that repeated calls
+    reuse the jitted `step`/`reset` (static on the env instance) without
+    re-tracing and compiling. See `make.cache_info`/`make.cache_clear`.
+    The returned instance is shared by all callers with the same id and
+    kwargs, so do not set attributes on it - modify a `copy.copy(env)`
+    (as `env.with_reset_strategy` does) or call `make.cache_clear()`.
+    """
     if env_id not in registered_envs:
         raise ValueError(f"{env_id} is not in registered gymnax environments.")
 
-    # 1. Classic OpenAI Control Tasks
-    if env_id == "Pendulum-v1":
-        env = Pendulum(**env_kwargs)
-    elif env_id == "CartPole-v1":
-        env = CartPole(**env_kwargs)
-    elif env_id == "MountainCar-v0":
-        env = MountainCar(**env_kwargs)
-    elif env_id == "MountainCarContinuous-v0":
-        env = ContinuousMountainCar(**env_kwargs)
-    elif env_id == "Acrobot-v1":
-        env = Acrobot(**env_kwargs)
+    entry_point, default_kwargs = _env_registry[env_id]
+    env_kwargs = {**default_kwargs, **env_kwargs}
+    try:
+        cache_key = (env_id, _freeze(env_kwargs))
+    except TypeError:
+        # Unhashable kwargs (e.g. arrays) - always build a new instance
+        cache_key = None
+    if cache_key is not None and cache_key in _make_cache:
+        _make_cache_stats["hits"] += 1
+        env = _make_cache[cache_key]
+        return env, env.default_params
 
-    # 2. DeepMind's bsuite environments
-    elif env_id == "Catch-bsuite":
-        env = Catch(**env_kwargs)
-    elif env_id == "DeepSea-bsuite":
-        env = DeepSea(**env_kwargs)
-    elif env_id == "DiscountingChain-bsuite":
-        env = DiscountingChain(**env_kwargs)
-    elif env_id == "MemoryChain-bsuite":
-        env = MemoryChain(**env_kwargs)
-    elif env_id == "UmbrellaChain-bsuite":
-        env = UmbrellaChain(**env_kwargs)
-    elif env_id == "MNISTBandit-bsuite":
-        env = MNISTBandit(**env_kwargs)
-    elif env_id == "SimpleBandit-bsuite":
-        env = SimpleBandit(**env_kwargs)
-
-    # 3. MinAtar Environments
-    elif env_id == "Asterix-MinAtar":
-        env = MinAsterix(**env_kwargs)
-    elif env_id == "Breakout-MinAtar":
-        env = MinBreakout(**env_kwargs)
-    elif env_id == "Freeway-MinAtar":
-        env = MinFreeway(**env_kwargs)
-    elif env_id == "Seaquest-MinAtar":
-        raise NotImplementedError("Seaquest is not yet supported.")
-        env = MinSeaquest(**env_kwargs)
-    elif env_id == "SpaceInvaders-MinAtar":
-        env = MinSpaceInvaders(**env_kwargs)
-
-    # 4. Miscellanoues Environments
-    elif env_id == "BernoulliBandit-misc":
-        env = BernoulliBandit(**env_kwargs)
-    elif env_id == "GaussianBandit-misc":
-        env = GaussianBandit(**env_kwargs)
-    elif env_id == "FourRooms-misc":
-        env = FourRooms(**env_kwargs)
-    elif env_id == "MetaMaze-misc":
-        env = MetaMaze(**env_kwargs)
-    elif env_id == "PointRobot-misc":
-        env = PointRobot(**env_kwargs)
-    elif env_id == "Reacher-misc":
-        env = Reacher(**env_kwargs)
-    elif env_id == "Swimmer-misc":
-        env = Swimmer(**env_kwargs)
-    elif env_id == "Pong-misc":
-        env = Pong(**env_kwargs)
-    else:
-        raise ValueError("Environment ID is not registered.")
+    _make_cache_stats["misses"] += 1
+    if isinstance(entry_point, str):
+        # Only import the module of the requested environment
+        module_name, class_name = entry_point.split(":")
+        entry_point = getattr(importlib.import_module(module_name), class_name)
+    env = entry_point(**env_kwargs)
+    if cache_key is not None:
+        _make_cache[cache_key] = env
 
     # Create a jax PRNG key for random seed control
     return env, env.default_params
 
 
+def cache_info() -> CacheInfo:
+    """Hits, misses and number of memoized environments of `make`."""
+    return CacheInfo(
+        _make_cache_stats["hits"],
+        _make_cache_stats["misses"],
+        len(_make_cache),
+    )
+
+
+def cache_clear():
+    """Drop all memoized environments and reset the cache statistics."""
+    _make_cache.clear()
+    _make_cache_stats.update(hits=0, misses=0)
+
+
+make.cache_info = cache_info
+make.cache_clear = cache_clear
+
+
+def _freeze(value):
+    """Hashable version of nested kwargs, raises TypeError if impossible."""
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in sorted(value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value),) + tuple(_freeze(v) for v in value)
+    # Keep the type so that e.g. 1, 1.0 and True are different kwargs
+    hash(value)
+    return (type(value), value)
+
+
 registered_envs = [
     "CartPole-v1",
     "Pendulum-v1",
@@ -108,7 +159,7 @@ registered_envs = [
     "Asterix-MinAtar",
     "Breakout-MinAtar",
     "Freeway-MinAtar",
-    # "Seaquest-MinAtar",
+    "Seaquest-MinAtar",
     "SpaceInvaders-MinAtar",
     "Catch-bsuite",
     "DeepSea-bsuite",
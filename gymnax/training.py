@@ -0,0 +1,351 @@
+"""Fused (Anakin-style) PPO training loop on gymnax environments.
+
+The whole loop - acting in a vmapped batch of environments, scanning over
+the rollout length, GAE and minibatch epochs - is compiled into a single
+XLA program. Serves as reference trainer to benchmark environment changes
+end to end. Requires `optax` (`pip install gymnax[training]`).
+
+Usage: python -m gymnax.training --env_name CartPole-v1
+"""
+
+import argparse
+import dataclasses
+import time
+from typing import Any, Callable, NamedTuple, Optional, Sequence, Tuple
+
+import chex
+import flax.linen as nn
+import jax
+import jax.numpy as jnp
+import numpy as np
+from flax import struct
+from flax.training.train_state import TrainState
+
+from .environments import spaces
+from .registration import make
+from .wrappers.purerl import FlattenObservationWrapper, LogWrapper
+
+try:
+    import optax
+except ImportError:  # pragma: no cover
+    optax = None
+
+
+@struct.dataclass
+class PPOConfig:
+    env_name: str = "CartPole-v1"
+    num_envs: int = 8
+    num_steps: int = 128
+    total_timesteps: int = 500_000
+    update_epochs: int = 4
+    num_minibatches: int = 4
+    lr: float = 2.5e-4
+    anneal_lr: bool = True
+    gamma: float = 0.99
+    gae_lambda: float = 0.95
+    clip_eps: float = 0.2
+    ent_coef: float = 0.01
+    vf_coef: float = 0.5
+    max_grad_norm: float = 0.5
+
+    @property
+    def num_updates(self) -> int:
+        return self.total_timesteps // self.num_steps // self.num_envs
+
+    @property
+    def minibatch_size(self) -> int:
+        return self.num_envs * self.num_steps // self.num_minibatches
+
+
+class ActorCritic(nn.Module):
+    """MLP actor-critic - categorical or diagonal Gaussian policy head.
+
+    Custom models have to follow the same interface: `apply(params, obs)`
+    returns the policy parameters (logits or (mean, log_std)) and the value.
+    """
+
+    action_dim: int
+    discrete: bool = True
+    hidden_sizes: Sequence[int] = (64, 64)
+
+    @nn.compact
+    def __call__(self, x):
+        actor, critic = x, x
+        for size in self.hidden_sizes:
+            actor = nn.tanh(nn.Dense(size)(actor))
+            critic = nn.tanh(nn.Dense(size)(critic))
+        pi = nn.Dense(
+            self.action_dim, kernel_init=nn.initializers.orthogonal(0.01)
+        )(actor)
+        if not self.discrete:
+            log_std = self.param(
+                "log_std", nn.initializers.zeros, (self.action_dim,)
+            )
+            pi = (pi, log_std)
+        value = nn.Dense(1, kernel_init=nn.initializers.orthogonal(1.0))(critic)
+        return pi, jnp.squeeze(value, axis=-1)
+
+
+class Transition(NamedTuple):
+    done: chex.Array
+    action: chex.Array
+    value: chex.Array
+    reward: chex.Array
+    log_prob: chex.Array
+    obs: chex.Array
+    info: Any
+
+
+def _policy_fns(discrete: bool):
+    """Sample, log-prob and entropy of the categorical/Gaussian policy."""
+    if discrete:
+
+        def sample(rng, logits):
+            return jax.random.categorical(rng, logits)
+
+        def log_prob(logits, action):
+            log_p = jax.nn.log_softmax(logits)
+            return jnp.take_along_axis(log_p, action[..., None], -1)[..., 0]
+
+        def entropy(logits):
+            log_p = jax.nn.log_softmax(logits)
+            return -jnp.sum(jnp.exp(log_p) * log_p, axis=-1)
+
+    else:
+
+        def sample(rng, pi):
+            mean, log_std = pi
+            return mean + jnp.exp(log_std) * jax.random.normal(rng, mean.shape)
+
+        def log_prob(pi, action):
+            mean, log_std = pi
+            z = (action - mean) / jnp.exp(log_std)
+            return jnp.sum(
+                -0.5 * z**2 - log_std - 0.5 * jnp.log(2 * jnp.pi), axis=-1
+            )
+
+        def entropy(pi):
+            _, log_std = pi
+            return jnp.sum(log_std + 0.5 * jnp.log(2 * jnp.pi * jnp.e))
+
+    return sample, log_prob, entropy
+
+
+def make_train(
+    config: PPOConfig,
+    model: Optional[nn.Module] = None,
+    env_kwargs: dict = {},
+) -> Callable[[chex.PRNGKey], Tuple[Any, dict]]:
+    """Build the fused PPO `train(rng) -> (runner_state, metrics)` function.
+
+    `metrics` holds the `LogWrapper` episode statistics of every step, with
+    leading (num_updates, num_steps, num_envs) axes.
+    """
+    if optax is None:
+        raise ImportError("gymnax.training requires optax to be installed.")
+    env, env_params = make(config.env_name, **env_kwargs)
+    env = LogWrapper(FlattenObservationWrapper(env))
+    action_space = env.action_space(env_params)
+    discrete = isinstance(action_space, spaces.Discrete)
+    if model is None:
+        action_dim = action_space.n if discrete else action_space.shape[0]
+        model = ActorCritic(action_dim, discrete=discrete)
+    sample_fn, log_prob_fn, entropy_fn = _policy_fns(discrete)
+
+    def linear_schedule(count):
+        frac = 1.0 - (
+            count // (config.num_minibatches * config.update_epochs)
+        ) / (config.num_updates)
+        return config.lr * frac
+
+    def train(rng: chex.PRNGKey):
+        # Initialize network, optimizer and environments
+        rng, rng_init, rng_reset = jax.random.split(rng, 3)
+        obs_shape = env.observation_space(env_params).shape
+        network_params = model.init(rng_init, jnp.zeros(obs_shape))
+        tx = optax.chain(
+            optax.clip_by_global_norm(config.max_grad_norm),
+            optax.adam(
+                linear_schedule if config.anneal_lr else config.lr, eps=1e-5
+            ),
+        )
+        train_state = TrainState.create(
+            apply_fn=model.apply, params=network_params, tx=tx
+        )
+        reset_keys = jax.random.split(rng_reset, config.num_envs)
+        obs, env_state = jax.vmap(env.reset, in_axes=(0, None))(
+            reset_keys, env_params
+        )
+
+        def env_step(runner_state, unused):
+            """Act in all environments for a single step."""
+            train_state, env_state, last_obs, rng = runner_state
+            rng, rng_act, rng_step = jax.random.split(rng, 3)
+            pi, value = model.apply(train_state.params, last_obs)
+            action = sample_fn(rng_act, pi)
+            log_prob = log_prob_fn(pi, action)
+            step_keys = jax.random.split(rng_step, config.num_envs)
+            obs, env_state, reward, done, info = jax.vmap(
+                env.step, in_axes=(0, 0, 0, None)
+            )(step_keys, env_state, action, env_params)
+            transition = Transition(
+                done, action, value, reward, log_prob, last_obs, info
+            )
+            return (train_state, env_state, obs, rng), transition
+
+        def calculate_gae(traj_batch, last_val):
+            """Generalized advantage estimation with a reverse scan."""
+
+            def gae_step(carry, transition):
+                gae, next_value = carry
+                not_done = 1.0 - transition.done
+                delta = (
+                    transition.reward
+                    + config.gamma * next_value * not_done
+                    - transition.value
+                )
+                gae = delta + config.gamma * config.gae_lambda * not_done * gae
+                return (gae, transition.value), gae
+
+            _, advantages = jax.lax.scan(
+                gae_step,
+                (jnp.zeros_like(last_val), last_val),
+                traj_batch,
+                reverse=True,
+            )
+            return advantages, advantages + traj_batch.value
+
+        def loss_fn(params, traj_batch, gae, targets):
+            """Clipped PPO surrogate, clipped value loss and entropy bonus."""
+            pi, value = model.apply(params, traj_batch.obs)
+            log_prob = log_prob_fn(pi, traj_batch.action)
+            value_clipped = traj_batch.value + (value - traj_batch.value).clip(
+                -config.clip_eps, config.clip_eps
+            )
+            value_loss = (
+                0.5
+                * jnp.maximum(
+                    jnp.square(value - targets),
+                    jnp.square(value_clipped - targets),
+                ).mean()
+            )
+            ratio = jnp.exp(log_prob - traj_batch.log_prob)
+            gae = (gae - gae.mean()) / (gae.std() + 1e-8)
+            loss_actor = -jnp.minimum(
+                ratio * gae,
+                jnp.clip(ratio, 1.0 - config.clip_eps, 1.0 + config.clip_eps)
+                * gae,
+            ).mean()
+            entropy = entropy_fn(pi).mean()
+            total_loss = (
+                loss_actor
+                + config.vf_coef * value_loss
+                - config.ent_coef * entropy
+            )
+            return total_loss, (value_loss, loss_actor, entropy)
+
+        def update_epoch(update_state, unused):
+            """Shuffle the rollout and update on all minibatches."""
+            train_state, traj_batch, advantages, targets, rng = update_state
+            rng, rng_perm = jax.random.split(rng)
+            batch_size = config.minibatch_size * config.num_minibatches
+            permutation = jax.random.permutation(rng_perm, batch_size)
+            batch = (traj_batch, advantages, targets)
+            batch = jax.tree_map(
+                lambda x: x.reshape((batch_size,) + x.shape[2:]), batch
+            )
+            minibatches = jax.tree_map(
+                lambda x: jnp.take(x, permutation, axis=0).reshape(
+                    (config.num_minibatches, -1) + x.shape[1:]
+                ),
+                batch,
+            )
+
+            def update_minibatch(train_state, minibatch):
+                traj, gae, target = minibatch
+                grad_fn = jax.value_and_grad(loss_fn, has_aux=True)
+                losses, grads = grad_fn(train_state.params, traj, gae, target)
+                return train_state.apply_gradients(grads=grads), losses
+
+            train_state, losses = jax.lax.scan(
+                update_minibatch, train_state, minibatches
+            )
+            update_state = (train_state, traj_batch, advantages, targets, rng)
+            return update_state, losses
+
+        def update_step(runner_state, unused):
+            """Collect a rollout and run the PPO epochs on it."""
+            runner_state, traj_batch = jax.lax.scan(
+                env_step, runner_state, None, config.num_steps
+            )
+            train_state, env_state, last_obs, rng = runner_state
+            _, last_val = model.apply(train_state.params, last_obs)
+            advantages, targets = calculate_gae(traj_batch, last_val)
+            update_state = (train_state, traj_batch, advantages, targets, rng)
+            update_state, losses = jax.lax.scan(
+                update_epoch, update_state, None, config.update_epochs
+            )
+            train_state, rng = update_state[0], update_state[-1]
+            runner_state = (train_state, env_state, last_obs, rng)
+            return runner_state, traj_batch.info
+
+        runner_state = (train_state, env_state, obs, rng)
+        runner_state, metrics = jax.lax.scan(
+            update_step, runner_state, None, config.num_updates
+        )
+        return runner_state, metrics
+
+    return train
+
+
+def run(
+    config: PPOConfig,
+    seed: int = 0,
+    model: Optional[nn.Module] = None,
+) -> Tuple[Any, dict]:
+    """Compile and run PPO training, reporting compile time and steps/sec."""
+    train = jax.jit(make_train(config, model))
+    rng = jax.random.PRNGKey(seed)
+    start = time.perf_counter()
+    compiled = train.lower(rng).compile()
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    runner_state, metrics = jax.block_until_ready(compiled(rng))
+    run_time = time.perf_counter() - start
+    num_steps = config.num_updates * config.num_steps * config.num_envs
+    returns = metrics["returned_episode_returns"]
+    done = metrics["returned_episode"]
+    # Mean return of the episodes finished in the last update
+    final_return = np.asarray(
+        (returns[-1] * done[-1]).sum() / np.maximum(done[-1].sum(), 1)
+    )
+    report = {
+        "compile_time": compile_time,
+        "run_time": run_time,
+        "steps_per_sec": num_steps / run_time,
+        "final_return": float(final_return),
+    }
+    return runner_state, report
+
+
+def _str_to_bool(value: str) -> bool:
+    return value.lower() in ("true", "1", "yes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fused PPO on gymnax.")
+    for field in dataclasses.fields(PPOConfig):
+        arg_type = _str_to_bool if field.type is bool else field.type
+        parser.add_argument(
+            f"--{field.name}", type=arg_type, default=field.default
+        )
+    parser.add_argument("--seed", type=int, default=0)
+    args = vars(parser.parse_args())
+    seed = args.pop("seed")
+    _, report = run(PPOConfig(**args), seed)
+    for key, value in report.items():
+        print(f"{key:<16}{value:>16,.2f}")
+
+
+if __name__ == "__main__":
+    main()
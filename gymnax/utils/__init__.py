@@ -1,3 +1,4 @@
+from .dataset_store import get_dataset, clear_datasets
 from .state_translate import np_state_to_jax
 from .test_helpers import (
     assert_correct_state,
@@ -7,6 +8,8 @@ from .test_helpers import (
 
 
 __all__ = [
+    "get_dataset",
+    "clear_datasets",
     "np_state_to_jax",
     "assert_correct_state",
     "assert_correct_transit",
@@ -0,0 +1,28 @@
+"""Process-wide store of device-resident datasets for data-backed envs.
+
+Each dataset is transferred to the device once and shared by all
+environment instances. Environments pass the buffers to `step`/`reset`
+through their `EnvParams` instead of capturing them as jit constants.
+"""
+
+from typing import Callable, Dict, Tuple
+
+import chex
+import jax
+import jax.numpy as jnp
+
+_datasets: Dict[str, Tuple[chex.Array, ...]] = {}
+
+
+def get_dataset(
+    name: str, load_fn: Callable[[], Tuple[chex.Array, ...]]
+) -> Tuple[chex.Array, ...]:
+    """Return device buffers of a dataset, loading it on first request."""
+    if name not in _datasets:
+        _datasets[name] = jax.tree_map(jnp.asarray, load_fn())
+    return _datasets[name]
+
+
+def clear_datasets():
+    """Release all stored device buffers."""
+    _datasets.clear()
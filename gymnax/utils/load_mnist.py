@@ -18,57 +18,98 @@
 
 Adapted from https://github.com/google/jax/blob/master/examples/datasets.py
 and https://github.com/deepmind/bsuite/blob/master/bsuite/utils/datasets.py
+
+The gzipped IDX files are parsed once per split and stored as uncompressed
+`.npy` files next to them, which are afterwards memory-mapped.
 """
 
-import array
 import gzip
 import os
+import shutil
 from os import path
-import struct
+from typing import Optional, Tuple
 
 from absl import logging
 import numpy as np
 from six.moves.urllib.request import urlretrieve
 
+# CVDF mirror of http://yann.lecun.com/exdb/mnist/
+BASE_URL = "https://storage.googleapis.com/cvdf-datasets/mnist/"
+DEFAULT_DIRECTORY = "/tmp/mnist"
+SPLIT_FILES = {
+    "train": ("train-images-idx3-ubyte.gz", "train-labels-idx1-ubyte.gz"),
+    "test": ("t10k-images-idx3-ubyte.gz", "t10k-labels-idx1-ubyte.gz"),
+}
+
 
-def _download(url, filename, directory="/tmp/mnist"):
-    """Download a url to a file in the given directory."""
+def _download(url, filename, directory="/tmp/mnist", source_dir=None):
+    """Download a url (or copy from an offline source dir) to a directory."""
     if not path.exists(directory):
         os.makedirs(directory)
     out_file = path.join(directory, filename)
-    if not path.isfile(out_file):
+    if path.isfile(out_file):
+        return
+    if source_dir is not None:
+        # Offline hosts - copy raw files from a local mirror
+        shutil.copy(path.join(source_dir, filename), out_file)
+        logging.info("Copied %s from %s", filename, source_dir)
+    else:
         urlretrieve(url, out_file)
         logging.info("Downloaded %s to %s", url, directory)
 
 
-def load_mnist(directory="/tmp/mnist"):
-    """Download and parse the raw MNIST dataset."""
-    # CVDF mirror of http://yann.lecun.com/exdb/mnist/
-    base_url = "https://storage.googleapis.com/cvdf-datasets/mnist/"
-
-    def parse_labels(filename):
-        with gzip.open(filename, "rb") as fh:
-            _ = struct.unpack(">II", fh.read(8))
-            return np.array(array.array("B", fh.read()), dtype=np.uint8)
-
-    def parse_images(filename):
-        with gzip.open(filename, "rb") as fh:
-            _, num_data, rows, cols = struct.unpack(">IIII", fh.read(16))
-            return np.array(array.array("B", fh.read()), dtype=np.int8).reshape(
-                (num_data, rows, cols)
-            )
-
-    for filename in [
-        "train-images-idx3-ubyte.gz",
-        "train-labels-idx1-ubyte.gz",
-        "t10k-images-idx3-ubyte.gz",
-        "t10k-labels-idx1-ubyte.gz",
-    ]:
-        _download(base_url + filename, filename, directory)
-
-    train_images = parse_images(path.join(directory, "train-images-idx3-ubyte.gz"))
-    train_labels = parse_labels(path.join(directory, "train-labels-idx1-ubyte.gz"))
-    test_images = parse_images(path.join(directory, "t10k-images-idx3-ubyte.gz"))
-    test_labels = parse_labels(path.join(directory, "t10k-labels-idx1-ubyte.gz"))
-
-    return (train_images, train_labels), (test_images, test_labels)
+def _parse_idx(filename: str, header_bytes: int) -> np.ndarray:
+    """Parse a gzipped IDX file into a uint8 array."""
+    with gzip.open(filename, "rb") as fh:
+        header = np.frombuffer(fh.read(header_bytes), dtype=">u4")
+        data = np.frombuffer(fh.read(), dtype=np.uint8)
+    return data.reshape(header[1:])
+
+
+def _save_npy(array: np.ndarray, filename: str):
+    """Atomically write a `.npy` file (safe for concurrent workers)."""
+    tmp_file = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as fh:
+        np.save(fh, array)
+    os.replace(tmp_file, filename)
+
+
+def load_mnist_split(
+    split: str = "train",
+    directory: str = DEFAULT_DIRECTORY,
+    source_dir: Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Load memory-mapped uint8 images and labels of one MNIST split.
+
+    Args:
+        split: "train" or "test".
+        directory: Directory of the raw files and the `.npy` cache.
+        source_dir: Optional local directory with the raw gzipped files,
+            used instead of downloading them (defaults to the
+            `GYMNAX_MNIST_DIR` environment variable).
+    """
+    if split not in SPLIT_FILES:
+        raise ValueError(f"{split} is not a valid MNIST split {SPLIT_FILES}.")
+    if source_dir is None:
+        source_dir = os.environ.get("GYMNAX_MNIST_DIR")
+    images_file = path.join(directory, f"{split}-images.npy")
+    labels_file = path.join(directory, f"{split}-labels.npy")
+    if not (path.isfile(images_file) and path.isfile(labels_file)):
+        images_gz, labels_gz = SPLIT_FILES[split]
+        for filename in [images_gz, labels_gz]:
+            _download(BASE_URL + filename, filename, directory, source_dir)
+        images = _parse_idx(path.join(directory, images_gz), 16)
+        labels = _parse_idx(path.join(directory, labels_gz), 8)
+        _save_npy(images, images_file)
+        _save_npy(labels, labels_file)
+    images = np.load(images_file, mmap_mode="r")
+    labels = np.load(labels_file, mmap_mode="r")
+    return images, labels
+
+
+def load_mnist(directory="/tmp/mnist", source_dir=None):
+    """Load the train and test splits of the raw MNIST dataset."""
+    return (
+        load_mnist_split("train", directory, source_dir),
+        load_mnist_split("test", directory, source_dir),
+    )
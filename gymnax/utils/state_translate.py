@@ -223,12 +223,14 @@ def minatar_np_to_jax(
 
             return EnvState(**state_gym_to_jax)
     elif env_name == "Breakout-MinAtar":
+        from gymnax.environments.minatar.breakout import pack_bricks
+
         state_gym_to_jax = {
             "ball_y": jnp.array(env.env.ball_y),
             "ball_x": jnp.array(env.env.ball_x),
             "ball_dir": env.env.ball_dir,
             "pos": env.env.pos,
-            "brick_map": jnp.array(env.env.brick_map),
+            "brick_mask": pack_bricks(env.env.brick_map),
             "strike": env.env.strike,
             "last_y": jnp.array(env.env.last_y),
             "last_x": jnp.array(env.env.last_x),
@@ -252,21 +254,24 @@ def minatar_np_to_jax(
 
             return EnvState(**state_gym_to_jax)
     elif env_name == "Seaquest-MinAtar":
-        f_bullets = np.zeros((100, 3))
-        for i, f_b in enumerate(env.env.f_bullets):
-            f_bullets[i] = f_b
-        e_bullets = np.zeros((100, 3))
-        for i, e_b in enumerate(env.env.e_bullets):
-            e_bullets[i] = e_b
-        e_fish = np.zeros((100, 5))
-        for i, e_f in enumerate(env.env.e_fish):
-            e_fish[i] = e_f + [10]
-        e_subs = np.zeros((100, 5))
-        for i, e_s in enumerate(env.env.e_subs):
-            e_subs[i] = e_s
-        divers = np.zeros((100, 4))
-        for i, d in enumerate(env.env.divers):
-            divers[i] = d
+        from gymnax.environments.minatar.seaquest import (
+            MAX_DIVERS,
+            MAX_E_BULLETS,
+            MAX_ENEMIES,
+            MAX_F_BULLETS,
+        )
+
+        def entity_buffer(entities, capacity, num_features):
+            buffer = np.zeros((capacity, num_features), dtype=np.int32)
+            if len(entities) > 0:
+                buffer[: len(entities)] = np.array(entities, dtype=np.int32)
+            return jnp.array(buffer)
+
+        f_bullets = entity_buffer(env.env.f_bullets, MAX_F_BULLETS, 3)
+        e_bullets = entity_buffer(env.env.e_bullets, MAX_E_BULLETS, 3)
+        e_fish = entity_buffer(env.env.e_fish, MAX_ENEMIES, 4)
+        e_subs = entity_buffer(env.env.e_subs, MAX_ENEMIES, 5)
+        divers = entity_buffer(env.env.divers, MAX_DIVERS, 4)
 
         state_gym_to_jax = {
             "oxygen": env.env.oxygen,
@@ -282,6 +287,7 @@ def minatar_np_to_jax(
             "e_subs_count": len(env.env.e_subs),
             "e_subs": e_subs,
             "diver_count": env.env.diver_count,
+            "divers_count": len(env.env.divers),
             "divers": divers,
             "e_spawn_speed": env.env.e_spawn_speed,
             "e_spawn_timer": env.env.e_spawn_timer,
@@ -1,12 +1,13 @@
 import numpy as np
+from gymnax.environments.obs_dtype import unpack_bits
 
 
 def init_minatar(ax, env, state):
     import seaborn as sns
     import matplotlib.colors as colors
 
-    obs = env.get_obs(state)
     n_channels = env.obs_shape[-1]
+    obs = dense_obs(env, state)
     # The seaborn color_palette cubhelix is used to assign visually distinct colors to each channel for the env
     cmap = sns.color_palette("cubehelix", n_channels)
     cmap.insert(0, (0, 0, 0))
@@ -25,10 +26,18 @@ def init_minatar(ax, env, state):
 
 
 def update_minatar(im, env, state):
-    obs = env.get_obs(state)
     n_channels = env.obs_shape[-1]
+    obs = dense_obs(env, state)
     numerical_state = (
         np.amax(obs * np.reshape(np.arange(n_channels) + 1, (1, 1, -1)), 2)
         + 0.5
     )
     im.set_data(numerical_state)
+
+
+def dense_obs(env, state):
+    """Get observation grid and unpack bit-packed channels."""
+    obs = env.get_obs(state)
+    if getattr(env, "obs_dtype", "float32") == "packed":
+        obs = unpack_bits(obs, env.obs_shape[-1])
+    return np.asarray(obs)
@@ -1,6 +1,11 @@
 from .dm_env import GymnaxToDmEnvWrapper
 from .gym import GymnaxToGymWrapper, GymnaxToVectorGymWrapper
-from .purerl import FlattenObservationWrapper, LogWrapper
+from .purerl import (
+    FlattenObservationWrapper,
+    LogWrapper,
+    ProfileWrapper,
+    ResetPoolWrapper,
+)
 
 __all__ = [
     "GymnaxToDmEnvWrapper",
@@ -8,4 +13,6 @@ __all__ = [
     "GymnaxToVectorGymWrapper",
     "FlattenObservationWrapper",
     "LogWrapper",
+    "ProfileWrapper",
+    "ResetPoolWrapper",
 ]
@@ -1,11 +1,13 @@
 import jax
 import jax.numpy as jnp
 import chex
+import copy
 import numpy as np
 from flax import struct
 from functools import partial
 from gymnax.environments import environment, spaces
-from typing import Optional, Tuple, Union
+from gymnax.environments.profiling import StageRecorder, record_stages, stage
+from typing import Dict, Optional, Tuple, Union
 
 
 class GymnaxWrapper(object):
@@ -16,6 +18,9 @@ class GymnaxWrapper(object):
 
     # provide proxy access to regular attributes of wrapped object
     def __getattr__(self, name):
+        # Guard against recursion if `_env` is not set yet (copy, pickle)
+        if name == "_env":
+            raise AttributeError(name)
         return getattr(self._env, name)
 
 
@@ -37,6 +42,7 @@ class FlattenObservationWrapper(GymnaxWrapper):
         )
 
     @partial(jax.jit, static_argnums=(0,))
+    @stage("FlattenObservationWrapper.reset")
     def reset(
         self, key: chex.PRNGKey, params: Optional[environment.EnvParams] = None
     ) -> Tuple[chex.Array, environment.EnvState]:
@@ -45,6 +51,7 @@ class FlattenObservationWrapper(GymnaxWrapper):
         return obs, state
 
     @partial(jax.jit, static_argnums=(0,))
+    @stage("FlattenObservationWrapper.step")
     def step(
         self,
         key: chex.PRNGKey,
@@ -75,6 +82,7 @@ class LogWrapper(GymnaxWrapper):
         super().__init__(env)
 
     @partial(jax.jit, static_argnums=(0,))
+    @stage("LogWrapper.reset")
     def reset(
         self, key: chex.PRNGKey, params: Optional[environment.EnvParams] = None
     ) -> Tuple[chex.Array, environment.EnvState]:
@@ -83,6 +91,7 @@ class LogWrapper(GymnaxWrapper):
         return obs, state
 
     @partial(jax.jit, static_argnums=(0,))
+    @stage("LogWrapper.step")
     def step(
         self,
         key: chex.PRNGKey,
@@ -108,3 +117,150 @@ class LogWrapper(GymnaxWrapper):
         info["returned_episode_lengths"] = state.returned_episode_lengths
         info["returned_episode"] = done
         return obs, state, reward, done, info
+
+
+@struct.dataclass
+class ResetPoolParams:
+    env_params: environment.EnvParams
+    pool_obs: chex.Array
+    pool_state: environment.EnvState
+
+
+class ResetPoolWrapper(GymnaxWrapper):
+    """Auto-reset from a device-resident pool of pre-sampled initial states.
+
+    The pool is stored in the wrapper params, so it is shared across the
+    batch when vmapping `step` with `in_axes=(0, 0, 0, None)`. Has to wrap
+    the raw environment (other wrappers go on top), since it calls
+    `step_env` to bypass the eager auto-reset of `Environment.step`. Use `refresh_pool` every couple of
+    updates (outside of the vectorized step) to resample the pool.
+    """
+
+    def __init__(self, env: environment.Environment, pool_size: int = 1024):
+        if not isinstance(env, environment.Environment):
+            # Stepping a wrapper's `step_env` would skip the wrapper's `step`
+            raise TypeError(
+                "ResetPoolWrapper has to wrap a raw Environment, got"
+                f" {type(env).__name__}. Apply other wrappers on top of it."
+            )
+        super().__init__(env)
+        self.pool_size = pool_size
+        self._default_params = None
+
+    @property
+    def default_params(self) -> ResetPoolParams:
+        # Sample the default pool only once for a fixed seed
+        if self._default_params is None:
+            self._default_params = self.init_pool(
+                jax.random.PRNGKey(0), self._env.default_params
+            )
+        return self._default_params
+
+    @partial(jax.jit, static_argnums=(0,))
+    @stage("ResetPoolWrapper.init_pool")
+    def init_pool(
+        self, key: chex.PRNGKey, env_params: environment.EnvParams
+    ) -> ResetPoolParams:
+        """Sample `pool_size` initial (obs, state) pairs with vmapped reset."""
+        pool_obs, pool_state = jax.vmap(self._env.reset_env, in_axes=(0, None))(
+            jax.random.split(key, self.pool_size), env_params
+        )
+        return ResetPoolParams(env_params, pool_obs, pool_state)
+
+    @partial(jax.jit, static_argnums=(0,))
+    def refresh_pool(
+        self, key: chex.PRNGKey, params: ResetPoolParams
+    ) -> ResetPoolParams:
+        """Resample all pool entries for the stored env params."""
+        return self.init_pool(key, params.env_params)
+
+    def _sample_pool(
+        self, key: chex.PRNGKey, params: ResetPoolParams
+    ) -> Tuple[chex.Array, environment.EnvState]:
+        idx = jax.random.randint(key, (), 0, self.pool_size)
+        return jax.tree_map(
+            lambda x: x[idx], (params.pool_obs, params.pool_state)
+        )
+
+    @partial(jax.jit, static_argnums=(0,))
+    @stage("ResetPoolWrapper.reset")
+    def reset(
+        self, key: chex.PRNGKey, params: Optional[ResetPoolParams] = None
+    ) -> Tuple[chex.Array, environment.EnvState]:
+        if params is None:
+            params = self.default_params
+        return self._sample_pool(key, params)
+
+    @partial(jax.jit, static_argnums=(0,))
+    @stage("ResetPoolWrapper.step")
+    def step(
+        self,
+        key: chex.PRNGKey,
+        state: environment.EnvState,
+        action: Union[int, float],
+        params: Optional[ResetPoolParams] = None,
+    ) -> Tuple[chex.Array, environment.EnvState, float, bool, dict]:
+        if params is None:
+            params = self.default_params
+        key, key_reset = jax.random.split(key)
+        obs_st, state_st, reward, done, info = stage("step_env")(
+            self._env.step_env
+        )(key, state, action, params.env_params)
+        obs_re, state_re = self._sample_pool(key_reset, params)
+        # Auto-reset environment based on termination
+        obs, state = stage("auto_reset")(environment.Environment._select_reset)(
+            done, (obs_re, state_re), (obs_st, state_st)
+        )
+        return obs, state, reward, done, info
+
+    def action_space(self, params: ResetPoolParams):
+        return self._env.action_space(params.env_params)
+
+    def observation_space(self, params: ResetPoolParams):
+        return self._env.observation_space(params.env_params)
+
+    def state_space(self, params: ResetPoolParams):
+        return self._env.state_space(params.env_params)
+
+
+class ProfileWrapper(GymnaxWrapper):
+    """Time the named stages of `step`/`reset` with host callbacks.
+
+    Debug build only: every stage (e.g. "step_env", "auto_reset" or the
+    MinAtar "step_agent") is gated on a start callback and followed by an
+    end callback, which serializes the program and adds host round trips.
+    Works inside jit, vmap and scan, e.g. within a fused training loop.
+    Timings are host wall times and accumulate until `clear()` is called.
+    The wrapped environment is copied, so its compiled (uninstrumented)
+    functions are not reused.
+    """
+
+    def __init__(self, env: environment.Environment):
+        super().__init__(copy.deepcopy(env))
+        self.recorder = StageRecorder()
+
+    @partial(jax.jit, static_argnums=(0,))
+    def reset(
+        self, key: chex.PRNGKey, params: Optional[environment.EnvParams] = None
+    ) -> Tuple[chex.Array, environment.EnvState]:
+        with record_stages(self.recorder):
+            return self._env.reset(key, params)
+
+    @partial(jax.jit, static_argnums=(0,))
+    def step(
+        self,
+        key: chex.PRNGKey,
+        state: environment.EnvState,
+        action: Union[int, float],
+        params: Optional[environment.EnvParams] = None,
+    ) -> Tuple[chex.Array, environment.EnvState, float, bool, dict]:
+        with record_stages(self.recorder):
+            return self._env.step(key, state, action, params)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Number of calls, total and mean wall time (seconds) per stage."""
+        return self.recorder.summary()
+
+    def clear(self):
+        """Drop all recorded timings."""
+        self.recorder.clear()
@@ -54,11 +54,15 @@ setup(
         "Operating System :: OS Independent",
         "Topic :: Scientific/Engineering :: Artificial Intelligence",
     ],
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks"]),
     include_package_data=True,
     zip_safe=False,
     platforms="any",
     python_requires=">=3.7",
     install_requires=requires,
     tests_require=test_requires,
+    extras_require={"training": ["optax"]},
+    entry_points={
+        "console_scripts": ["gymnax-prewarm=gymnax.compilation:main"],
+    },
 )
@@ -0,0 +1,83 @@
+import gzip
+import os
+
+import jax
+import numpy as np
+import pytest
+import gymnax
+from gymnax.environments.bsuite.mnist import EnvParams
+from gymnax.utils.load_mnist import SPLIT_FILES, load_mnist_split
+
+
+def write_fake_mnist(directory, num_data: int = 20):
+    """Write small gzipped IDX files in the raw MNIST format."""
+    rng = np.random.default_rng(0)
+    for split, (images_gz, labels_gz) in SPLIT_FILES.items():
+        images = rng.integers(0, 256, (num_data, 28, 28), dtype=np.uint8)
+        labels = rng.integers(0, 10, (num_data,), dtype=np.uint8)
+        header = np.array([2051, num_data, 28, 28], dtype=">u4").tobytes()
+        with gzip.open(os.path.join(directory, images_gz), "wb") as fh:
+            fh.write(header + images.tobytes())
+        header = np.array([2049, num_data], dtype=">u4").tobytes()
+        with gzip.open(os.path.join(directory, labels_gz), "wb") as fh:
+            fh.write(header + labels.tobytes())
+    return images, labels
+
+
+def test_load_mnist_split(tmp_path):
+    """Offline source is parsed once into memory-mapped .npy files."""
+    source_dir, data_dir = tmp_path / "source", tmp_path / "data"
+    source_dir.mkdir()
+    test_images, test_labels = write_fake_mnist(str(source_dir))
+    images, labels = load_mnist_split("test", str(data_dir), str(source_dir))
+    assert isinstance(images, np.memmap) and images.dtype == np.uint8
+    np.testing.assert_array_equal(images, test_images)
+    np.testing.assert_array_equal(labels, test_labels)
+    assert not (data_dir / "train-images.npy").exists()
+    # Cached split is loaded without the raw files
+    for filename in os.listdir(data_dir):
+        if filename.endswith(".gz"):
+            os.remove(data_dir / filename)
+    images, _ = load_mnist_split("test", str(data_dir))
+    np.testing.assert_array_equal(images, test_images)
+
+
+def test_mnist_bandit_fraction(tmp_path):
+    """Fraction limits the sampled images and obs are in [0, 1]."""
+    write_fake_mnist(str(tmp_path))
+    env, env_params = gymnax.make(
+        "MNISTBandit-bsuite", fraction=0.5, data_dir=str(tmp_path)
+    )
+    assert env_params.num_data == 10
+    rng = jax.random.split(jax.random.PRNGKey(0), 100)
+    obs, state = jax.vmap(env.reset, in_axes=(0, None))(rng, env_params)
+    assert obs.min() >= 0 and obs.max() <= 1
+    first_half = env_params.images[:10].astype(np.float32) / 255
+    assert all(np.isclose(first_half, o).all(axis=(1, 2)).any() for o in obs)
+
+
+def test_shared_dataset(tmp_path):
+    """Instances share one uint8 buffer that is not baked into the HLO."""
+    write_fake_mnist(str(tmp_path), num_data=1000)
+    env_a, params_a = gymnax.make("MNISTBandit-bsuite", data_dir=str(tmp_path))
+    env_b, params_b = gymnax.make(
+        "MNISTBandit-bsuite", fraction=0.5, data_dir=str(tmp_path)
+    )
+    assert params_a.images is params_b.images
+    assert params_a.images.dtype == np.uint8
+    # The dataset (784 kB) is an argument, not a constant of the executable
+    key = jax.random.PRNGKey(0)
+    hlo = jax.jit(env_a.reset).lower(key, params_a).as_text()
+    assert len(hlo) < 50_000
+
+
+def test_env_params_need_data(tmp_path):
+    """Params are derived from `default_params`, which hold the dataset."""
+    write_fake_mnist(str(tmp_path))
+    env, env_params = gymnax.make("MNISTBandit-bsuite", data_dir=str(tmp_path))
+    key = jax.random.PRNGKey(0)
+    env_params = env_params.replace(max_steps_in_episode=2)
+    obs, _ = env.reset(key, env_params)
+    assert obs.shape == (28, 28)
+    with pytest.raises(ValueError):
+        env.reset(key, EnvParams(max_steps_in_episode=2))
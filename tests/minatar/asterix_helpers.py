@@ -1,3 +1,12 @@
+import jax
+import jax.numpy as jnp
+from jax import lax
+from gymnax.environments.minatar.asterix import (
+    MinAsterix,
+    step_agent,
+    step_timers,
+)
+
 ramp_interval = 100
 init_spawn_speed = 10
 init_move_interval = 5
@@ -65,3 +74,136 @@ def step_timers_numpy(env):
                 env.env.spawn_speed -= 1
             env.env.ramp_index += 1
             env.env.ramp_timer = ramp_interval
+
+
+# Reference implementation using the previous unrolled per-entity loops
+# Used to check that the vectorized version is bit-identical
+
+class MinAsterixLoop(MinAsterix):
+    """Asterix with the original per-entity loop sub-steps."""
+
+    def step_env(self, key, state, action, params):
+        spawn_entities_now = state.spawn_timer == 0
+        entity, slot = spawn_entity_loop(key, state)
+        entities = lax.select(
+            spawn_entities_now,
+            state.entities.at[slot].set(entity),
+            state.entities,
+        )
+        spawn_timer = lax.select(
+            spawn_entities_now, state.spawn_speed, state.spawn_timer
+        )
+        state = state.replace(entities=entities, spawn_timer=spawn_timer)
+        a = self.action_set[action]
+        state = step_agent(state, a)
+        state, reward, done = step_entities_loop(state)
+        state = step_timers(state, params)
+        state = state.replace(time=state.time + 1, terminal=done)
+        done = self.is_terminal(state, params)
+        info = {"discount": self.discount(state, params)}
+        return (
+            lax.stop_gradient(self.get_obs(state)),
+            lax.stop_gradient(state),
+            reward.astype(jnp.float32),
+            done,
+            info,
+        )
+
+    def get_obs(self, state):
+        obs = jnp.zeros((10, 10, 5), dtype=bool)
+        obs = obs.at[state.player_y, state.player_x, 0].set(1)
+        for i in range(state.entities.shape[0]):
+            x = state.entities[i, :]
+            c = 3 * x[3] + 1 * (1 - x[3])
+            c_eff = c * x[4] + 4 * (1 - x[4])
+            obs = obs.at[x[1], x[0], c_eff].set(1)
+
+            back_x = (x[0] - 1) * x[2] + (x[0] + 1) * (1 - x[2])
+            leave_trail = jnp.logical_and(back_x >= 0, back_x <= 9)
+            c_eff = 2 * x[4] + 4 * (1 - x[4])
+            obs = obs.at[x[1], back_x, c_eff].set(leave_trail)
+        return obs[:, :, :4].astype(jnp.float32)
+
+
+def spawn_entity_loop(key, state):
+    key_lr, key_gold, key_slot = jax.random.split(key, 3)
+    lr = jax.random.choice(key_lr, jnp.array([1, 0]))
+    is_gold = jax.random.choice(
+        key_gold, jnp.array([1, 0]), p=jnp.array([1 / 3, 2 / 3])
+    )
+    x = (1 - lr) * 9
+    state_entities = state.entities[:, 4]
+    slot, free = while_sample_slots_loop(key_slot, state_entities)
+    entity = jnp.array([x, slot + 1, lr, is_gold, free])
+    return entity, slot
+
+
+def while_sample_slots_loop(key, state_entities):
+    init_val = jnp.array([0, 0])
+    order_to_go_through = jax.random.permutation(key, jnp.arange(8))
+    perm_entities = state_entities[order_to_go_through]
+
+    def condition_to_check(val):
+        return jnp.logical_and(val[0] < 7, val[1] == 0)
+
+    def update(val):
+        val = val.at[0].set(val[0] + 1)
+        free = perm_entities[val[0]] == 0
+        val = val.at[1].set(free)
+        return val
+
+    id_and_free = jax.lax.while_loop(condition_to_check, update, init_val)
+    slot_id = order_to_go_through[id_and_free[0]]
+    free_slot = id_and_free[1]
+    return slot_id, free_slot
+
+
+def step_entities_loop(state):
+    done, reward = 0, 0
+    entities = state.entities
+    for i in range(8):
+        x = entities[i]
+        slot_filled = x[4] != 0
+        coords = jnp.logical_and(x[0] == state.player_x, x[1] == state.player_y)
+        collision = jnp.logical_and(coords, slot_filled)
+        collision_gold = jnp.logical_and(collision, x[3])
+        reward += collision_gold
+        entities = entities.at[i].set(x * (1 - collision_gold))
+        collision_enemy = jnp.logical_and(collision, 1 - x[3])
+        done += collision_enemy
+
+    time_to_move = state.move_timer == 0
+    move_timer = jax.lax.select(
+        time_to_move, state.move_speed, state.move_timer
+    )
+
+    old_entities = entities
+    for i in range(8):
+        x = entities[i]
+        slot_filled = x[4] != 0
+        lr = x[2]
+        x = x.at[0].set(
+            jax.lax.select(slot_filled, x[0] + 1 * lr - 1 * (1 - lr), x[0])
+        )
+        outside_of_frame = jnp.logical_or(x[0] < 0, x[0] > 9)
+        entities = jax.lax.select(
+            time_to_move,
+            entities.at[i].set(x * slot_filled * (1 - outside_of_frame)),
+            old_entities,
+        )
+        coords = jnp.logical_and(x[0] == state.player_x, x[1] == state.player_y)
+        collision = jnp.logical_and(coords, slot_filled)
+        collision_gold = jnp.logical_and(collision, x[3])
+        reward += jax.lax.select(time_to_move, collision_gold, False) * 1
+        entities = jax.lax.select(
+            time_to_move,
+            entities.at[i].set(entities[i] * (1 - collision_gold)),
+            old_entities,
+        )
+        collision_enemy = jnp.logical_and(collision, 1 - x[3])
+        done += jax.lax.select(time_to_move, collision_enemy, False)
+    return (
+        state.replace(entities=entities, move_timer=move_timer),
+        reward,
+        done > 0,
+    )
@@ -4,6 +4,19 @@ shot_cool_down = 5
 diver_move_interval = 5
 enemy_shot_interval = 10
 max_oxygen = 200
+diver_spawn_speed = 30
+
+
+def spawn_numpy(env):
+    # Spawn enemies and divers ahead of `act`, so the rest is deterministic
+    if(env.env.e_spawn_timer==0):
+        env.env._spawn_enemy()
+        env.env.e_spawn_timer = env.env.e_spawn_speed
+    if(env.env.d_spawn_timer==0):
+        env.env._spawn_diver()
+        env.env.d_spawn_timer = diver_spawn_speed
+
+
 # Update environment according to agent action
 def step_agent_numpy(env, action):
     a = env.env.action_map[action]
@@ -46,6 +59,7 @@ def step_bullets_numpy(env):
                         env.env.e_subs.remove(x)
                         env.env.f_bullets.remove(bullet)
                         r+=1
+                        break
     return r
 
 
@@ -139,7 +153,7 @@ def step_timers_numpy(env, r):
     env.env.e_spawn_timer -= env.env.e_spawn_timer>0
     env.env.d_spawn_timer -= env.env.d_spawn_timer>0
     env.env.shot_timer -= env.env.shot_timer>0
-    if(env.env.oxygen<0):
+    if(env.env.oxygen<=0):
         env.env.terminal = True
     if(env.env.sub_y>0):
         env.env.oxygen-=1
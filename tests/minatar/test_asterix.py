@@ -1,4 +1,5 @@
 import jax
+import chex
 import gymnax
 from gymnax.utils import (
     np_state_to_jax,
@@ -16,6 +17,7 @@ from asterix_helpers import (
     step_agent_numpy,
     step_entities_numpy,
     step_timers_numpy,
+    MinAsterixLoop,
 )
 
 num_episodes, num_steps, tolerance = 5, 10, 1e-04
@@ -92,3 +94,31 @@ def test_get_obs():
             # Start a new episode if the previous one has terminated
             if done_gym:
                 break
+
+
+def test_vectorized_trajectory():
+    """Test vectorized sub-steps against the original per-entity loops."""
+    env_jax, env_params = gymnax.make(env_name_jax)
+    env_loop = MinAsterixLoop()
+
+    def rollout(env, rng):
+        obs, state = env.reset(rng, env_params)
+
+        def policy_step(carry, rng_t):
+            obs, state = carry
+            rng_act, rng_step = jax.random.split(rng_t)
+            action = env.action_space(env_params).sample(rng_act)
+            obs, state, reward, done, _ = env.step(
+                rng_step, state, action, env_params
+            )
+            return (obs, state), (obs, state, reward, done)
+
+        _, traj = jax.lax.scan(
+            policy_step, (obs, state), jax.random.split(rng, 500)
+        )
+        return traj
+
+    rng_batch = jax.random.split(jax.random.PRNGKey(0), 16)
+    traj = jax.jit(jax.vmap(lambda r: rollout(env_jax, r)))(rng_batch)
+    traj_loop = jax.jit(jax.vmap(lambda r: rollout(env_loop, r)))(rng_batch)
+    chex.assert_trees_all_equal(traj, traj_loop)
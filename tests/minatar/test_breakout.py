@@ -1,4 +1,5 @@
 import jax
+import jax.numpy as jnp
 import gymnax
 from gymnax.utils import (
     np_state_to_jax,
@@ -10,9 +11,14 @@ from gymnax.utils import (
 from minatar.environment import Environment
 
 
-from gymnax.environments.minatar.breakout import step_agent, step_ball_brick
+from gymnax.environments.minatar.breakout import (
+    step_agent,
+    step_ball_brick,
+    pack_bricks,
+    unpack_bricks,
+)
 from breakout_helpers import step_agent_numpy, step_ball_brick_numpy
-
+from breakout_reference import MinBreakout as ReferenceBreakout
 
 num_episodes, num_steps, tolerance = 5, 10, 1e-04
 env_name_gym, env_name_jax = "breakout", "Breakout-MinAtar"
@@ -125,3 +131,48 @@ def test_get_obs():
             # Start a new episode if the previous one has terminated
             if done_gym:
                 break
+
+
+def test_reference_equivalence():
+    """Table-driven transition matches the previous select-based version."""
+    num_envs, num_steps = 64, 500
+    env_jax, env_params = gymnax.make(env_name_jax)
+    env_ref = ReferenceBreakout()
+
+    def rollout(env, rng):
+        def step(state, rng):
+            key_act, key_step = jax.random.split(rng)
+            action = jax.random.randint(key_act, (num_envs,), 0, 3)
+            obs, state, reward, done, _ = jax.vmap(
+                env.step, in_axes=(0, 0, 0, None)
+            )(jax.random.split(key_step, num_envs), state, action, env_params)
+            return state, (obs, reward, done, state)
+
+        rng_reset, rng_steps = jax.random.split(rng)
+        _, state = jax.vmap(env.reset, in_axes=(0, None))(
+            jax.random.split(rng_reset, num_envs), env_params
+        )
+        return jax.lax.scan(
+            step, state, jax.random.split(rng_steps, num_steps)
+        )[1]
+
+    rng = jax.random.PRNGKey(0)
+    obs, reward, done, state = jax.jit(lambda r: rollout(env_jax, r))(rng)
+    obs_ref, reward_ref, done_ref, state_ref = jax.jit(
+        lambda r: rollout(env_ref, r)
+    )(rng)
+    assert (obs == obs_ref).all()
+    assert (reward == reward_ref).all() and (done == done_ref).all()
+    assert reward.sum() > 0 and done.sum() > 0
+    brick_map = jax.vmap(jax.vmap(unpack_bricks))(state.brick_mask)
+    assert (brick_map == state_ref.brick_map).all()
+    for field in ["ball_x", "ball_y", "ball_dir", "pos", "strike"]:
+        assert (getattr(state, field) == getattr(state_ref, field)).all()
+
+
+def test_brick_mask():
+    """Bitmask encoding round-trips the brick rows."""
+    brick_map = jax.random.bernoulli(jax.random.PRNGKey(0), 0.5, (10, 10))
+    brick_map = brick_map.at[jnp.array([0, 4, 5, 6, 7, 8, 9])].set(False)
+    assert (unpack_bricks(pack_bricks(brick_map)) == brick_map).all()
+    assert pack_bricks(jnp.ones((10, 10))) == 2**30 - 1
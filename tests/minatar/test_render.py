@@ -0,0 +1,38 @@
+import jax
+import jax.numpy as jnp
+import gymnax
+from gymnax.environments.obs_dtype import unpack_bits
+from gymnax.environments.minatar.render import render_grid
+
+
+def test_render_grid():
+    """Test single scatter rendering of entity table and dense channels."""
+    entity_table = jnp.array([[0, 1, 0], [2, 3, 1], [4, 5, 3]])
+    brick_map = jnp.zeros((10, 10)).at[1, :].set(1)
+    obs = render_grid((10, 10, 3), entity_table, {2: brick_map})
+    assert obs.dtype == jnp.float32
+    assert obs[0, 1, 0] == 1 and obs[2, 3, 1] == 1
+    # Entries with out-of-range channel are dropped
+    assert obs.sum() == 2 + 10
+    assert (obs[:, :, 2] == brick_map).all()
+
+
+def test_obs_dtype():
+    """Test that compact observations match the float grid."""
+    rng = jax.random.PRNGKey(0)
+    for env_name in [
+        "Freeway-MinAtar",
+        "Seaquest-MinAtar",
+        "SpaceInvaders-MinAtar",
+    ]:
+        env, env_params = gymnax.make(env_name)
+        obs, state = env.reset(rng, env_params)
+        for obs_dtype in ["bool", "uint8", "packed"]:
+            env_c, _ = gymnax.make(env_name, obs_dtype=obs_dtype)
+            obs_c = env_c.get_obs(state)
+            space = env_c.observation_space(env_params)
+            assert obs_c.dtype == space.dtype
+            assert obs_c.shape == space.shape
+            if obs_dtype == "packed":
+                obs_c = unpack_bits(obs_c, obs.shape[-1])
+            assert (obs_c == obs).all()
@@ -1,4 +1,7 @@
 import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
 import gymnax
 from gymnax.utils import (
     np_state_to_jax,
@@ -10,6 +13,12 @@ from gymnax.utils import (
 from minatar.environment import Environment
 
 from gymnax.environments.minatar.seaquest import (
+    MAX_E_BULLETS,
+    MAX_ENEMIES,
+    EnvParams,
+    MinSeaquest,
+    entity_capacities,
+    spawn_enemy,
     step_agent,
     step_bullets,
     step_divers,
@@ -19,6 +28,7 @@ from gymnax.environments.minatar.seaquest import (
     surface,
 )
 from seaquest_helpers import (
+    spawn_numpy,
     step_agent_numpy,
     step_bullets_numpy,
     step_divers_numpy,
@@ -28,38 +38,194 @@ from seaquest_helpers import (
     surface_numpy,
 )
 
-num_episodes, num_steps, tolerance = 5, 10, 1e-04
+# Long episodes so that enemies and divers spawn and interact with the sub
+num_episodes, num_steps, tolerance = 3, 200, 1e-04
 env_name_gym, env_name_jax = "seaquest", "Seaquest-MinAtar"
 
 
-def test_sub_steps():
-    """Test a step transition for the env."""
+def sample_action(key, up: bool = True):
+    """Sample action and the corresponding gym action.
+
+    Without `up` the sub never surfaces, which ends episodes without divers.
+    """
+    actions = jnp.array([0, 1, 2, 3, 4, 5] if up else [0, 1, 3, 4, 5])
+    action = jax.random.choice(key, actions)
+    return action, minatar_action_map(action, env_name_jax)
+
+
+def test_step():
+    """Test a step transition for the env (spawns are done by numpy)."""
     rng = jax.random.PRNGKey(0)
     env_gym = Environment(env_name_gym, sticky_action_prob=0.0)
     env_jax, env_params = gymnax.make(env_name_jax)
+    step_env = jax.jit(env_jax.step_env)
 
     # Loop over test episodes
     for ep in range(num_episodes):
-        obs = env_gym.reset()
+        env_gym.reset()
         # Loop over test episode steps
         for s in range(num_steps):
             rng, key_step, key_action = jax.random.split(rng, 3)
-            state = np_state_to_jax(env_gym, env_name_jax)
-            action = env_jax.action_space(env_params).sample(key_action)
-            action_gym = minatar_action_map(action, env_name_jax)
+            # Spawn in numpy and reset timers - no spawn in JAX step
+            spawn_numpy(env_gym)
+            state = np_state_to_jax(env_gym, env_name_jax, get_jax=True)
+            action, action_gym = sample_action(key_action, up=False)
+
+            reward_gym, done = env_gym.act(action_gym)
+            obs_gym = env_gym.state()
+            done_gym = env_gym.env.terminal
+            obs_jax, state_jax, reward_jax, done_jax, _ = step_env(
+                key_step, state, action, env_params
+            )
+
+            # Check correctness of transition
+            assert_correct_transit(
+                obs_gym,
+                reward_gym,
+                done_gym,
+                obs_jax,
+                reward_jax,
+                done_jax,
+                tolerance,
+            )
+
+            # Check that post-transition states are equal
+            assert_correct_state(env_gym, env_name_jax, state_jax, tolerance)
+
+            if done_gym:
+                break
+
+
+@jax.jit
+def sub_steps(state, action, params):
+    """Deterministic sub-steps of `step_env` and their intermediate states."""
+    state_a = step_agent(state, action, params)
+    state_b, reward_b = step_bullets(state_a)
+    state_c = step_divers(state_b, params)
+    state_d, reward_d = step_e_subs(state_c, reward_b, params)
+    state_e, reward_e = step_e_bullets(state_d, reward_d)
+    state_f, reward_f = step_timers(state_e, reward_e, params)
+    return [
+        state_a,
+        (state_b, reward_b),
+        state_c,
+        (state_d, reward_d),
+        (state_e, reward_e),
+        (state_f, reward_f),
+    ]
+
+
+def test_sub_steps():
+    """Test the sub-step transitions for the env."""
+    rng = jax.random.PRNGKey(0)
+    env_gym = Environment(env_name_gym, sticky_action_prob=0.0)
+    env_jax, env_params = gymnax.make(env_name_jax)
+    # Loop over test episodes
+    for ep in range(num_episodes):
+        env_gym.reset()
+        # Loop over test episode steps
+        for s in range(num_steps):
+            rng, key_action = jax.random.split(rng)
+            spawn_numpy(env_gym)
+            state = np_state_to_jax(env_gym, env_name_jax, get_jax=True)
+            action, action_gym = sample_action(key_action)
+            (
+                state_jax_a,
+                (state_jax_b, reward_b),
+                state_jax_c,
+                (state_jax_d, reward_d),
+                (state_jax_e, reward_e),
+                (state_jax_f, reward_f),
+            ) = sub_steps(state, action_gym, env_params)
 
             step_agent_numpy(env_gym, action_gym)
-            state_jax_a = step_agent(state, action_gym, env_params)
             assert_correct_state(env_gym, env_name_jax, state_jax_a, tolerance)
 
             reward = step_bullets_numpy(env_gym)
-            state_jax_b = step_bullets(state_jax_a)
-            assert_correct_state(env_gym, env_name_jax, state_jax_a, tolerance)
+            assert_correct_state(env_gym, env_name_jax, state_jax_b, tolerance)
+            assert reward == reward_b
+
+            step_divers_numpy(env_gym)
+            assert_correct_state(env_gym, env_name_jax, state_jax_c, tolerance)
+
+            reward = step_e_subs_numpy(env_gym, reward)
+            assert_correct_state(env_gym, env_name_jax, state_jax_d, tolerance)
+            assert reward == reward_d
+
+            reward = step_e_bullets_numpy(env_gym, reward)
+            assert_correct_state(env_gym, env_name_jax, state_jax_e, tolerance)
+            assert reward == reward_e
+
+            reward, terminal = step_timers_numpy(env_gym, reward)
+            assert_correct_state(env_gym, env_name_jax, state_jax_f, tolerance)
+            assert reward == reward_f
+            assert terminal == state_jax_f.terminal
 
             if env_gym.env.terminal:
                 break
 
 
+def test_surface():
+    """Test surfacing with different numbers of rescued divers."""
+    env_gym = Environment(env_name_gym, sticky_action_prob=0.0)
+    env_jax, env_params = gymnax.make(env_name_jax)
+    for diver_count in range(-1, 7):
+        for ramp_index in range(2):
+            env_gym.reset()
+            env_gym.env.diver_count = diver_count
+            env_gym.env.ramp_index = ramp_index
+            env_gym.env.oxygen = 123
+            state = np_state_to_jax(env_gym, env_name_jax, get_jax=True)
+            reward_gym = surface_numpy(env_gym)
+            state_jax, reward_jax = surface(state, env_params)
+            assert_correct_state(env_gym, env_name_jax, state_jax, tolerance)
+            assert reward_gym == reward_jax
+
+
+def test_spawn_enemy():
+    """Test that enemies do not spawn against the direction of a row."""
+    env_jax, env_params = gymnax.make(env_name_jax)
+    _, state = env_jax.reset(jax.random.PRNGKey(0), env_params)
+    # Left-moving fish in rows 1-4
+    e_fish = state.e_fish.at[:4].set(
+        jnp.array([[5, y, 0, 5] for y in range(1, 5)])
+    )
+    state = state.replace(e_fish=e_fish, e_fish_count=4)
+    for key in jax.random.split(jax.random.PRNGKey(1), 20):
+        new_state = spawn_enemy(key, state, True, env_params)
+        for enemies, count in [
+            (new_state.e_fish[4:], new_state.e_fish_count - 4),
+            (new_state.e_subs, new_state.e_subs_count),
+        ]:
+            for x, y, lr in np.array(enemies[:count, :3]):
+                assert x == (0 if lr else 9)
+                assert not (y <= 4 and lr)
+
+
+def test_entity_capacities():
+    """Test that the entity buffers are sized for the environment params."""
+    env_jax, env_params = gymnax.make(env_name_jax)
+    _, state = env_jax.reset(jax.random.PRNGKey(0), env_params)
+    assert state.e_fish.shape == (MAX_ENEMIES, 4)
+    assert state.e_bullets.shape == (MAX_E_BULLETS, 3)
+    # Enemies spawn every step and cross the frame in 200 steps
+    params = EnvParams(ramping=False, init_spawn_speed=1, init_move_interval=19)
+    with pytest.raises(ValueError):
+        env_jax.reset_env(jax.random.PRNGKey(0), params)
+    env_jax = MinSeaquest(params=params)
+    assert env_jax.default_params == params
+    _, state = env_jax.reset(jax.random.PRNGKey(0), params)
+    _, e_bullets, enemies, _ = entity_capacities(params)
+    assert state.e_fish.shape == (enemies, 4)
+    assert state.e_subs.shape == (enemies, 5)
+    assert state.e_bullets.shape == (e_bullets, 3)
+    step = jax.jit(env_jax.step_env)
+    for key in jax.random.split(jax.random.PRNGKey(1), 200):
+        _, state, _, _, _ = step(key, state, 0, params)
+    # More fish are alive than the default buffer could hold
+    assert MAX_ENEMIES < state.e_fish_count <= enemies
+
+
 def test_reset():
     """Test reset obs/state is in space of NumPy version."""
     # env_gym = Environment(env_name_gym, sticky_action_prob=0.0)
@@ -78,6 +244,7 @@ def test_get_obs():
     rng = jax.random.PRNGKey(0)
     env_gym = Environment(env_name_gym, sticky_action_prob=0.0)
     env_jax, env_params = gymnax.make(env_name_jax)
+    get_obs = jax.jit(env_jax.get_obs)
 
     # Loop over test episodes
     for ep in range(num_episodes):
@@ -85,13 +252,12 @@ def test_get_obs():
         # Loop over test episode steps
         for s in range(num_steps):
             rng, key_step, key_action = jax.random.split(rng, 3)
-            action = env_jax.action_space.sample(key_action)
-            action_gym = minatar_action_map(action, env_name_jax)
+            action, action_gym = sample_action(key_action, up=False)
             # Step gym environment get state and trafo in jax dict
             reward_gym = env_gym.act(action_gym)
             obs_gym = env_gym.state()
-            state = np_state_to_jax(env_gym, env_name_jax)
-            obs_jax = env_jax.get_obs(state, env_params)
+            state = np_state_to_jax(env_gym, env_name_jax, get_jax=True)
+            obs_jax = get_obs(state, env_params)
             # Check for correctness of observations
             assert (obs_gym == obs_jax).all()
             done_gym = env_gym.env.terminal
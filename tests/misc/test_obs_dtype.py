@@ -0,0 +1,37 @@
+import jax
+import numpy as np
+import pytest
+import gymnax
+from gymnax.environments.obs_dtype import unpack_bits
+
+grid_envs = [
+    ("Catch-bsuite", {}),
+    ("Pong-misc", {}),
+    ("FourRooms-misc", {"use_visual_obs": True}),
+    ("Breakout-MinAtar", {}),
+]
+
+
+@pytest.mark.parametrize("env_name, env_kwargs", grid_envs)
+@pytest.mark.parametrize("obs_dtype", ["bool", "uint8", "packed"])
+def test_obs_dtype(env_name, env_kwargs, obs_dtype):
+    """Compact observations match space and encode the float32 grid."""
+    rng = jax.random.PRNGKey(0)
+    env, env_params = gymnax.make(env_name, **env_kwargs)
+    env_c, _ = gymnax.make(env_name, obs_dtype=obs_dtype, **env_kwargs)
+    obs, state = env.reset(rng, env_params)
+    obs_c = env_c.get_obs(state)
+    space = env_c.observation_space(env_params)
+    assert obs_c.dtype == space.dtype
+    assert obs_c.shape == space.shape
+    if obs_dtype == "packed":
+        obs_c = unpack_bits(obs_c, obs.shape[-1])
+    np.testing.assert_array_equal(obs_c, obs)
+
+
+def test_invalid_obs_dtype():
+    """Unknown dtypes and non-visual FourRooms observations are rejected."""
+    with pytest.raises(ValueError):
+        gymnax.make("Catch-bsuite", obs_dtype="float16")
+    with pytest.raises(ValueError):
+        gymnax.make("FourRooms-misc", obs_dtype="bool")
@@ -0,0 +1,65 @@
+from benchmarks import compile_report
+from benchmarks.compile_report import check_thresholds, run_report
+from benchmarks.suite import (
+    MODES,
+    compare_results,
+    load_results,
+    main,
+    run_suite,
+)
+
+
+def test_run_suite():
+    """All modes report steps/sec, failing envs are recorded as errors."""
+    results = run_suite(
+        ["Catch-bsuite", "NoSuchEnv-v0"],
+        batch_sizes=[2],
+        num_steps=4,
+        min_time=0.0,
+    )
+    assert len(results) == 2 * len(MODES)
+    for result in results[: len(MODES)]:
+        assert result["error"] is None
+        assert result["steps_per_sec"] > 0
+        assert result["compile_time"] > 0
+        if result["mode"] != "gym_vector":
+            assert result["peak_bytes"] > 0
+    assert all(r["error"] is not None for r in results[len(MODES) :])
+
+
+def test_output_and_baseline(tmp_path):
+    """Results round-trip through JSON/CSV and regressions fail the run."""
+    args = ["--env_ids", "Catch-bsuite", "--modes", "vmap"]
+    args += ["--batch_sizes", "2", "--min_time", "0"]
+    for suffix in [".json", ".csv"]:
+        path = str(tmp_path / f"results{suffix}")
+        assert main(args + ["--output", path]) == 0
+        results = load_results(path)
+        assert results[0]["batch_size"] == 2
+        assert compare_results(results, results) == []
+        # A baseline that is twice as fast flags a regression
+        baseline = [
+            dict(r, steps_per_sec=2 * r["steps_per_sec"]) for r in results
+        ]
+        assert len(compare_results(results, baseline, 0.2)) == 1
+
+
+def test_compile_report(tmp_path):
+    """HLO statistics for step/reset and threshold violations."""
+    results = run_report(["Breakout-MinAtar"], batch_sizes=[None, 4])
+    assert [(r["fn"], r["batch_size"]) for r in results] == [
+        ("step", 0),
+        ("reset", 0),
+        ("step", 4),
+        ("reset", 4),
+    ]
+    step = results[0]
+    assert step["error"] is None
+    assert 0 < step["num_scatter"] < step["num_ops"]
+    assert step["hlo_bytes"] > 0 and step["peak_bytes"] > 0
+    assert check_thresholds(results, {}) == []
+    limits = {"*": {"num_ops": 1e9}, "Breakout-MinAtar": {"num_ops": 1}}
+    assert len(check_thresholds(results, limits)) == 4
+    args = ["--env_ids", "Catch-bsuite", "--batch_size", "0"]
+    assert compile_report.main(args + ["--max", "num_ops=1e9"]) == 0
+    assert compile_report.main(args + ["--max", "hlo_bytes=1"]) == 1
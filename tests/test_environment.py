@@ -0,0 +1,188 @@
+import copy
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
+import gymnax
+from jax.experimental.compilation_cache import compilation_cache
+from gymnax._version import __version__
+from gymnax.compilation import enable_compilation_cache
+from gymnax.environments.environment import (
+    BatchedEnvironment,
+    ResetPoolState,
+)
+from gymnax.environments.minatar.breakout import MinBreakout
+
+batched_env_names = ["CartPole-v1", "Acrobot-v1", "MountainCar-v0"]
+
+num_steps = 50
+
+
+def rollout(env, env_params, rng):
+    """Collect rewards, dones and observations of a random policy."""
+    obs, state = env.reset(rng, env_params)
+    trajectory = []
+    for _ in range(num_steps):
+        rng, key_act, key_step = jax.random.split(rng, 3)
+        action = env.action_space(env_params).sample(key_act)
+        obs, state, reward, done, _ = env.step(
+            key_step, state, action, env_params
+        )
+        trajectory.append((obs, reward, done))
+    return trajectory, state
+
+
+def test_cond_reset_matches_eager():
+    """Gating the reset with `lax.cond` does not change transitions."""
+    rng = jax.random.PRNGKey(0)
+    env, env_params = gymnax.make("Catch-bsuite")
+    env_cond = env.with_reset_strategy("cond")
+    traj_eager, _ = rollout(env, env_params, rng)
+    traj_cond, _ = rollout(env_cond, env_params, rng)
+    for (o_e, r_e, d_e), (o_c, r_c, d_c) in zip(traj_eager, traj_cond):
+        assert np.allclose(o_e, o_c)
+        assert r_e == r_c and d_e == d_c
+
+
+def test_pool_reset():
+    """Pool resets cycle through the carried ring buffer."""
+    rng = jax.random.PRNGKey(0)
+    env, env_params = gymnax.make("Catch-bsuite")
+    env_pool = env.with_reset_strategy("pool", pool_size=4)
+    obs, state = env_pool.reset(rng, env_params)
+    assert isinstance(state, ResetPoolState)
+    assert state.pool_obs.shape == (4, *obs.shape)
+    traj, state = rollout(env_pool, env_params, rng)
+    num_done = sum(int(d) for _, _, d in traj)
+    assert num_done > 0
+    assert state.pool_index == num_done % 4
+    # Env copy does not affect the original instance
+    assert env.reset_strategy == "eager"
+
+
+def test_invalid_reset_strategy():
+    env, _ = gymnax.make("CartPole-v1")
+    with pytest.raises(ValueError):
+        env.with_reset_strategy("lazy")
+
+
+def test_compile():
+    """AOT-compiled step/reset match the jitted methods."""
+    env, env_params = gymnax.make("Catch-bsuite")
+    compiled = env.compile(batch_size=8, params=env_params)
+    rng = jax.random.split(jax.random.PRNGKey(0), 8)
+    obs, state = compiled.reset(rng, env_params)
+    obs_ref, state_ref = jax.vmap(env.reset, in_axes=(0, None))(rng, env_params)
+    np.testing.assert_array_equal(obs, obs_ref)
+    action = jax.numpy.ones(8, dtype=jax.numpy.int32)
+    step_out = compiled.step(rng, state, action, env_params)
+    step_ref = jax.vmap(env.step, in_axes=(0, 0, 0, None))(
+        rng, state_ref, action, env_params
+    )
+    chex.assert_trees_all_equal(step_out, step_ref)
+    # Executables are specialized to the compiled batch shape
+    with pytest.raises(Exception):
+        compiled.reset(rng[:4], env_params)
+
+
+def test_enable_compilation_cache(tmp_path):
+    """Cache directory is namespaced by gymnax and jax versions."""
+    path = enable_compilation_cache(str(tmp_path))
+    try:
+        assert jax.config.jax_compilation_cache_dir == path
+        assert __version__ in path and jax.__version__ in path
+    finally:
+        jax.config.update("jax_compilation_cache_dir", None)
+        compilation_cache.reset_cache()
+
+
+@pytest.mark.parametrize("env_name", batched_env_names)
+def test_batched_step_matches_vmap(env_name):
+    """Native batched steps match vmapping `step_env` over the rows."""
+    env, env_params = gymnax.make(env_name)
+    env_vmap = copy.copy(env)
+    env_vmap.elementwise_step = False
+    rng = jax.random.PRNGKey(0)
+    obs, state = env.reset_batched(rng, 16, env_params)
+    assert obs.shape == (16, *env.observation_space(env_params).shape)
+    step = jax.jit(env.step_env_batched)
+    step_vmap = jax.jit(env_vmap.step_env_batched)
+    for _ in range(num_steps):
+        rng, key_act, key_step = jax.random.split(rng, 3)
+        action = env.action_space(env_params).sample(key_act, (16,))
+        out = step(key_step, state, action, env_params)
+        out_vmap = step_vmap(key_step, state, action, env_params)
+        chex.assert_trees_all_close(out, out_vmap, atol=1e-5)
+        obs, state, _, done, _ = env.step_batched(
+            key_step, state, action, env_params
+        )
+        # Terminated rows are reset
+        time = env.unpack_state(state).time
+        assert (time[done] == 0).all() and (time[~done] > 0).all()
+
+
+def test_batched_auto_reset_time():
+    """Auto-resets select exact integer times of the packed states."""
+    env, env_params = gymnax.make("CartPole-v1")
+    rng = jax.random.PRNGKey(0)
+    _, state = env.reset_batched(rng, 4, env_params)
+    # Large times are terminal, the max. episode length is exceeded
+    time = jnp.array([1, 2**24 + 1, 7, 2**31 - 3], dtype=jnp.int32)
+    unpacked = env.unpack_state(state).replace(time=time)
+    action = jnp.zeros(4, dtype=jnp.int32)
+    _, state, _, done, _ = env.step_batched(
+        rng, env.pack_state(unpacked), action, env_params
+    )
+    assert (done == jnp.array([False, True, False, True])).all()
+    assert (env.unpack_state(state).time == jnp.array([2, 0, 8, 0])).all()
+    # Without terminations all times are incremented exactly
+    params = env_params.replace(
+        max_steps_in_episode=2**31 - 1,
+        x_threshold=1e9,
+        theta_threshold_radians=1e9,
+    )
+    _, state, _, done, _ = env.step_batched(
+        rng, env.pack_state(unpacked), action, params
+    )
+    assert not done.any()
+    assert (env.unpack_state(state).time == time + 1).all()
+
+
+def test_pack_state():
+    """Packed states round-trip to the (batched) env state."""
+    env, env_params = gymnax.make("CartPole-v1")
+    keys = jax.random.split(jax.random.PRNGKey(0), 4)
+    _, state = jax.vmap(env.reset, in_axes=(0, None))(keys, env_params)
+    # Integers beyond 2**24 do not fit a float32 - they are kept as ints
+    state = state.replace(time=jnp.array([0, -7, 2**24 + 1, 2**31 - 1]))
+    floats, ints = env.pack_state(state)
+    assert floats.shape == (4, 4) and floats.dtype == jnp.float32
+    assert ints.shape == (4, 1) and ints.dtype == jnp.int32
+    chex.assert_trees_all_equal(env.unpack_state((floats, ints)), state)
+    # Single states are packed into flat vectors
+    state = jax.tree_map(lambda x: x[0], state)
+    assert [x.shape for x in env.pack_state(state)] == [(4,), (1,)]
+    chex.assert_trees_all_equal(env.unpack_state(env.pack_state(state)), state)
+
+
+class BatchedBreakout(MinBreakout, BatchedEnvironment):
+    """Breakout stepped with the vmap fallback of `BatchedEnvironment`."""
+
+
+def test_batched_vmap_fallback():
+    """Envs without native batched steps are vmapped over the rows."""
+    env, env_params = BatchedBreakout(), MinBreakout().default_params
+    rng = jax.random.PRNGKey(0)
+    keys = jax.random.split(rng, 4)
+    _, state = jax.vmap(env.reset, in_axes=(0, None))(keys, env_params)
+    state = state.replace(brick_mask=state.brick_mask.at[0].set(2**30 - 1))
+    packed = env.pack_state(state)
+    chex.assert_trees_all_equal(env.unpack_state(packed), state)
+    action = jnp.ones(4, dtype=jnp.int32)
+    out = env.step_env_batched(rng, packed, action, env_params)
+    out_vmap = jax.vmap(env.step_env, in_axes=(0, 0, 0, None))(
+        jax.random.split(rng, 4), state, action, env_params
+    )
+    chex.assert_trees_all_equal(env.unpack_state(out[1]), out_vmap[1])
+    chex.assert_trees_all_equal(out[2:], out_vmap[2:])
@@ -0,0 +1,66 @@
+import subprocess
+import sys
+
+import_script = """
+import sys
+import {module}
+print(",".join(sys.modules))
+"""
+
+
+def imported_modules(module: str):
+    """Modules loaded by importing `module` in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-c", import_script.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return set(out.strip().split(","))
+
+
+def gymnax_import_share() -> float:
+    """Share of `import gymnax` self-time spent in gymnax's own modules.
+
+    Uses the per-module self-times of `python -X importtime`, so both parts
+    are measured in the same interpreter and machine load mostly cancels.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import gymnax"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    total_us, gymnax_us = 0, 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # Header line
+        total_us += int(self_us)
+        if module.strip().startswith("gymnax"):
+            gymnax_us += int(self_us)
+    return gymnax_us / total_us
+
+
+def test_lazy_import():
+    """`import gymnax` only loads jax/flax and no environment modules."""
+    modules = imported_modules("gymnax")
+    assert "gym" not in modules
+    assert "gymnax.environments.bsuite.mnist" not in modules
+    assert not any(m.startswith("gymnax.environments.minatar") for m in modules)
+
+
+def test_make_imports_requested_env():
+    """`gymnax.make` imports only the module of the requested env."""
+    modules = imported_modules("gymnax; gymnax.make('Catch-bsuite')")
+    assert "gymnax.environments.bsuite.catch" in modules
+    assert "gymnax.environments.bsuite.deep_sea" not in modules
+    assert "gym" not in modules
+
+
+def test_import_time():
+    """gymnax itself adds little on top of importing jax/chex/flax."""
+    # Best of a few runs guards against one-off stalls on loaded runners
+    assert min(gymnax_import_share() for _ in range(3)) < 0.05
@@ -0,0 +1,38 @@
+import pytest
+import gymnax
+from gymnax.environments.bsuite.catch import Catch
+
+
+def test_make_cache():
+    """Repeated `make` calls with equal kwargs reuse the instance."""
+    gymnax.make.cache_clear()
+    env_a, _ = gymnax.make("Catch-bsuite")
+    env_b, _ = gymnax.make("Catch-bsuite")
+    env_c, _ = gymnax.make("Catch-bsuite", rows=5)
+    assert env_a is env_b
+    assert env_a is not env_c
+    info = gymnax.make.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+    gymnax.make.cache_clear()
+    assert gymnax.make.cache_info().currsize == 0
+    env_d, _ = gymnax.make("Catch-bsuite")
+    assert env_d is not env_a
+
+
+def test_register():
+    """Third-party environments are made with their default kwargs."""
+    gymnax.register("SmallCatch-v0", Catch, default_kwargs={"rows": 5})
+    gymnax.register("LazyCatch-v0", "gymnax.environments.bsuite.catch:Catch")
+    try:
+        env, _ = gymnax.make("SmallCatch-v0")
+        assert env.rows == 5
+        env, _ = gymnax.make("SmallCatch-v0", rows=7)
+        assert env.rows == 7
+        env, _ = gymnax.make("LazyCatch-v0")
+        assert isinstance(env, Catch)
+        with pytest.raises(ValueError):
+            gymnax.register("SmallCatch-v0", Catch)
+    finally:
+        for env_id in ["SmallCatch-v0", "LazyCatch-v0"]:
+            gymnax.registered_envs.remove(env_id)
+            gymnax.registration._env_registry.pop(env_id)
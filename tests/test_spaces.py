@@ -0,0 +1,85 @@
+import jax
+import jax.numpy as jnp
+import numpy as np
+import gymnax
+from gymnax.environments import spaces
+
+
+def make_space():
+    return spaces.Dict(
+        {
+            "discrete": spaces.Discrete(3),
+            "box": spaces.Box(-1.0, 1.0, (2,)),
+            "nested": spaces.Tuple(
+                [spaces.MultiDiscrete([2, 5]), spaces.MultiBinary(3)]
+            ),
+        }
+    )
+
+
+def test_batched_sample_contains():
+    """Batched samples lie in the space, checked per batch element."""
+    space = make_space()
+    x = space.sample(jax.random.PRNGKey(0), (16,))
+    assert x["box"].shape == (16, 2)
+    assert x["nested"][0].shape == (16, 2)
+    assert space.contains(x).shape == (16,)
+    assert space.contains(x).all()
+    x["box"] = x["box"].at[3, 1].set(2.0)
+    np.testing.assert_array_equal(space.contains(x), np.arange(16) != 3)
+
+
+def test_spaces_are_pytrees():
+    """Spaces cross jit boundaries and can be batched with vmap."""
+    space = jax.jit(lambda s: s)(make_space())
+    assert space.keys == ("discrete", "box", "nested")
+    # Per-env bounds, e.g. derived from batched EnvParams
+    highs = jnp.array([1.0, 2.0, 3.0])
+    boxes = jax.vmap(lambda h: spaces.Box(0.0, h, (4,)))(highs)
+    rng = jax.random.split(jax.random.PRNGKey(0), 3)
+    x = jax.vmap(lambda s, k: s.sample(k))(boxes, rng)
+    assert x.shape == (3, 4)
+    assert (x.max(axis=1) <= highs).all()
+    assert jax.vmap(lambda s, x: s.contains(x))(boxes, x).all()
+    # Spaces can be built from traced arguments
+    key = jax.random.PRNGKey(0)
+    nvec = jnp.array([2, 5])
+    x = jax.jit(lambda n: spaces.MultiDiscrete(n).sample(key))(nvec)
+    assert (x < nvec).all()
+    n = jnp.array([3, 4])
+    x = jax.vmap(lambda n: spaces.Discrete(n).sample(key))(n)
+    assert (x < n).all()
+
+
+def test_state_space_over_params():
+    """State spaces are built and sampled for batched env params."""
+    env, env_params = gymnax.make("CartPole-v1")
+    max_steps = jnp.array([10, 20, 500])
+    params = jax.vmap(lambda n: env_params.replace(max_steps_in_episode=n))(
+        max_steps
+    )
+    rng = jax.random.split(jax.random.PRNGKey(0), 3)
+    state = jax.vmap(lambda p, k: env.state_space(p).sample(k))(params, rng)
+    assert (state["time"] < max_steps).all()
+
+
+def test_flatten_unflatten():
+    """Flattening round-trips (batches of) nested space elements."""
+    space = make_space()
+    assert spaces.flatdim(space) == 8
+    x = space.sample(jax.random.PRNGKey(1), (5,))
+    flat = spaces.flatten(space, x)
+    assert flat.shape == (5, 8)
+    x_rec = spaces.unflatten(space, flat)
+    jax.tree_map(np.testing.assert_array_equal, x_rec, x)
+    x_single = jax.tree_map(lambda v: v[0], x)
+    assert spaces.flatten(space, x_single).shape == (8,)
+
+
+def test_sample_batch():
+    """`sample_batch` draws `n` valid elements at once."""
+    space = make_space()
+    x = space.sample_batch(jax.random.PRNGKey(2), 1000)
+    assert x["discrete"].shape == (1000,)
+    assert space.contains(x).all()
+    assert set(np.unique(x["discrete"])) == {0, 1, 2}
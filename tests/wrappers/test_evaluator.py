@@ -1,5 +1,9 @@
+import os
+import subprocess
+import sys
 import jax
 import jax.numpy as jnp
+import numpy as np
 import flax.linen as nn
 from gymnax.experimental import RolloutWrapper
 
@@ -58,3 +62,150 @@ def test_rollout():
         cum_return,
     ) = manager.population_rollout(rng_batch, batch_params)
     assert obs.shape == (5, 10, 200, 3)
+
+
+def test_stats_rollout():
+    """Streaming outputs match the stacked trajectory reductions."""
+    rng = jax.random.PRNGKey(0)
+    model = MLP()
+    policy_params = model.init(rng, x=jnp.zeros((3,)), rng=rng)
+    rng_batch = jax.random.split(rng, 4)
+    manager = RolloutWrapper(model.apply, env_name="Pendulum-v1")
+    _, _, reward, _, _, cum_return = manager.batch_rollout(
+        rng_batch, policy_params
+    )
+
+    accumulators = {
+        "max_reward": (-jnp.inf, lambda acc, t: jnp.maximum(acc, t.reward))
+    }
+    manager = RolloutWrapper(
+        model.apply,
+        env_name="Pendulum-v1",
+        output="stats",
+        accumulators=accumulators,
+    )
+    stats = manager.batch_rollout(rng_batch, policy_params)
+    assert jnp.allclose(stats["return"], cum_return[:, 0], rtol=1e-5)
+    assert (stats["length"] == 200).all()
+    assert jnp.allclose(stats["max_reward"], reward.max(axis=1))
+
+    # Ring buffer keeps the last window of transitions
+    manager = RolloutWrapper(
+        model.apply, env_name="Pendulum-v1", output="chunks", chunk_size=50
+    )
+    stats = manager.batch_rollout(rng_batch, policy_params)
+    assert stats["window"].obs.shape == (4, 50, 3)
+    assert jnp.allclose(stats["window"].reward, reward[:, -50:])
+
+    # Windows are streamed to the host callback instead
+    chunks = []
+    manager = RolloutWrapper(
+        model.apply,
+        env_name="Pendulum-v1",
+        output="chunks",
+        chunk_size=50,
+        chunk_callback=lambda i, window: chunks.append((i, window)),
+    )
+    stats = jax.block_until_ready(
+        manager.single_rollout(rng_batch[0], policy_params)
+    )
+    jax.effects_barrier()
+    assert "window" not in stats
+    assert sorted(int(i) for i, _ in chunks) == [0, 1, 2, 3]
+
+
+def test_early_exit_rollout():
+    """Early-exit rollouts match the full scan up to the episode end."""
+    rng_batch = jax.random.split(jax.random.PRNGKey(0), 8)
+    manager = RolloutWrapper(env_name="CartPole-v1", num_env_steps=500)
+    obs, _, reward, _, done, cum_return = manager.batch_rollout(
+        rng_batch, None
+    )
+    manager_exit = RolloutWrapper(
+        env_name="CartPole-v1", num_env_steps=500, early_exit_chunk=20
+    )
+    obs_e, _, reward_e, _, done_e, cum_return_e, length = (
+        manager_exit.batch_rollout(rng_batch, None)
+    )
+    assert obs_e.shape == obs.shape
+    assert jnp.allclose(cum_return_e, cum_return)
+    assert (length == jnp.argmax(done, axis=1) + 1).all()
+    for i in range(8):
+        assert jnp.allclose(reward_e[i, : length[i]], reward[i, : length[i]])
+        # Steps after the episode end are zero-padded
+        assert (obs_e[i, length[i] :] == 0).all()
+        assert (reward_e[i, length[i] :] == 0).all()
+    assert (done_e.sum(axis=1) == 1).all()
+
+    manager_exit = RolloutWrapper(
+        env_name="CartPole-v1",
+        num_env_steps=500,
+        output="stats",
+        early_exit_chunk=20,
+    )
+    stats = manager_exit.batch_rollout(rng_batch, None)
+    assert (stats["length"] == length).all()
+
+
+sharded_script = """
+import jax
+import jax.numpy as jnp
+from gymnax.experimental import RolloutWrapper
+
+rng_batch = jax.random.split(jax.random.PRNGKey(0), 4)
+pop_params = jnp.arange(5.0)
+model_forward = lambda p, obs, rng: jnp.int32(obs[0] * p > 0)
+manager = RolloutWrapper(model_forward, "CartPole-v1", output="stats")
+manager_sharded = RolloutWrapper(
+    model_forward, "CartPole-v1", output="stats", num_devices=-1
+)
+assert manager_sharded.num_devices == 4
+stats = manager.population_rollout(rng_batch, pop_params)
+stats_sharded = manager_sharded.population_rollout(rng_batch, pop_params)
+assert stats_sharded["return"].shape == (5, 4)
+assert jnp.allclose(stats["return"], stats_sharded["return"])
+# Populations smaller than the number of devices
+stats_sharded = manager_sharded.population_rollout(rng_batch, pop_params[:1])
+assert stats_sharded["return"].shape == (1, 4)
+assert jnp.allclose(stats["return"][:1], stats_sharded["return"])
+"""
+
+
+def test_sharded_population_rollout():
+    """Population rollouts padded and sharded over 4 host CPU devices."""
+    env = dict(os.environ, XLA_FLAGS="--xla_force_host_platform_device_count=4")
+    subprocess.run([sys.executable, "-c", sharded_script], env=env, check=True)
+
+
+def test_recurrent_rollout():
+    """Hidden state is threaded through the scan and reset on done."""
+
+    def init_carry(policy_params):
+        return jnp.zeros(())
+
+    def model_forward(policy_params, obs, hidden, rng):
+        # Count steps since the last reset and act on the counter
+        return (hidden % 2).astype(jnp.int32), hidden + 1
+
+    rng_batch = jax.random.split(jax.random.PRNGKey(0), 3)
+    for output in ["trajectory", "stats"]:
+        manager = RolloutWrapper(
+            model_forward,
+            env_name="Catch-bsuite",
+            num_env_steps=30,
+            output=output,
+            init_carry=init_carry,
+            accumulators={"actions": (0, lambda acc, t: acc + t.action)},
+        )
+        out = manager.population_rollout(rng_batch, jnp.zeros((2,)))
+        if output == "trajectory":
+            action, done = out[1], out[4]
+            assert action.shape == (2, 3, 30)
+            # Counter restarts after each done, so actions follow 0, 1, 0, ..
+            since_reset = np.zeros((2, 3), dtype=np.int32)
+            for t in range(30):
+                assert (action[..., t] == since_reset % 2).all()
+                since_reset = np.where(done[..., t], 0, since_reset + 1)
+            assert (done.sum(axis=-1) > 0).all()
+        else:
+            assert out["actions"].shape == (2, 3)
@@ -0,0 +1,84 @@
+import chex
+import jax
+import jax.numpy as jnp
+import pytest
+import gymnax
+from gymnax.wrappers import ResetPoolWrapper, LogWrapper, ProfileWrapper
+
+
+def test_reset_pool_wrapper():
+    rng = jax.random.PRNGKey(0)
+    env, env_params = gymnax.make("Catch-bsuite")
+    env = ResetPoolWrapper(env, pool_size=8)
+    pool_params = env.init_pool(rng, env_params)
+    assert pool_params.pool_obs.shape == (8, 10, 5)
+
+    # Batch envs share a single pool via the params
+    env = LogWrapper(env)
+    reset = jax.jit(jax.vmap(env.reset, in_axes=(0, None)))
+    step = jax.jit(jax.vmap(env.step, in_axes=(0, 0, 0, None)))
+    obs, state = reset(jax.random.split(rng, 4), pool_params)
+    num_done = 0
+    for _ in range(20):
+        rng, key_act, key_step = jax.random.split(rng, 3)
+        action = jax.random.randint(key_act, (4,), 0, 3)
+        obs, state, reward, done, info = step(
+            jax.random.split(key_step, 4), state, action, pool_params
+        )
+        # Every env that terminated restarts from a pool observation
+        in_pool = jnp.all(
+            obs[:, None] == pool_params.pool_obs[None], axis=(2, 3)
+        ).any(axis=1)
+        assert jnp.all(jnp.logical_or(~done, in_pool))
+        num_done += info["returned_episode"].sum()
+    assert num_done > 0
+
+    # Refreshing resamples the pool for the same env params
+    new_params = env.refresh_pool(jax.random.PRNGKey(1), pool_params)
+    assert new_params.pool_obs.shape == pool_params.pool_obs.shape
+    assert not all(
+        jnp.array_equal(x, y)
+        for x, y in zip(
+            jax.tree_util.tree_leaves(new_params.pool_state),
+            jax.tree_util.tree_leaves(pool_params.pool_state),
+        )
+    )
+    chex.assert_trees_all_equal(new_params.env_params, pool_params.env_params)
+
+    # Stepping a wrapped env's `step_env` would skip the wrapper's step
+    with pytest.raises(TypeError):
+        ResetPoolWrapper(LogWrapper(gymnax.make("Catch-bsuite")[0]))
+
+
+def test_profile_wrapper():
+    rng = jax.random.PRNGKey(0)
+    env, env_params = gymnax.make("Breakout-MinAtar")
+    step = jax.jit(jax.vmap(env.step, in_axes=(0, 0, 0, None)))
+    env = ProfileWrapper(LogWrapper(env))
+    reset = jax.vmap(env.reset, in_axes=(0, None))
+    obs, state = reset(jax.random.split(rng, 4), env_params)
+
+    def rollout(state, keys):
+        def body(state, key):
+            obs, state, reward, done, _ = jax.vmap(
+                env.step, in_axes=(0, 0, None, None)
+            )(jax.random.split(key, 4), state, 1, env_params)
+            return state, (obs, reward, done)
+
+        return jax.lax.scan(body, state, keys)
+
+    env.clear()
+    keys = jax.random.split(rng, 5)
+    _, (obs, reward, done) = jax.jit(rollout)(state, keys)
+    jax.block_until_ready(obs)
+    summary = env.summary()
+    for name in ["LogWrapper.step", "step_env", "step_agent", "get_obs"]:
+        assert summary[name]["count"] == 5
+        assert summary[name]["total_time"] > 0
+    # Instrumentation does not change the transitions
+    env_state = state.env_state
+    for t, key in enumerate(keys):
+        obs_t, env_state, reward_t, done_t, _ = step(
+            jax.random.split(key, 4), env_state, jnp.ones(4, int), env_params
+        )
+        assert jnp.all(obs_t == obs[t]) and jnp.all(reward_t == reward[t])